@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AuthenticationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend.authentication'
+
+    def ready(self):
+        from backend.authentication import schema, signals  # noqa: F401
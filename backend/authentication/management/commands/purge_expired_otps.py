@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from backend.authentication.models import OTP
+
+
+class Command(BaseCommand):
+    help = 'Delete expired OTPs in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = 0
+
+        while True:
+            # batches keep each DELETE short so it never holds locks for long
+            ids = list(OTP.objects.expired().values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            deleted, __ = OTP.objects.filter(id__in=ids).delete()
+            total += deleted
+
+        self.stdout.write(f'Deleted {total} expired OTPs.')
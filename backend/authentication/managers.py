@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class OTPQuerySet(models.QuerySet):
+    def expiry_cutoff(self):
+        return timezone.now() - timezone.timedelta(seconds=settings.OTP_EXPIRES_AFTER)
+
+    def latest_valid(self, user):
+        return self.filter(
+            user=user,
+            created_at__gte=self.expiry_cutoff()
+        ).order_by('-created_at').first()
+
+    def consume(self, otp):
+        """
+        Delete the given OTP together with the older ones of the same user.
+        Returns False when a concurrent request already consumed it.
+        """
+        consumed, __ = self.filter(pk=otp.pk).delete()
+        self.filter(user_id=otp.user_id, created_at__lt=otp.created_at).delete()
+        return consumed > 0
+
+    def expired(self):
+        return self.filter(created_at__lt=self.expiry_cutoff())
@@ -4,10 +4,20 @@ from django.db import models
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from backend.authentication.managers import OTPQuerySet
+
 User = get_user_model()
 
 
 class OTP(models.Model):
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='authentication_otp_user_idx'),
+            models.Index(fields=['created_at'], name='authentication_otp_created_idx'),
+        ]
+
+    objects = OTPQuerySet.as_manager()
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='user_otp')
     created_at = models.DateTimeField(_('created at'), default=timezone.now)
     token = models.CharField(_('auth token'), max_length=settings.OTP_LENGTH)
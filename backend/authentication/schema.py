@@ -0,0 +1,5 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class CachedJWTAuthenticationScheme(SimpleJWTScheme):
+    target_class = 'backend.authentication.authentication.CachedJWTAuthentication'
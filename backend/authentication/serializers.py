@@ -1,6 +1,7 @@
 from django.conf import settings
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import update_last_login
-from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 from django.utils.translation import gettext_lazy as _
 from rest_framework import serializers, exceptions
 from rest_framework_simplejwt.serializers import TokenObtainSerializer
@@ -10,6 +11,8 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from backend.authentication.models import OTP
 from backend.authentication.token_generator import generate_token
 
+User = get_user_model()
+
 
 class AuthenticationSerializer(TokenObtainSerializer):
     @classmethod
@@ -34,13 +37,15 @@ class CustomTokenObtainPairSerializer(serializers.Serializer):
     }
 
     def validate(self, attrs):
-        otp = OTP.objects.filter(
-            user__username=attrs['username'],
-            created_at__gte=timezone.now() - timezone.timedelta(seconds=settings.OTP_EXPIRES_AFTER)
-        ).latest('created_at')
-        user = otp.user
-
-        if not otp or otp.token != attrs['token'] or not api_settings.USER_AUTHENTICATION_RULE(user):
+        user = User.objects.filter(username=attrs['username']).first()
+        otp = OTP.objects.latest_valid(user) if user else None
+
+        if (
+                not otp or
+                not constant_time_compare(otp.token, attrs['token']) or
+                not api_settings.USER_AUTHENTICATION_RULE(user) or
+                not OTP.objects.consume(otp)
+        ):
             raise exceptions.AuthenticationFailed(
                 self.error_messages['no_active_account'],
                 'no_active_account',
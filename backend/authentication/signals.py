@@ -0,0 +1,15 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from backend.authentication.user_cache import SlimUserCache
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_slim_user(sender, instance, **kwargs):
+    SlimUserCache.invalidate(instance.pk)
+    transaction.on_commit(lambda: SlimUserCache.invalidate(instance.pk))
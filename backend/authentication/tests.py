@@ -0,0 +1,201 @@
+import warnings
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache.backends.base import CacheKeyWarning
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status, exceptions
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from backend.authentication.models import OTP
+from backend.authentication.serializers import AuthenticationSerializer
+from backend.authentication.user_cache import SlimUserCache
+from backend.users.models import User
+from services.rate_limit_service import CacheCounterBackend, get_counter_backend
+
+
+class OTPTokenTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('token_obtain_pair')
+        self.user = User.objects.create_user(username='ayesha', email='ayesha@example.com', password='secret')
+
+    def test_otp_can_only_be_used_once(self):
+        OTP.objects.create(user=self.user, token='AB12CD')
+
+        response = self.client.post(self.url, {'username': 'ayesha', 'token': 'AB12CD'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('access', response.data)
+
+        response = self.client.post(self.url, {'username': 'ayesha', 'token': 'AB12CD'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(OTP.objects.exists())
+
+    def test_only_the_latest_otp_is_accepted(self):
+        OTP.objects.create(user=self.user, token='OLD123', created_at=timezone.now() - timezone.timedelta(seconds=10))
+        OTP.objects.create(user=self.user, token='NEW456')
+
+        response = self.client.post(self.url, {'username': 'ayesha', 'token': 'OLD123'})
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_unknown_user_or_missing_otp_is_rejected(self):
+        response = self.client.post(self.url, {'username': 'nobody', 'token': 'AB12CD'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.post(self.url, {'username': 'ayesha', 'token': 'AB12CD'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_purge_deletes_only_expired_otps(self):
+        expired = timezone.now() - timezone.timedelta(days=1)
+        for __ in range(5):
+            OTP.objects.create(user=self.user, token='AB12CD', created_at=expired)
+        valid = OTP.objects.create(user=self.user, token='AB12CD')
+
+        call_command('purge_expired_otps', batch_size=2, stdout=StringIO())
+
+        self.assertEqual(list(OTP.objects.all()), [valid])
+
+
+@override_settings(OTP_USERNAME_RATE_LIMIT=(2, 60), OTP_IP_RATE_LIMIT=(3, 60))
+class OTPRateLimitTestCase(TestCase):
+    def setUp(self):
+        get_counter_backend().clear()
+        self.client = APIClient()
+        self.url = reverse('otp_email')
+
+    def test_username_is_throttled_before_the_password_is_checked(self):
+        failed = exceptions.AuthenticationFailed()
+        with mock.patch.object(AuthenticationSerializer, 'validate', side_effect=failed) as validate:
+            responses = [
+                self.client.post(self.url, {'username': 'Ayesha', 'password': 'guess'}) for __ in range(3)
+            ]
+
+        self.assertEqual(
+            [response.status_code for response in responses],
+            [status.HTTP_403_FORBIDDEN, status.HTTP_403_FORBIDDEN, status.HTTP_429_TOO_MANY_REQUESTS]
+        )
+        self.assertEqual(validate.call_count, 2)
+        self.assertIn('Retry-After', responses[-1])
+
+    def test_ip_is_throttled_across_usernames(self):
+        statuses = [
+            self.client.post(self.url, {'username': f'user{i}', 'password': 'guess'}).status_code for i in range(4)
+        ]
+
+        self.assertEqual(statuses[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertNotIn(status.HTTP_429_TOO_MANY_REQUESTS, statuses[:-1])
+
+    def test_forwarded_for_header_does_not_reset_the_ip_limit(self):
+        statuses = [
+            self.client.post(
+                self.url, {'username': f'user{i}', 'password': 'guess'}, HTTP_X_FORWARDED_FOR=f'10.0.0.{i}'
+            ).status_code
+            for i in range(4)
+        ]
+
+        self.assertEqual(statuses[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+
+    @override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'NUM_PROXIES': 1})
+    def test_proxy_added_address_is_used_behind_the_configured_proxies(self):
+        # the client wrote the first address, the proxy appended the one it saw
+        statuses = [
+            self.client.post(
+                self.url, {'username': f'user{i}', 'password': 'guess'},
+                HTTP_X_FORWARDED_FOR=f'10.0.0.{i}, 192.0.2.1', REMOTE_ADDR='10.1.1.1'
+            ).status_code
+            for i in range(4)
+        ]
+
+        self.assertEqual(statuses[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_any_username_makes_a_valid_cache_key(self):
+        backend = CacheCounterBackend()
+        backend.clear()
+        with mock.patch('services.rate_limit_service.get_counter_backend', return_value=backend), \
+                warnings.catch_warnings():
+            # what memcached would raise InvalidCacheKey for
+            warnings.simplefilter('error', CacheKeyWarning)
+            statuses = [
+                self.client.post(self.url, {'username': 'A b\x07' * 100, 'password': 'guess'}).status_code
+                for __ in range(3)
+            ]
+
+        self.assertEqual(statuses[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class CachedJWTAuthenticationTestCase(TestCase):
+    def setUp(self):
+        SlimUserCache.clear()
+        self.user = User.objects.create_user(username='ayesha', email='ayesha@example.com', password='secret')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        self.url = reverse('payment_plan-list')
+
+    def test_user_is_served_from_cache(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deactivated_user_is_rejected_after_save(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_full_row_is_loaded_once_on_demand(self):
+        user = SlimUserCache.get_user(self.user.id)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.username, 'ayesha')
+            self.assertEqual(user.email, 'ayesha@example.com')
+            self.assertFalse(user.is_payment_plan_expired)
+
+
+class PasswordRehashTestCase(TestCase):
+    def setUp(self):
+        get_counter_backend().clear()
+        self.client = APIClient()
+        self.url = reverse('otp_email')
+        self.user = User.objects.create_user(username='ayesha', email='ayesha@example.com', password='secret')
+
+    def login(self, password):
+        return self.client.post(self.url, {'username': 'ayesha', 'password': password})
+
+    def test_new_passwords_are_hashed_with_argon2(self):
+        self.assertTrue(self.user.password.startswith('argon2$argon2id$v=19$m=19456,t=2,p=1$'))
+
+    def test_pbkdf2_password_is_rehashed_at_login(self):
+        User.objects.filter(pk=self.user.pk).update(password=make_password('secret', hasher='pbkdf2_sha256'))
+
+        self.assertEqual(self.login('wrong').status_code, status.HTTP_403_FORBIDDEN)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+
+        self.assertEqual(self.login('secret').status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('argon2$'))
+        self.assertTrue(self.user.check_password('secret'))
+
+    def test_password_is_rehashed_when_the_costs_change(self):
+        with override_settings(PASSWORD_ARGON2_TIME_COST=3):
+            self.assertEqual(self.login('secret').status_code, status.HTTP_200_OK)
+            self.user.refresh_from_db()
+            self.assertIn('t=3', self.user.password)
+
+            password = self.user.password
+            self.assertEqual(self.login('secret').status_code, status.HTTP_200_OK)
+            self.user.refresh_from_db()
+            self.assertEqual(self.user.password, password)
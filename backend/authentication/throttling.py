@@ -0,0 +1,45 @@
+from django.conf import settings
+from rest_framework.throttling import BaseThrottle
+
+from services.rate_limit_service import SlidingWindowRateLimiter
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    scope = None
+    rate_setting = None
+
+    def __init__(self):
+        limit, window = getattr(settings, self.rate_setting)
+        self.limiter = SlidingWindowRateLimiter(self.scope, limit, window)
+        self.wait_seconds = None
+
+    def get_identifier(self, request, view):
+        raise NotImplementedError('.get_identifier() must be overridden')
+
+    def allow_request(self, request, view):
+        identifier = self.get_identifier(request, view)
+        if identifier is None:
+            return True
+
+        self.wait_seconds = self.limiter.hit(identifier)
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class OTPUsernameRateThrottle(SlidingWindowThrottle):
+    scope = 'otp_username'
+    rate_setting = 'OTP_USERNAME_RATE_LIMIT'
+
+    def get_identifier(self, request, view):
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        return str(username).lower()[:150] if username else None
+
+
+class OTPIPRateThrottle(SlidingWindowThrottle):
+    scope = 'otp_ip'
+    rate_setting = 'OTP_IP_RATE_LIMIT'
+
+    def get_identifier(self, request, view):
+        return self.get_ident(request)
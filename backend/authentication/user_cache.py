@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+# in model field order, as Model.from_db expects for a partial row
+SLIM_USER_FIELDS = ('id', 'is_active', 'payment_plan_expires_at')
+
+
+class SlimUserCache:
+    """
+    Per process LRU of the few user columns the authentication needs.
+
+    Entries expire after ``JWT_USER_CACHE_TTL`` seconds, which bounds how long
+    another process can serve a user changed elsewhere; the process doing the
+    save drops its entry right away (see ``backend.authentication.signals``).
+    """
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, user_id):
+        now = time.monotonic()
+        with cls._lock:
+            entry = cls._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                cls._entries.move_to_end(user_id)
+                return entry[1]
+
+        values = User.objects.filter(pk=user_id).values_list(*SLIM_USER_FIELDS).first()
+        if values is None:
+            return None
+
+        with cls._lock:
+            cls._entries[user_id] = (now + settings.JWT_USER_CACHE_TTL, values)
+            cls._entries.move_to_end(user_id)
+            while len(cls._entries) > settings.JWT_USER_CACHE_SIZE:
+                cls._entries.popitem(last=False)
+        return values
+
+    @classmethod
+    def invalidate(cls, user_id):
+        with cls._lock:
+            cls._entries.pop(user_id, None)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+
+    @classmethod
+    def get_user(cls, user_id):
+        """
+        Return a ``User`` with only the slim columns loaded. The rest of the row
+        is fetched in a single query the first time any other field is read.
+        """
+        values = cls.get(user_id)
+        if values is None:
+            return None
+
+        user = User.from_db(None, SLIM_USER_FIELDS, values)
+        user.load_deferred_together = True
+        return user
@@ -1,18 +1,21 @@
-from django.core.mail import EmailMessage
-from django.template.loader import render_to_string
+from django.db import transaction
 from rest_framework import status
 from rest_framework.generics import GenericAPIView
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenViewBase
 
-from backend.authentication.exceptions import OTPEmailFailed
 from backend.authentication.models import OTP
 from backend.authentication.serializers import AuthenticationSerializer, CustomTokenObtainPairSerializer
+from backend.authentication.throttling import OTPIPRateThrottle, OTPUsernameRateThrottle
+from backend.emails.models import OutboxEmail
+from backend.emails.rendering import EmailRenderer
 
 
 class OTPEmailAPIView(GenericAPIView):
     permission_classes = ()
     authentication_classes = ()
+    # checked in initial(), before the serializer hashes the password
+    throttle_classes = (OTPIPRateThrottle, OTPUsernameRateThrottle)
     serializer_class = AuthenticationSerializer
 
     def post(self, request, *args, **kwargs):
@@ -21,8 +24,9 @@ class OTPEmailAPIView(GenericAPIView):
         otp = serializer.validated_data['token']
         user = serializer.validated_data['user']
 
-        self.email_otp(user, otp)
-        OTP.objects.create(user=user, token=otp)
+        with transaction.atomic():
+            OTP.objects.create(user=user, token=otp)
+            self.email_otp(user, otp)
 
         response = {
             'message': 'OTP sent to the registered email account'
@@ -31,18 +35,11 @@ class OTPEmailAPIView(GenericAPIView):
 
     def email_otp(self, user, otp):
         mail_subject = 'Matrimony App OTP'
-        message = render_to_string('otp_email.html', {
+        message, html_message = EmailRenderer.render('otp_email', {
             'user': user,
             'token': otp
         })
-        to_email = user.email
-        email = EmailMessage(
-            mail_subject, message, to=[to_email]
-        )
-        try:
-            email.send()
-        except:
-            raise OTPEmailFailed()
+        OutboxEmail.objects.enqueue(mail_subject, message, user.email, html_body=html_message)
 
 
 class CustomTokenObtainPairView(TokenViewBase):
@@ -0,0 +1,23 @@
+from django.db.models import IntegerField, Lookup
+
+
+@IntegerField.register_lookup
+class NotInArray(Lookup):
+    """
+    ``field__not_in_array=ids``, for thousands of ids: they are sent as one
+    array literal, where ``exclude(field__in=ids)`` sends a placeholder and
+    plans a comparison per id. The array goes through a scalar subquery
+    (an InitPlan) so the planner doesn't estimate the selectivity of every
+    id, which took longer than running a page query at 10k ids, and is
+    unnested into a hashed subplan: ``<> ALL`` compares every row with every
+    id, which a search testing thousands of matches paid for.
+    """
+    lookup_name = 'not_in_array'
+    prepare_rhs = False
+
+    def as_sql(self, compiler, connection):
+        lhs, params = self.process_lhs(compiler, connection)
+        return (
+            f'{lhs} NOT IN (SELECT unnest((SELECT %s::bigint[])))',
+            [*params, '{%s}' % ','.join(map(str, self.rhs))],
+        )
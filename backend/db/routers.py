@@ -0,0 +1,60 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+
+class ReplicaReads:
+    """Whether the reads of the current block may go to a replica."""
+
+    def __init__(self):
+        self.pinned = False
+
+
+_replica_reads = ContextVar('replica_reads', default=None)
+
+
+@contextmanager
+def read_from_replica():
+    """
+    Send the reads made inside the block to a replica, when
+    ``REPLICA_DATABASES`` lists any, until the block writes something. The
+    reads following a write go to the primary, which has the write.
+    """
+    state = ReplicaReads()
+    token = _replica_reads.set(state)
+    try:
+        yield state
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Reads go to a random replica inside ``read_from_replica`` blocks, every
+    other query goes to the primary, as do reads inside a transaction.
+    Replicas are never migrated, they follow the primary through replication.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _replica_reads.get()
+        if state is None or state.pinned or not settings.REPLICA_DATABASES:
+            return 'default'
+        if connections['default'].in_atomic_block:
+            return 'default'
+        return random.choice(settings.REPLICA_DATABASES)
+
+    def db_for_write(self, model, **hints):
+        state = _replica_reads.get()
+        if state is not None:
+            state.pinned = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.REPLICA_DATABASES
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from backend.emails.models import OutboxEmail
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('to', 'subject', 'status', 'attempts', 'send_after', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('to', 'subject')
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+
+from backend.emails.rendering import EmailRenderer
+from backend.users.models import User
+
+TEMPLATE_CONTEXTS = {
+    'otp_email': {
+        'token': 'AB12CD',
+    },
+    'acc_active_email': {
+        'activation_url': 'http://example.com/api/users/MQ/b9x2k1-3f1e0c2a9d8b7c6e5f4a3b2c1d0e9f8a/activate',
+    },
+}
+
+
+class Command(BaseCommand):
+    help = 'Measure email template renders per second through the template loader and through EmailRenderer.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        user = User(first_name='Ayesha', username='ayesha', email='ayesha@example.com')
+
+        for name, context in TEMPLATE_CONTEXTS.items():
+            context = {**context, 'user': user}
+
+            loader_rate = self.measure(iterations, lambda: (
+                render_to_string(f'{name}.txt', context), render_to_string(f'{name}.html', context)
+            ))
+            renderer_rate = self.measure(iterations, lambda: EmailRenderer.render(name, context))
+
+            self.stdout.write(
+                f'{name}: render_to_string {loader_rate:,.0f} renders/s, '
+                f'EmailRenderer {renderer_rate:,.0f} renders/s ({renderer_rate / loader_rate:.1f}x)'
+            )
+
+    @staticmethod
+    def measure(iterations, render):
+        render()
+        started = time.perf_counter()
+        for __ in range(iterations):
+            render()
+        return iterations / (time.perf_counter() - started)
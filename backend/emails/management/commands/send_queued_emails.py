@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from backend.emails.worker import OutboxWorker
+from services.metrics_service import MetricsService
+
+
+class Command(BaseCommand):
+    help = 'Deliver the emails queued in the outbox, polling for new ones unless --once is given.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the outbox once and exit.')
+        parser.add_argument('--batch-size', type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE)
+        parser.add_argument(
+            '--interval', type=float, default=settings.EMAIL_OUTBOX_POLL_INTERVAL,
+            help='Seconds to wait when the outbox is empty.'
+        )
+        parser.add_argument('--metrics-port', type=int, help='Expose the SMTP metrics of the worker on this port.')
+        parser.add_argument(
+            '--metrics-address', default='127.0.0.1',
+            help='Address the metrics are served on, set METRICS_TOKEN before opening it to other hosts.'
+        )
+
+    def handle(self, *args, **options):
+        if options['metrics_port']:
+            MetricsService.serve(options['metrics_port'], options['metrics_address'])
+
+        worker = OutboxWorker(batch_size=options['batch_size'])
+        try:
+            while True:
+                processed = worker.drain()
+                if options['once'] and processed < worker.batch_size:
+                    break
+                if not processed:
+                    # let the relay drop an idle session instead of holding it open
+                    worker.close()
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            worker.close()
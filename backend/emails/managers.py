@@ -0,0 +1,13 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboxEmailQuerySet(models.QuerySet):
+    def enqueue(self, subject, body, to, html_body=''):
+        return self.create(subject=subject, body=body, to=to, html_body=html_body)
+
+    def due(self):
+        return self.filter(
+            status=self.model.Status.PENDING,
+            send_after__lte=timezone.now()
+        ).order_by('send_after')
@@ -0,0 +1,18 @@
+# Generated by Django 4.0.2 on 2026-10-19 05:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emails', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxemail',
+            name='html_body',
+            field=models.TextField(blank=True, verbose_name='html body'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from backend.emails.managers import OutboxEmailQuerySet
+
+
+class OutboxEmail(models.Model):
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['send_after'],
+                condition=Q(status='P'),
+                name='emails_outbox_pending_idx'
+            ),
+        ]
+
+    class Status(models.TextChoices):
+        PENDING = 'P', _('Pending')
+        SENT = 'S', _('Sent')
+        FAILED = 'F', _('Failed')
+
+    objects = OutboxEmailQuerySet.as_manager()
+
+    subject = models.CharField(_('subject'), max_length=256)
+    body = models.TextField(_('body'))
+    html_body = models.TextField(_('html body'), blank=True)
+    to = models.EmailField(_('recipient'))
+    status = models.CharField(
+        _('status'),
+        max_length=1,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(_('attempts'), default=0)
+    last_error = models.TextField(_('last error'), blank=True)
+    send_after = models.DateTimeField(_('send after'), default=timezone.now)
+    sent_at = models.DateTimeField(_('sent at'), null=True, blank=True)
+    created_at = models.DateTimeField(_('created at'), default=timezone.now)
+
+    def __str__(self):
+        return f'{self.id} | {self.to} | {self.status}'
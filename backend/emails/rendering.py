@@ -0,0 +1,38 @@
+import threading
+
+from django.template.loader import get_template
+
+
+class EmailRenderer:
+    """
+    Renders the plain text and HTML parts of an email.
+
+    ``<name>.txt`` and ``<name>.html`` are looked up and compiled the first
+    time a template name is used and the compiled templates are reused for
+    the lifetime of the process, so rendering never goes back to the loaders.
+    """
+    _templates = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_templates(cls, name):
+        templates = cls._templates.get(name)
+        if templates is None:
+            with cls._lock:
+                templates = cls._templates.get(name)
+                if templates is None:
+                    templates = cls._templates[name] = (
+                        get_template(f'{name}.txt'),
+                        get_template(f'{name}.html'),
+                    )
+        return templates
+
+    @classmethod
+    def render(cls, name, context):
+        text_template, html_template = cls.get_templates(name)
+        return text_template.render(context).strip(), html_template.render(context)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._templates.clear()
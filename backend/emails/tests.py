@@ -0,0 +1,59 @@
+from unittest import mock
+
+from django.core import mail
+from django.template.loader import get_template
+from django.test import TestCase
+
+from backend.emails.models import OutboxEmail
+from backend.emails.rendering import EmailRenderer
+from backend.emails.worker import OutboxWorker, SMTP_SEND_METRIC
+
+
+class OutboxWorkerTestCase(TestCase):
+    def setUp(self):
+        SMTP_SEND_METRIC.clear()
+
+    def test_due_emails_are_sent_over_one_connection(self):
+        OutboxEmail.objects.enqueue('Subject', 'Body', 'first@example.com', html_body='<p>Body</p>')
+        OutboxEmail.objects.enqueue('Subject', 'Body', 'second@example.com')
+
+        with mock.patch('backend.emails.worker.get_connection', wraps=mail.get_connection) as get_connection:
+            processed = OutboxWorker().drain()
+
+        self.assertEqual(processed, 2)
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual([message.to for message in mail.outbox], [['first@example.com'], ['second@example.com']])
+        self.assertEqual(mail.outbox[0].alternatives, [('<p>Body</p>', 'text/html')])
+        self.assertFalse(OutboxEmail.objects.exclude(status=OutboxEmail.Status.SENT).exists())
+        [sample] = SMTP_SEND_METRIC.collect()
+        self.assertEqual((sample['labels'], sample['count']), ({'result': 'sent'}, 2))
+
+    def test_failed_email_is_retried_later(self):
+        email = OutboxEmail.objects.enqueue('Subject', 'Body', 'first@example.com')
+        worker = OutboxWorker()
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('down')):
+            worker.drain()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.Status.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.last_error, 'down')
+        self.assertGreater(email.send_after, email.created_at)
+        self.assertEqual(worker.drain(), 0)
+
+
+class EmailRendererTestCase(TestCase):
+    def setUp(self):
+        EmailRenderer.clear()
+
+    def test_templates_are_compiled_once(self):
+        context = {'user': {'first_name': 'Ayesha'}, 'token': 'AB12CD'}
+
+        with mock.patch('backend.emails.rendering.get_template', wraps=get_template) as loader:
+            EmailRenderer.render('otp_email', context)
+            text, html = EmailRenderer.render('otp_email', context)
+
+        self.assertEqual(loader.call_count, 2)
+        self.assertIn('AB12CD', text)
+        self.assertIn('<strong>AB12CD</strong>', html)
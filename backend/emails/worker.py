@@ -0,0 +1,89 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from backend.emails.models import OutboxEmail
+from services.metrics_service import MetricsService
+
+logger = logging.getLogger(__name__)
+
+SMTP_SEND_METRIC = MetricsService.histogram(
+    'smtp_send_duration_seconds', 'Time spent handing outbox emails to the SMTP server, connecting included.',
+)
+
+
+class OutboxWorker:
+    """
+    Drains the email outbox over a single SMTP connection.
+
+    Rows are claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` so several
+    workers can run side by side. A failed message is retried with
+    exponential backoff until ``EMAIL_OUTBOX_MAX_ATTEMPTS`` is reached.
+    """
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+        self.connection = None
+
+    def open(self):
+        if self.connection is None:
+            self.connection = get_connection()
+        self.connection.open()
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+    def drain(self):
+        """Send one batch of due emails and return how many were processed."""
+        with transaction.atomic():
+            emails = list(OutboxEmail.objects.due().select_for_update(skip_locked=True)[:self.batch_size])
+            if not emails:
+                return 0
+
+            for email in emails:
+                self.send(email)
+
+        return len(emails)
+
+    def send(self, email):
+        message = EmailMultiAlternatives(email.subject, email.body, to=[email.to])
+        if email.html_body:
+            message.attach_alternative(email.html_body, 'text/html')
+        email.attempts += 1
+
+        started = time.perf_counter()
+        try:
+            self.open()
+            self.connection.send_messages([message])
+        except Exception as e:
+            SMTP_SEND_METRIC.observe(time.perf_counter() - started, result='error')
+            logger.warning('Unable to send outbox email %s: %s', email.id, e)
+            email.last_error = str(e)
+            if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+                email.status = OutboxEmail.Status.FAILED
+            else:
+                email.send_after = timezone.now() + self.backoff(email.attempts)
+            # the SMTP session may be unusable after an error, reconnect for the next message
+            self.close()
+        else:
+            SMTP_SEND_METRIC.observe(time.perf_counter() - started, result='sent')
+            email.status = OutboxEmail.Status.SENT
+            email.sent_at = timezone.now()
+            email.last_error = ''
+
+        email.save(update_fields=['status', 'attempts', 'last_error', 'send_after', 'sent_at'])
+
+    @staticmethod
+    def backoff(attempts):
+        seconds = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+        return timedelta(seconds=min(seconds, settings.EMAIL_OUTBOX_MAX_RETRY_DELAY))
@@ -23,6 +23,7 @@ class EventAdmin(admin.ModelAdmin):
     list_display = ('title', 'start_date', 'end_date', 'created_by', 'is_active')
     list_filter = ('start_date', 'end_date', 'is_active')
     search_fields = ('title',)
+    ordering = ('start_date',)
 
     def save_model(self, request, obj, form, change):
         obj.created_by = request.user
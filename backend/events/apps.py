@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class EventsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend.events'
+
+    def ready(self):
+        from backend.events import signals  # noqa: F401
@@ -1,11 +1,20 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
 from django.db import models
-from django.db.models import Q
+from django.db.models import Q, F, FloatField, OuterRef, Subquery, Count, Value
+from django.db.models.functions import Cast, Coalesce
 from django.utils import timezone
 
 from backend.events.enum import EventStatus
 
+# the text search configuration of the events_event_search_vector trigger
+SEARCH_CONFIG = 'english'
+
 
 class EventQuerySet(models.QuerySet):
+    def active(self):
+        """The events shown by the API, read through the partial indexes on ``is_active``."""
+        return self.filter(is_active=True)
+
     def filter_by_event_status(self, status, **kwargs):
         query = Q(**kwargs)
 
@@ -21,3 +30,40 @@ class EventQuerySet(models.QuerySet):
 
     def filter_pending_events(self, **kwargs):
         return self.filter_by_event_status(EventStatus.PENDING.value, **kwargs)
+
+    def next_end_date(self):
+        """When the next pending one of these events ends and becomes a past event, None without pending events."""
+        return self.filter(end_date__gte=timezone.now()).order_by('end_date').values_list('end_date', flat=True).first()
+
+    def with_interest_counts(self):
+        """
+        Annotate the attend, not attend and ignore counts. A subquery per row
+        rather than a join and a GROUP BY, which counted the answers to every
+        event, past ones included, before the page was cut.
+        """
+        from backend.events.models import UserEvent
+
+        def count(interest_status):
+            return Coalesce(Subquery(
+                UserEvent.objects.filter(
+                    event=OuterRef('pk'), interest_status=interest_status
+                ).order_by().values('event').annotate(count=Count('*')).values('count')
+            ), Value(0))
+
+        return self.annotate(
+            attend_count=count(UserEvent.InterestStatus.ATTEND),
+            not_attend_count=count(UserEvent.InterestStatus.NOT_ATTEND),
+            ignore_count=count(UserEvent.InterestStatus.IGNORE),
+        )
+
+    def search(self, text):
+        """
+        Events matching ``text``, in the web search syntax (quoted phrases, or,
+        -excluded words), with their ``rank``: title matches first, then the
+        detail, then the location.
+        """
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        # double precision, a real rank wouldn't round trip through the pagination cursor
+        return self.filter(search_vector=query).annotate(
+            rank=Cast(SearchRank(F('search_vector'), query), FloatField())
+        )
@@ -0,0 +1,21 @@
+# Generated by Django 4.0.2 on 2026-10-19 05:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start_date', 'id'], name='events_event_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userevent',
+            index=models.Index(fields=['created_at', 'id'], name='events_userevent_created_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.0.2 on 2026-10-19 06:07
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# HTML tags and entities of the rich text detail become spaces
+SEARCH_VECTOR_FUNCTION = '''
+CREATE FUNCTION events_event_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', regexp_replace(
+            coalesce(NEW.detail, ''), '<[^>]*>|&#?[a-zA-Z0-9]+;', ' ', 'g'
+        )), 'B') ||
+        setweight(to_tsvector('english', concat_ws(' ', NEW.city, NEW.state, NEW.country)), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='search vector'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='events_event_search_idx'),
+        ),
+        migrations.RunSQL(
+            sql=[
+                SEARCH_VECTOR_FUNCTION,
+                # saves write every column, the vector is only rebuilt when one it reads is written
+                "CREATE TRIGGER events_event_search_vector BEFORE INSERT OR UPDATE OF title, detail, city, state, "
+                "country, search_vector ON events_event FOR EACH ROW EXECUTE FUNCTION events_event_search_vector()",
+                "UPDATE events_event SET title = title",
+            ],
+            reverse_sql=[
+                "DROP TRIGGER events_event_search_vector ON events_event",
+                "DROP FUNCTION events_event_search_vector()",
+            ],
+        ),
+    ]
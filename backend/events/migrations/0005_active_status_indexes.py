@@ -0,0 +1,30 @@
+# Generated by Django 4.0.2 on 2026-10-19 06:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_search_vector'),
+    ]
+
+    # the new indexes first, the one they replace last
+    operations = [
+        migrations.AlterModelOptions(
+            name='event',
+            options={},
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['start_date', 'id'], name='events_event_active_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['end_date'], name='events_event_active_end_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='event',
+            name='events_event_start_idx',
+        ),
+    ]
@@ -1,6 +1,9 @@
 from ckeditor.fields import RichTextField
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
@@ -11,7 +14,16 @@ User = get_user_model()
 
 class Event(models.Model):
     class Meta:
-        ordering = ['start_date']
+        # the lists order by -start_date themselves, EventQuerySet.active() selects
+        # the rows of the partial indexes: the pending events are a range of the end
+        # date one whatever the number of past events, the others are read newest first
+        indexes = [
+            models.Index(
+                fields=['start_date', 'id'], name='events_event_active_start_idx', condition=Q(is_active=True)
+            ),
+            models.Index(fields=['end_date'], name='events_event_active_end_idx', condition=Q(is_active=True)),
+            GinIndex(fields=['search_vector'], name='events_event_search_idx'),
+        ]
 
     objects = EventQuerySet.as_manager()
 
@@ -24,6 +36,9 @@ class Event(models.Model):
     state = models.CharField(_('state'), max_length=256)
     country = models.CharField(_('country'), max_length=256)
     is_active = models.BooleanField(_('is active'), default=True)
+    # title, detail without its HTML, city, state and country, kept up to date by
+    # the events_event_search_vector trigger, see EventQuerySet.search
+    search_vector = SearchVectorField(_('search vector'), null=True, editable=False)
 
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_events')
     created_at = models.DateTimeField(_('created at'), default=timezone.now)
@@ -36,6 +51,9 @@ class Event(models.Model):
 class UserEvent(models.Model):
     class Meta:
         unique_together = [['event', 'user']]
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='events_userevent_created_idx'),
+        ]
 
     class InterestStatus(models.TextChoices):
         ATTEND = 'A', _('Attend')
@@ -8,7 +8,7 @@ from backend.events.models import Event, UserEvent
 class EventDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Event
-        fields = '__all__'
+        exclude = ['search_vector']
         extra_kwargs = {
             'created_at': {'read_only': True},
             'updated_at': {'read_only': True}
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from backend.events.models import Event, UserEvent
+from services.response_cache_service import DataVersions
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def bump_events_version(sender, **kwargs):
+    DataVersions.bump_on_commit('events')
+
+
+@receiver(post_save, sender=UserEvent)
+@receiver(post_delete, sender=UserEvent)
+def bump_user_events_version(sender, instance, **kwargs):
+    # the lists of the user who answered; the interest counts the other users
+    # see catch up when their entries expire, after RESPONSE_CACHE_TIMEOUT
+    DataVersions.bump_on_commit(f'events:user:{instance.user_id}')
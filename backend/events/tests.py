@@ -0,0 +1,152 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from backend.events.models import Event, UserEvent
+from backend.testing import IndexScanTestMixin
+from backend.users.models import User
+
+
+class EventSearchTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='organizer', email='organizer@example.com', password='secret')
+        now = timezone.now()
+
+        def event(title, detail='', city='Toronto', days=1):
+            return Event.objects.create(
+                title=title, detail=detail, start_date=now + timezone.timedelta(days=days),
+                end_date=now + timezone.timedelta(days=days, hours=2), address='1 Main St',
+                city=city, state='Ontario', country='Canada', created_by=cls.user,
+            )
+
+        cls.in_title = event('Cricket Night')
+        cls.in_detail = event('Evening Meetup', '<p>Watch the <b>cricket</b> final together&nbsp;at the club.</p>')
+        cls.in_city = event('Family Picnic', city='Cricket Hill')
+        cls.past = event('Cricket Match', days=-3)
+        cls.in_markup = event('Poetry Reading', '<a href="/cricket">Readings</a> of the season.')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('event-search')
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [event['id'] for event in response.data['results']]
+
+    def test_title_matches_rank_above_the_detail_and_the_location(self):
+        self.assertEqual(
+            self.search(q='cricket'),
+            [self.in_title.pk, self.past.pk, self.in_detail.pk, self.in_city.pk],
+        )
+
+    def test_detail_is_searched_without_its_markup(self):
+        self.assertEqual(self.search(q='final together'), [self.in_detail.pk])
+        self.assertEqual(self.search(q='season'), [self.in_markup.pk])
+        self.assertEqual(self.search(q='href'), [])
+
+    def test_search_combines_with_the_status_filter(self):
+        self.assertEqual(self.search(q='cricket', status='past'), [self.past.pk])
+        self.assertNotIn(self.past.pk, self.search(q='cricket', status='pending'))
+
+    def test_web_search_syntax(self):
+        self.assertCountEqual(self.search(q='cricket -night -match'), [self.in_detail.pk, self.in_city.pk])
+        self.assertEqual(self.search(q='"cricket night"'), [self.in_title.pk])
+
+    def test_vector_follows_updates(self):
+        self.in_markup.title = 'Cricket Poetry'
+        self.in_markup.save()
+
+        self.assertIn(self.in_markup.pk, self.search(q='cricket'))
+
+    def test_ranked_pages_have_no_gaps_or_duplicates(self):
+        ids = []
+        response = self.client.get(self.url, {'q': 'cricket', 'page_size': 1})
+        while True:
+            ids += [event['id'] for event in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        self.assertEqual(ids, self.search(q='cricket'))
+
+    def test_query_is_required(self):
+        response = self.client.get(self.url, {'q': ' '})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('q', response.data)
+
+
+class EventStatusTestCase(IndexScanTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.other = [
+            User.objects.create_user(username=name, email=f'{name}@example.com', password='secret')
+            for name in ('owner', 'other')
+        ]
+        now = timezone.now()
+
+        def event(title, days, is_active=True):
+            return Event(
+                title=title, start_date=now + timezone.timedelta(days=days),
+                end_date=now + timezone.timedelta(days=days, hours=2), address='1 Main St',
+                city='Toronto', state='Ontario', country='Canada', is_active=is_active, created_by=cls.user,
+            )
+
+        # years of history behind the few upcoming events
+        Event.objects.bulk_create(event(f'Past {days}', -days) for days in range(3, 2003))
+        cls.pending, cls.later, cls.past, cls.inactive = Event.objects.bulk_create([
+            event('Pending', 1), event('Later', 2), event('Past', -1), event('Inactive', 1, is_active=False),
+        ])
+        for event in (cls.pending, cls.past, cls.inactive):
+            UserEvent.objects.create(event=event, user=cls.user, interest_status=UserEvent.InterestStatus.ATTEND)
+        UserEvent.objects.create(event=cls.pending, user=cls.other, interest_status=UserEvent.InterestStatus.ATTEND)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE events_event')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def list(self, url=None, **params):
+        response = self.client.get(url or reverse('event-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [event['id'] for event in response.data['results']]
+
+    def test_pending_and_past_events(self):
+        self.assertEqual(self.list(status='pending'), [self.later.pk, self.pending.pk])
+        self.assertEqual(self.list(status='past')[0], self.past.pk)
+
+    def test_inactive_events_are_left_out(self):
+        self.assertNotIn(self.inactive.pk, self.list())
+        self.assertNotIn(self.inactive.pk, self.list(reverse('user-get-events', kwargs={'pk': self.user.pk})))
+        response = self.client.get(reverse('event-detail', kwargs={'pk': self.inactive.pk}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_user_events_count_every_answer(self):
+        response = self.client.get(reverse('user-get-events', kwargs={'pk': self.user.pk}))
+        [pending, past] = response.data['results']
+
+        self.assertEqual(
+            (pending['id'], pending['attend_count'], pending['interest_status']), (self.pending.pk, 2, 'A')
+        )
+        self.assertEqual((past['id'], past['attend_count']), (self.past.pk, 1))
+
+    def test_lists_read_the_partial_indexes(self):
+        with self.assertIndexScans('events_event') as indexes:
+            self.list(status='pending')
+        # a range of the pending events, the past ones are never read
+        self.assertIn('events_event_active_end_idx', indexes)
+
+        with self.assertIndexScans('events_event') as indexes:
+            self.list()
+            self.list(status='past')
+        self.assertIn('events_event_active_start_idx', indexes)
@@ -1,10 +1,14 @@
+import math
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Q, OuterRef, Subquery, Case, When, Value, CharField, F
+from django.db.models import OuterRef, Subquery, Case, When, Value, CharField, F
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import filters
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import get_object_or_404
-from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.viewsets import ModelViewSet
 
@@ -12,6 +16,8 @@ from backend.events.enum import EventStatus
 from backend.events.models import Event, UserEvent
 from backend.events.serializers import EventDetailSerializer, UserEventSerializer
 from backend.users.serializers import UserBasicSerializer
+from services.queryset_service import QuerysetService
+from services.response_cache_service import cache_response
 
 User = get_user_model()
 
@@ -25,11 +31,31 @@ event_interest_query_parameter = OpenApiParameter(
     description='User Interest Status', required=False, type=str, enum=UserEvent.InterestStatus.values
 )
 
+event_search_query_parameter = OpenApiParameter(
+    name='q', location=OpenApiParameter.QUERY,
+    description='Words to find in the title, detail and location: "quoted phrases", or, -excluded words',
+    required=True, type=str
+)
+
 extend_events_schema = extend_schema(
     parameters=[event_status_query_parameter],
 )
 
 GET_USERS_ACTION = 'get_users'
+SEARCH_ACTION = 'search'
+
+
+def until_an_event_ends(view, request):
+    """Cache the pending and past events until the next one of them ends and changes list."""
+    status = request.query_params.get('status')
+    if not status or status.lower() not in (EventStatus.PAST.value, EventStatus.PENDING.value):
+        return None
+
+    end_date = Event.objects.active().next_end_date()
+    if end_date is None:
+        return None
+    seconds = math.ceil((end_date - timezone.now()).total_seconds())
+    return min(max(seconds, 1), settings.RESPONSE_CACHE_TIMEOUT)
 
 
 class EventsAPIViewSet(ModelViewSet):
@@ -37,7 +63,15 @@ class EventsAPIViewSet(ModelViewSet):
     serializer_class = EventDetailSerializer
     filter_backends = (filters.OrderingFilter,)
     ordering_fields = ('created_at',)
-    ordering = '-created_at'
+    query_budgets = {'list': 2, 'retrieve': 2, GET_USERS_ACTION: 3, SEARCH_ACTION: 2}
+
+    @property
+    def ordering(self):
+        if self.action == GET_USERS_ACTION:
+            return '-created_at'
+        if self.action == SEARCH_ACTION:
+            return ('-rank', '-start_date')
+        return '-start_date'
 
     def get_object(self):
         """
@@ -47,7 +81,8 @@ class EventsAPIViewSet(ModelViewSet):
         queryset lookups.  Eg if objects are referenced using multiple
         keyword arguments in the url conf.
         """
-        queryset = self.filter_queryset(self.get_events_queryset())
+        # the only filter backend is the ordering, which a single lookup doesn't need
+        queryset = self.get_events_queryset()
 
         # Perform the lookup filtering.
         lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
@@ -73,50 +108,25 @@ class EventsAPIViewSet(ModelViewSet):
 
         return super(EventsAPIViewSet, self).get_serializer_class()
 
-    @property
-    def paginator(self):
-        """
-        The paginator instance associated with the view, or `None`.
-        """
-        if not hasattr(self, '_paginator'):
-            if self.pagination_class is None:
-                self._paginator = None
-            elif self.action != GET_USERS_ACTION:
-                self._paginator = CursorPagination()
-            else:
-                self._paginator = self.pagination_class()
-        return self._paginator
-
     def get_queryset(self):
         if self.action == GET_USERS_ACTION:
             return self.get_event_users_queryset()
 
+        if self.action == SEARCH_ACTION:
+            return self.get_search_queryset()
+
         return self.get_events_queryset()
 
     def get_events_queryset(self):
         status = self.request.query_params.get('status')
-        queryset = Event.objects
+        queryset = Event.objects.active().defer('search_vector')
 
         if status and status.lower() == EventStatus.PAST.value:
             queryset = queryset.filter_past_events()
         elif status and status.lower() == EventStatus.PENDING.value:
             queryset = queryset.filter_pending_events()
-        else:
-            queryset = queryset.all()
 
-        queryset = queryset.annotate(
-            attend_count=Count(
-                'user_events',
-                filter=Q(user_events__interest_status=UserEvent.InterestStatus.ATTEND)
-            ),
-            not_attend_count=Count(
-                'user_events',
-                filter=Q(user_events__interest_status=UserEvent.InterestStatus.NOT_ATTEND)
-            ),
-            ignore_count=Count(
-                'user_events',
-                filter=Q(user_events__interest_status=UserEvent.InterestStatus.IGNORE)
-            ),
+        queryset = queryset.with_interest_counts().annotate(
             interest_status=Subquery(
                 UserEvent.objects.filter(
                     event=OuterRef('id'),
@@ -144,6 +154,13 @@ class EventsAPIViewSet(ModelViewSet):
 
         return queryset
 
+    def get_search_queryset(self):
+        text = self.request.query_params.get('q', '').strip()
+        if not text:
+            raise ValidationError({'q': ['This field is required.']})
+
+        return self.get_events_queryset().search(text).order_by('-rank', '-start_date')
+
     def get_event_users_queryset(self):
         interest = self.request.query_params.get('interest')
         queryset = User.objects.filter(
@@ -153,9 +170,11 @@ class EventsAPIViewSet(ModelViewSet):
         if interest:
             queryset = queryset.filter(user_events__interest_status=interest)
 
+        queryset = QuerysetService.only_serializer_fields(queryset, UserBasicSerializer)
         return queryset.order_by('created_at')
 
     @extend_events_schema
+    @cache_response('events', 'events:user:{user}', timeout=until_an_event_ends)
     def list(self, request, *args, **kwargs):
         return super(EventsAPIViewSet, self).list(request, *args, **kwargs)
 
@@ -163,6 +182,13 @@ class EventsAPIViewSet(ModelViewSet):
     def retrieve(self, request, *args, **kwargs):
         return super(EventsAPIViewSet, self).retrieve(request, *args, **kwargs)
 
+    @extend_schema(parameters=[event_search_query_parameter, event_status_query_parameter])
+    @action(detail=False, methods=['get'], url_path='search')
+    @cache_response('events', 'events:user:{user}', timeout=until_an_event_ends)
+    def search(self, request, *args, **kwargs):
+        """The events matching the ``q`` words, the best matches first, with the ``status`` filter of the list."""
+        return super(EventsAPIViewSet, self).list(request, *args, **kwargs)
+
     @extend_schema(
         responses=UserBasicSerializer(many=True),
         parameters=[
@@ -184,7 +210,7 @@ class UserEventsAPIViewSet(ModelViewSet):
     permission_classes = (IsAuthenticated,)
     serializer_class = UserEventSerializer
     queryset = UserEvent.objects.all()
-    pagination_class = CursorPagination
     filter_backends = (filters.OrderingFilter,)
     ordering_fields = ('created_at',)
     ordering = '-created_at'
+    query_budgets = {'list': 2, 'retrieve': 2}
@@ -0,0 +1,221 @@
+import json
+import math
+import platform
+import queue
+import random
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.users.models import User, Sentiment
+
+RESULTS_DIR = Path(settings.BASE_DIR) / 'benchmarks'
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of ``values`` sorted ascending."""
+    if not values:
+        return 0.0
+    return values[max(math.ceil(p / 100 * len(values)) - 1, 0)]
+
+
+class MobileSession:
+    """
+    What a user does when opening the app: their profile, two pages of
+    discovery, a visit and a like on someone else, events, who liked them, their
+    matches, who visited them, notifications and the payment plans.
+    """
+
+    def __init__(self, user_id, other_id, writes=True):
+        self.user_id = user_id
+        self.other_id = other_id
+        self.writes = writes
+        self.client = Client(
+            raise_request_exception=False,
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(User(pk=user_id))}',
+        )
+
+    def requests(self):
+        user = {'pk': self.user_id}
+        yield 'own profile', 'get', reverse('user-detail', kwargs=user), None
+
+        discovery = yield 'discovery', 'get', reverse('user-list'), None
+        next_page = discovery.json().get('next') if discovery.status_code == 200 else None
+        if next_page:
+            yield 'discovery next page', 'get', next_page, None
+
+        yield 'other profile', 'get', reverse('user-detail', kwargs={'pk': self.other_id}), None
+        if self.writes:
+            yield 'profile view', 'post', reverse('profile_views-list'), {
+                'viewer': self.user_id, 'viewee': self.other_id,
+            }
+            yield 'like', 'post', reverse('user_sentiment-list'), {
+                'sentiment_from': self.user_id, 'sentiment_to': self.other_id,
+                'sentiment': Sentiment.SentimentStatus.LIKE,
+            }
+
+        yield 'pending events', 'get', reverse('event-list') + '?status=pending', None
+        yield 'own events', 'get', reverse('user-get-events', kwargs=user), None
+        yield 'liked by', 'get', reverse('user-get-user-sentiments-to', kwargs=user) + '?sentiment=L', None
+        yield 'matches', 'get', reverse('user-get-matches', kwargs=user), None
+        yield 'visited by', 'get', reverse('user-get-profile-visited-by', kwargs=user), None
+        yield 'notifications', 'get', reverse('notifications-list'), None
+        yield 'payment plans', 'get', reverse('payment_plan-list'), None
+
+    def run(self, record):
+        steps = self.requests()
+        response = None
+        while True:
+            try:
+                name, method, url, data = steps.send(response)
+            except StopIteration:
+                return
+
+            started = time.perf_counter()
+            if method == 'get':
+                response = self.client.get(url)
+            else:
+                response = self.client.post(url, data, content_type='application/json')
+            elapsed = time.perf_counter() - started
+
+            query_stats = getattr(response, 'query_stats', None)
+            record(name, elapsed, query_stats.count if query_stats else None, response.status_code)
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay mobile app sessions against the API in process and report throughput, latency '
+        'percentiles and query counts per request, storing the results for comparison between runs.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sessions', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=4, help='Threads replaying sessions side by side.')
+        parser.add_argument('--warmup', type=int, default=10, help='Sessions replayed first and not measured.')
+        parser.add_argument('--read-only', action='store_true', help='Skip the profile view and like writes.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', type=Path, help=f'Result file, a timestamped file in {RESULTS_DIR} by default.')
+        parser.add_argument('--compare', type=Path, help='A previous result file to compare with.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        user_ids = list(User.objects.filter(is_active=True).order_by('id').values_list('id', flat=True)[:10000])
+        if len(user_ids) < 2:
+            raise CommandError('Not enough active users, run generate_synthetic_data first.')
+
+        def sessions(count):
+            return [
+                MobileSession(*rng.sample(user_ids, 2), writes=not options['read_only'])
+                for __ in range(count)
+            ]
+
+        self.replay(sessions(options['warmup']), options['concurrency'], lambda *args: None)
+
+        samples = defaultdict(list)
+        lock = threading.Lock()
+
+        def record(name, elapsed, queries, status_code):
+            with lock:
+                samples[name].append((elapsed, queries, status_code))
+
+        started = time.perf_counter()
+        self.replay(sessions(options['sessions']), options['concurrency'], record)
+        duration = time.perf_counter() - started
+
+        results = self.summarize(samples, duration, options)
+        self.report(results)
+
+        output = options['output'] or RESULTS_DIR / f'{timezone.now():%Y%m%d-%H%M%S}.json'
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2))
+        self.stdout.write(f'Results written to {output}')
+
+        if options['compare']:
+            self.compare(json.loads(options['compare'].read_text()), results)
+
+    @staticmethod
+    def replay(sessions, concurrency, record):
+        pending = queue.SimpleQueue()
+        for session in sessions:
+            pending.put(session)
+
+        def work():
+            try:
+                while True:
+                    try:
+                        session = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    session.run(record)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=work) for __ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    @staticmethod
+    def summarize(samples, duration, options):
+        steps = {}
+        for name, values in samples.items():
+            latencies = sorted(elapsed for elapsed, __, __ in values)
+            queries = [count for __, count, __ in values if count is not None]
+            steps[name] = {
+                'requests': len(values),
+                'errors': sum(1 for __, __, status_code in values if status_code >= 400),
+                'p50_ms': percentile(latencies, 50) * 1000,
+                'p95_ms': percentile(latencies, 95) * 1000,
+                'p99_ms': percentile(latencies, 99) * 1000,
+                'mean_queries': sum(queries) / len(queries) if queries else None,
+                'max_queries': max(queries, default=None),
+            }
+
+        requests = sum(step['requests'] for step in steps.values())
+        return {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'database': connections['default'].vendor,
+            'options': {name: options[name] for name in ('sessions', 'concurrency', 'read_only', 'seed')},
+            'duration_s': duration,
+            'requests': requests,
+            'throughput_rps': requests / duration,
+            'steps': steps,
+        }
+
+    def report(self, results):
+        self.stdout.write(
+            f'{results["requests"]} requests in {results["duration_s"]:.1f}s, '
+            f'{results["throughput_rps"]:.1f} requests/s'
+        )
+        self.stdout.write(f'{"request":<22}{"count":>7}{"errors":>8}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"queries":>9}')
+        for name, step in results['steps'].items():
+            queries = f'{step["mean_queries"]:.1f}' if step['mean_queries'] is not None else '-'
+            self.stdout.write(
+                f'{name:<22}{step["requests"]:>7}{step["errors"]:>8}{step["p50_ms"]:>9.1f}'
+                f'{step["p95_ms"]:>9.1f}{step["p99_ms"]:>9.1f}{queries:>9}'
+            )
+
+    def compare(self, previous, results):
+        self.stdout.write(
+            f'Throughput {previous["throughput_rps"]:.1f} -> {results["throughput_rps"]:.1f} requests/s '
+            f'({results["throughput_rps"] / previous["throughput_rps"] - 1:+.0%})'
+        )
+        for name, step in results['steps'].items():
+            before = previous['steps'].get(name)
+            if before is None:
+                continue
+            self.stdout.write(
+                f'{name:<22}p95 {before["p95_ms"]:.1f} -> {step["p95_ms"]:.1f} ms, '
+                f'queries {before["mean_queries"] or 0:.1f} -> {step["mean_queries"] or 0:.1f}'
+            )
@@ -0,0 +1,222 @@
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+import httpx
+import stripe
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from stripe.http_client import HTTPClient
+
+from backend.management.commands.benchmark_api import percentile
+from backend.payments.models import PaymentPlan
+from backend.payments.stripe_client import AsyncStripeClient
+from backend.users.models import User
+
+PAYMENT_INTENT = {'id': 'pi_3LxRwfCe2X04fekw0abc', 'object': 'payment_intent', 'client_secret': 'secret'}
+
+
+class InFlight:
+    """Stripe calls waiting at the same time, the most seen."""
+
+    def __init__(self):
+        self.current = self.peak = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def exit(self):
+        with self._lock:
+            self.current -= 1
+
+
+class SlowStripeClient(HTTPClient):
+    """Answers every call of the sync views after ``latency`` seconds, as Stripe would."""
+    name = 'benchmark'
+
+    def __init__(self, latency, in_flight):
+        super(SlowStripeClient, self).__init__()
+        self.latency = latency
+        self.in_flight = in_flight
+
+    def request(self, method, url, headers, post_data=None):
+        self.in_flight.enter()
+        try:
+            time.sleep(self.latency)
+        finally:
+            self.in_flight.exit()
+        return json.dumps(PAYMENT_INTENT), 200, {}
+
+
+def slow_stripe_transport(latency, in_flight):
+    """The same for the async views."""
+    async def handler(request):
+        in_flight.enter()
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            in_flight.exit()
+        return httpx.Response(200, json=PAYMENT_INTENT)
+
+    return httpx.MockTransport(handler)
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test the payment intent creation, which waits on Stripe, served by one WSGI worker '
+        'with --threads threads and by one ASGI worker with the async views, each in its own process. '
+        'Stripe answers after --stripe-latency seconds. Reports the throughput, the latencies and the '
+        'most requests in flight at once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=50, help='Requests sent at the same time.')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per deployment.')
+        parser.add_argument('--threads', type=int, default=4, help='Threads of the WSGI worker.')
+        parser.add_argument('--stripe-latency', type=float, default=0.2)
+        # used by the worker processes
+        parser.add_argument('--deployment', choices=('wsgi', 'asgi'), help='Run one deployment and print JSON.')
+        parser.add_argument('--user', type=int)
+        parser.add_argument('--payment-plan', type=int)
+
+    def handle(self, *args, **options):
+        if options['deployment']:
+            return self.run_deployment(options)
+
+        user = User.objects.create_user(
+            username='benchmark-asgi', email='benchmark-asgi@example.com', password='benchmark-asgi'
+        )
+        payment_plan = PaymentPlan.objects.create(title='Benchmark', amount=1000)
+        try:
+            for deployment in ('wsgi', 'asgi'):
+                result = self.spawn(deployment, user, payment_plan, options)
+                self.stdout.write(
+                    f'{deployment.upper():<6}{result["requests_per_second"]:>8.1f} req/s'
+                    f'   p50 {result["p50"] * 1e3:>7.0f} ms   p95 {result["p95"] * 1e3:>7.0f} ms'
+                    f'   {result["in_flight"]:>4} in flight   {result["errors"]} errors'
+                )
+        finally:
+            payment_plan.delete()
+            user.delete()
+
+    def spawn(self, deployment, user, payment_plan, options):
+        command = [
+            sys.executable, str(Path(settings.BASE_DIR) / 'manage.py'), 'benchmark_asgi',
+            '--deployment', deployment, '--user', str(user.pk), '--payment-plan', str(payment_plan.pk),
+            '--clients', str(options['clients']), '--requests', str(options['requests']),
+            '--threads', str(options['threads']), '--stripe-latency', str(options['stripe_latency']),
+        ]
+        # what configurations.asgi sets
+        env = {**os.environ, 'ASYNC_VIEWS': 'true' if deployment == 'asgi' else 'false'}
+        completed = subprocess.run(command, env=env, capture_output=True, text=True)
+        if completed.returncode:
+            raise CommandError(completed.stderr)
+        return json.loads(completed.stdout.splitlines()[-1])
+
+    def run_deployment(self, options):
+        if settings.ASYNC_VIEWS != (options['deployment'] == 'asgi'):
+            raise CommandError('ASYNC_VIEWS must be set for the ASGI deployment only.')
+
+        stripe.api_key = stripe.api_key or 'sk_test_benchmark'
+        in_flight = InFlight()
+        path = reverse('create_payment_intent')
+        body = json.dumps({'payment_plan': options['payment_plan']}).encode()
+        token = str(AccessToken.for_user(User(pk=options['user'])))
+        run = self.run_wsgi if options['deployment'] == 'wsgi' else self.run_asgi
+
+        started = time.perf_counter()
+        latencies, errors = run(path, body, token, in_flight, options)
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        self.stdout.write(json.dumps({
+            'requests_per_second': len(latencies) / elapsed,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'in_flight': in_flight.peak,
+            'errors': errors,
+        }))
+
+    @staticmethod
+    def run_wsgi(path, body, token, in_flight, options):
+        """A worker with a thread per request in progress, the clients wait for a free one."""
+        stripe.default_http_client = SlowStripeClient(options['stripe_latency'], in_flight)
+        application = WSGIHandler()
+        latencies, statuses = [], []
+
+        def request(sent):
+            environ = {
+                'REQUEST_METHOD': 'POST', 'PATH_INFO': path, 'QUERY_STRING': '',
+                'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'wsgi.url_scheme': 'http',
+                'CONTENT_TYPE': 'application/json', 'CONTENT_LENGTH': str(len(body)),
+                'HTTP_AUTHORIZATION': f'Bearer {token}', 'wsgi.input': io.BytesIO(body),
+                'wsgi.errors': sys.stderr,
+            }
+            application(environ, lambda status, headers: statuses.append(status))
+            latencies.append(time.perf_counter() - sent)
+
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            # the clients send their next request when they get an answer
+            for batch in range(0, options['requests'], options['clients']):
+                sent = time.perf_counter()
+                futures = [pool.submit(request, sent) for __ in range(min(options['clients'], options['requests'] - batch))]
+                for future in futures:
+                    future.result()
+        return latencies, sum(not status.startswith('200') for status in statuses)
+
+    @staticmethod
+    def run_asgi(path, body, token, in_flight, options):
+        """A worker with an event loop, the requests wait on Stripe without a thread."""
+        client = AsyncStripeClient(
+            timeout=(settings.STRIPE_CONNECT_TIMEOUT, settings.STRIPE_READ_TIMEOUT),
+            pool_size=options['clients'], transport=slow_stripe_transport(options['stripe_latency'], in_flight),
+        )
+        application = ASGIHandler()
+        latencies, statuses = [], []
+
+        async def request(sent):
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST',
+                'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+                'server': ('testserver', 80), 'client': ('127.0.0.1', 0),
+                'headers': [
+                    (b'content-type', b'application/json'), (b'content-length', str(len(body)).encode()),
+                    (b'authorization', f'Bearer {token}'.encode()),
+                ],
+            }
+
+            async def receive():
+                return {'type': 'http.request', 'body': body, 'more_body': False}
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    statuses.append(message['status'])
+
+            await application(scope, receive, send)
+            latencies.append(time.perf_counter() - sent)
+
+        async def main():
+            for batch in range(0, options['requests'], options['clients']):
+                sent = time.perf_counter()
+                await asyncio.gather(*(
+                    request(sent) for __ in range(min(options['clients'], options['requests'] - batch))
+                ))
+
+        with mock.patch('backend.payments.views.get_async_stripe_client', return_value=client):
+            asyncio.run(main())
+        return latencies, sum(status != 200 for status in statuses)
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the cost of a one query request with a new connection per request, '
+        'a persistent connection and a persistent connection with health checks.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        iterations = options['iterations']
+        settings_dict = dict(connection.settings_dict)
+
+        def query():
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+
+        def new_connection():
+            connection.close()
+            query()
+
+        def persistent_connection():
+            query()
+
+        def health_checked_connection():
+            # what the request_started signal does before each request
+            connection.close_if_unusable_or_obsolete()
+            query()
+
+        try:
+            for name, request, enable_health_checks in (
+                ('new connection per request', new_connection, False),
+                ('persistent connection', persistent_connection, False),
+                ('persistent connection, health checked', health_checked_connection, True),
+            ):
+                connection.settings_dict['CONN_HEALTH_CHECKS'] = enable_health_checks
+                connection.settings_dict['CONN_MAX_AGE'] = None
+                connection.close()
+                query()
+                started = time.perf_counter()
+                for __ in range(iterations):
+                    request()
+                elapsed = (time.perf_counter() - started) / iterations
+                self.stdout.write(f'{name:<40}{elapsed * 1e6:>10,.0f} us/request')
+        finally:
+            connection.settings_dict.clear()
+            connection.settings_dict.update(settings_dict)
+            connection.close()
@@ -0,0 +1,96 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from backend.users.discovery import DiscoveryExclusions
+from backend.users.models import User, Sentiment, ProfileView
+
+PAGE_SIZE = 10
+
+
+def subquery_discoverable_by(user):
+    """The same feed with the exclusions read from the sentiments and profile views in NOT IN subqueries."""
+    return User.objects.filter(is_active=True).exclude(pk=user.pk).exclude(
+        pk__in=Sentiment.objects.filter(
+            sentiment_from=user, sentiment=Sentiment.SentimentStatus.DISLIKE
+        ).values('sentiment_to')
+    ).exclude(
+        pk__in=ProfileView.objects.filter(viewer=user).values('viewee')
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the first discovery page of users excluding many profiles, with the exclusions read in '
+        'NOT IN subqueries, sent as an IN list and sent as the cached array. The dislikes and profile '
+        'views excluding them are rolled back at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help='Users whose feed is fetched.')
+        parser.add_argument('--excluded', type=int, default=10000, help='Profiles each of them disliked or viewed.')
+        parser.add_argument('--iterations', type=int, default=20, help='Pages fetched per user and variant.')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        user_ids = list(User.objects.filter(is_active=True).values_list('id', flat=True))
+        if len(user_ids) <= options['excluded'] + options['users']:
+            raise CommandError('Not enough active users, run generate_synthetic_data first.')
+
+        with transaction.atomic():
+            users = self.exclude_profiles(rng, user_ids, options['users'], options['excluded'])
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE users_sentiment, users_profileview')
+
+            def page(queryset):
+                queryset = queryset.only('id', 'username', 'created_at').order_by('-created_at', '-id')
+                return list(queryset[:PAGE_SIZE + 1])
+
+            variants = (
+                ('NOT IN subqueries', lambda user: page(subquery_discoverable_by(user))),
+                ('cached array, IN list', lambda user: page(
+                    User.objects.filter(is_active=True).exclude(pk__in=DiscoveryExclusions.get(user.pk).tolist())
+                )),
+                ('cached array, not_in_array', lambda user: page(User.objects.discoverable_by(user))),
+            )
+            for user in users:
+                DiscoveryExclusions.get(user.pk)
+            for name, fetch in variants:
+                timings = []
+                for user in users:
+                    fetch(user)
+                    for __ in range(options['iterations']):
+                        started = time.perf_counter()
+                        fetch(user)
+                        timings.append(time.perf_counter() - started)
+                timings.sort()
+                self.stdout.write(
+                    f'{name:<30}p50 {timings[len(timings) // 2] * 1e3:>8.2f} ms'
+                    f'   p95 {timings[int(len(timings) * 0.95)] * 1e3:>8.2f} ms'
+                )
+
+            started = time.perf_counter()
+            for user in users:
+                DiscoveryExclusions.build(user.pk)
+            self.stdout.write(f'{"exclusions built":<30}{(time.perf_counter() - started) / len(users) * 1e3:>12.2f} ms')
+
+            transaction.set_rollback(True)
+        for user in users:
+            DiscoveryExclusions.invalidate(user.pk)
+
+    @staticmethod
+    def exclude_profiles(rng, user_ids, count, excluded):
+        """Half the excluded profiles disliked, half viewed, by each of ``count`` users."""
+        users = [User(pk=pk) for pk in rng.sample(user_ids, count)]
+        for user in users:
+            others = rng.sample([pk for pk in user_ids if pk != user.pk], excluded)
+            half = excluded // 2
+            Sentiment.objects.bulk_create([
+                Sentiment(sentiment_from=user, sentiment_to_id=pk, sentiment=Sentiment.SentimentStatus.DISLIKE)
+                for pk in others[:half]
+            ], ignore_conflicts=True)
+            ProfileView.objects.bulk_create([ProfileView(viewer=user, viewee_id=pk) for pk in others[half:]])
+        return users
@@ -0,0 +1,85 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Subquery, OuterRef
+
+from backend.users.models import User, Sentiment
+
+PAGE_SIZE = 10
+
+
+def subquery_reacted_to(user, sentiment=None):
+    """The sentiment-from list as it was: a join, then the same sentiment again in a correlated subquery."""
+    query = {'sentiments_from__sentiment_to': user}
+    if sentiment:
+        query['sentiments_from__sentiment'] = sentiment
+    return User.objects.filter(**query).annotate(
+        sentiment=Subquery(
+            Sentiment.objects.filter(sentiment_from=OuterRef('id'), sentiment_to=user).values('sentiment')[:1]
+        )
+    ).exclude(sentiment=Sentiment.SentimentStatus.NEUTRAL)
+
+
+def subquery_reacted_by(user, sentiment=None):
+    query = {'sentiments_to__sentiment_from': user}
+    if sentiment:
+        query['sentiments_to__sentiment'] = sentiment
+    return User.objects.filter(**query).annotate(
+        sentiment=Subquery(
+            Sentiment.objects.filter(sentiment_to=OuterRef('id'), sentiment_from=user).values('sentiment')[:1]
+        )
+    ).exclude(sentiment=Sentiment.SentimentStatus.NEUTRAL)
+
+
+def per_row_counts(users):
+    # what UserProfileSentimentSerializer did for every listed user
+    for user in users:
+        user.sentiments_to.filter(sentiment=Sentiment.SentimentStatus.LIKE).count()
+        user.sentiments_to.filter(sentiment=Sentiment.SentimentStatus.DISLIKE).count()
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare the first page of the sentiment lists, with their like and dislike counts, '
+        'built with a correlated subquery and per row counts against UserQuerySet.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='Users whose lists are fetched.')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        user_ids = list(Sentiment.objects.order_by().values_list('sentiment_to', flat=True).distinct()[:100000])
+        if not user_ids:
+            raise CommandError('No sentiments, run generate_synthetic_data first.')
+        self.stdout.write(f'{Sentiment.objects.count():,} sentiments')
+        users = [User(pk=pk) for pk in rng.sample(user_ids, min(options['users'], len(user_ids)))]
+
+        def page(queryset):
+            return list(queryset.only('id', 'username', 'created_at').order_by('-created_at', '-id')[:PAGE_SIZE + 1])
+
+        def subquery(reacted):
+            return lambda user, sentiment: per_row_counts(page(reacted(user, sentiment)))
+
+        def join(reacted):
+            return lambda user, sentiment: page(reacted(user, sentiment).with_sentiment_counts())
+
+        implementations = (
+            ('subquery, sentiment from', subquery(subquery_reacted_to)),
+            ('join, sentiment from', join(User.objects.reacted_to)),
+            ('subquery, sentiment to', subquery(subquery_reacted_by)),
+            ('join, sentiment to', join(User.objects.reacted_by)),
+        )
+        for sentiment in (None, Sentiment.SentimentStatus.LIKE):
+            for name, fetch in implementations:
+                # a few pages first, for both to start with the same pages in the buffer cache
+                for user in users[:10]:
+                    fetch(user, sentiment)
+                started = time.perf_counter()
+                for user in users:
+                    fetch(user, sentiment)
+                elapsed = (time.perf_counter() - started) / len(users)
+                label = f'{name}{", likes" if sentiment else ""}'
+                self.stdout.write(f'{label:<40}{elapsed * 1e3:>10,.2f} ms/page')
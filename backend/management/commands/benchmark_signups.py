@@ -0,0 +1,53 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+
+from backend.users.models import User
+from services.password_hash_service import PasswordHashService
+
+HASHERS = (
+    ('PBKDF2, Django default', {'PASSWORD_HASHERS': ['django.contrib.auth.hashers.PBKDF2PasswordHasher']}),
+    ('Argon2, Django default costs', {'PASSWORD_HASHERS': ['django.contrib.auth.hashers.Argon2PasswordHasher']}),
+    ('Argon2, tuned costs', {}),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure the signups per second and per core with the PBKDF2 hasher Django defaults to, Argon2 '
+        'with its Django costs and Argon2 with the PASSWORD_ARGON2_* costs. The users are rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--signups', type=int, default=50, help='Users created per hasher.')
+
+    def handle(self, *args, **options):
+        signups = options['signups']
+        cores = min(settings.PASSWORD_HASH_WORKERS, os.cpu_count())
+        self.stdout.write(f'{settings.PASSWORD_HASH_WORKERS} hashing threads, {os.cpu_count()} cores')
+
+        for name, hasher_settings in HASHERS:
+            with override_settings(**hasher_settings):
+                # one at a time, as a request does: the signups a core handles
+                with transaction.atomic():
+                    started = time.perf_counter()
+                    for i in range(signups):
+                        User.objects.create_user(
+                            username=f'benchmark{i}', email=f'benchmark{i}@example.com', password=f'password{i}'
+                        )
+                    sequential = signups / (time.perf_counter() - started)
+                    transaction.set_rollback(True)
+
+                # a burst hashed by the whole pool
+                started = time.perf_counter()
+                PasswordHashService.make_passwords(f'password{i}' for i in range(signups))
+                parallel = signups / (time.perf_counter() - started)
+
+            self.stdout.write(
+                f'{name:<32}{sequential:>8.1f} signups/s/core'
+                f'   {parallel:>8.1f} hashes/s   {parallel / cores:>8.1f} hashes/s/core'
+            )
@@ -0,0 +1,214 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from backend.events.models import Event, UserEvent
+from backend.notifications.models import Notification
+from backend.users.models import User, Sentiment, ProfileView, Match
+from services.response_cache_service import DataVersions
+
+FIRST_NAMES = (
+    'Ayesha', 'Fatima', 'Zainab', 'Maryam', 'Sara', 'Hina', 'Amna', 'Noor', 'Priya', 'Anjali', 'Emily', 'Sofia',
+    'Ali', 'Ahmed', 'Hamza', 'Bilal', 'Usman', 'Omar', 'Rahul', 'Arjun', 'Daniel', 'James', 'Yusuf', 'Imran',
+)
+LAST_NAMES = (
+    'Khan', 'Ahmed', 'Malik', 'Sheikh', 'Qureshi', 'Butt', 'Chaudhry', 'Siddiqui', 'Sharma', 'Patel', 'Singh',
+    'Smith', 'Brown', 'Hussain', 'Raza', 'Iqbal', 'Mirza', 'Baig',
+)
+PLACES = (
+    ('Lahore', 'Punjab', 'Pakistan'), ('Karachi', 'Sindh', 'Pakistan'), ('Islamabad', 'Capital', 'Pakistan'),
+    ('Toronto', 'Ontario', 'Canada'), ('Mississauga', 'Ontario', 'Canada'), ('London', 'England', 'United Kingdom'),
+    ('Dubai', 'Dubai', 'United Arab Emirates'), ('Houston', 'Texas', 'United States'),
+)
+QUALIFICATIONS = ('Matric', 'Intermediate', 'Bachelors', 'Masters', 'MBBS', 'PhD', 'Diploma')
+PROFESSIONS = (
+    'doctor', 'engineer', 'teacher', 'accountant', 'pharmacist', 'architect', 'software developer', 'banker',
+    'lawyer', 'nurse', 'designer', 'entrepreneur',
+)
+LANGUAGES = ('Urdu', 'Punjabi', 'Sindhi', 'Pashto', 'English', 'Hindi', 'Gujarati', 'Arabic')
+INTERESTS = (
+    'cooking', 'travelling', 'reading', 'cricket', 'hiking', 'photography', 'poetry', 'volunteering', 'music',
+    'gardening', 'fitness', 'calligraphy', 'movies', 'football',
+)
+TRAITS = (
+    'vegetarian', 'non smoker', 'family oriented', 'religious', 'easy going', 'ambitious', 'caring', 'honest',
+    'humble', 'well educated', 'adventurous', 'calm',
+)
+EVENT_KINDS = ('Meetup', 'Family Gathering', 'Community Dinner', 'Speed Meeting', 'Picnic', 'Seminar')
+
+
+class Command(BaseCommand):
+    help = 'Bulk insert realistic synthetic users, sentiments, profile views, events and notifications.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--sentiments-per-user', type=int, default=20)
+        parser.add_argument('--views-per-user', type=int, default=30)
+        parser.add_argument('--events', type=int, default=100)
+        parser.add_argument('--attendees-per-event', type=int, default=50)
+        parser.add_argument(
+            '--notification-ratio', type=float, default=0.5,
+            help='Share of the sentiments and profile views getting a notification.'
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0, help='Same seed and options, same data.')
+        parser.add_argument('--prefix', default='synthetic', help='Prefix of the generated usernames and emails.')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.notification_ratio = options['notification_ratio']
+        self.notification_count = 0
+        self.now = timezone.now()
+        # hashing is the slowest part of creating users, every synthetic user shares one hash
+        self.password = make_password('password')
+
+        user_ids = []
+        users = self.generate_users(options['users'], options['prefix'])
+        self.insert(User, users, on_batch=lambda created: user_ids.extend(user.id for user in created))
+        if len(user_ids) < 2:
+            return
+
+        self.insert(Sentiment, self.generate_sentiments(user_ids, options['sentiments_per_user']), self.notify)
+        # bulk_create sends no signals either, match the mutual likes in one statement
+        self.stdout.write(f'Match: {Match.objects.backfill()} rows')
+        self.insert(ProfileView, self.generate_profile_views(user_ids, options['views_per_user']), self.notify)
+        self.stdout.write(f'Notification: {self.notification_count} rows')
+
+        events = []
+        self.insert(Event, self.generate_events(user_ids, options['events']), on_batch=events.extend)
+        self.insert(UserEvent, self.generate_user_events(user_ids, events, options['attendees_per_event']))
+
+        # bulk_create sends no signals, drop the cached event lists by hand
+        DataVersions.bump('events')
+
+    def insert(self, model, objects, on_batch=None):
+        """
+        ``bulk_create`` the ``objects`` generator in batches, each in its own
+        transaction, so memory stays flat whatever the row count.
+        """
+        total = 0
+        batch = []
+        for instance in objects:
+            batch.append(instance)
+            if len(batch) == self.batch_size:
+                total += self.insert_batch(model, batch, on_batch)
+                batch = []
+        if batch:
+            total += self.insert_batch(model, batch, on_batch)
+
+        self.stdout.write(f'{model.__name__}: {total} rows')
+        return total
+
+    @staticmethod
+    def insert_batch(model, batch, on_batch):
+        with transaction.atomic():
+            created = model.objects.bulk_create(batch)
+            if on_batch is not None:
+                on_batch(created)
+        return len(created)
+
+    def random_date(self, days_before, days_after=0):
+        return self.now + timedelta(seconds=self.rng.randint(-days_before * 86400, days_after * 86400))
+
+    def generate_users(self, count, prefix):
+        offset = User.objects.filter(username__startswith=prefix).count()
+        for index in range(offset, offset + count):
+            city, __, country = self.rng.choice(PLACES)
+            profession = self.rng.choice(PROFESSIONS)
+            traits = self.rng.sample(TRAITS, 3)
+            interests = self.rng.sample(INTERESTS, 4)
+            yield User(
+                username=f'{prefix}{index}',
+                email=f'{prefix}{index}@example.com',
+                password=self.password,
+                first_name=self.rng.choice(FIRST_NAMES),
+                last_name=self.rng.choice(LAST_NAMES),
+                gender=self.rng.choice((User.Gender.MALE, User.Gender.FEMALE)),
+                religion=self.rng.choice(User.Religion.values),
+                marital_status=self.rng.choices(User.MaritalStatus.values, weights=(85, 2, 10, 3))[0],
+                looking_for=self.rng.choice(User.LookingForStatus.values),
+                blood_group=self.rng.choice(User.BloodGroup.values),
+                date_of_birth=(self.now - timedelta(days=self.rng.randint(20 * 365, 45 * 365))).date(),
+                city=city,
+                country=country,
+                mother_tongue=self.rng.choice(LANGUAGES),
+                height=self.rng.randint(150, 195),
+                annual_income=self.rng.randrange(0, 200000, 1000),
+                highest_qualification=self.rng.choice(QUALIFICATIONS),
+                designation=profession,
+                is_active=self.rng.random() < 0.95,
+                about_self=f'I am a {traits[0]} and {traits[1]} {profession} living in {city}.',
+                about_family=f'A {traits[2]} family of {self.rng.randint(3, 9)} from {country}.',
+                about_partner=f'Looking for someone {self.rng.choice(TRAITS)} who enjoys {interests[0]}.',
+                about_likes=', '.join(interests),
+                about_dislikes=self.rng.choice(('smoking', 'dishonesty', 'rudeness', 'laziness')),
+                about_lifestyle=f'{self.rng.choice(TRAITS).capitalize()}, enjoys {interests[1]} and {interests[2]}.',
+                created_at=self.random_date(365),
+            )
+
+    def generate_sentiments(self, user_ids, per_user):
+        statuses = Sentiment.SentimentStatus.values
+        for user_id in user_ids:
+            targets = self.rng.sample(user_ids, min(per_user + 1, len(user_ids)))
+            # unique per (from, to) pair, never about oneself
+            for target_id in [target_id for target_id in targets if target_id != user_id][:per_user]:
+                yield Sentiment(
+                    sentiment_from_id=user_id,
+                    sentiment_to_id=target_id,
+                    sentiment=self.rng.choices(statuses, weights=(60, 25, 15))[0],
+                    created_at=self.random_date(180),
+                )
+
+    def generate_profile_views(self, user_ids, per_user):
+        for user_id in user_ids:
+            for __ in range(per_user):
+                viewee_id = self.rng.choice(user_ids)
+                if viewee_id != user_id:
+                    yield ProfileView(viewer_id=user_id, viewee_id=viewee_id, created_at=self.random_date(90))
+
+    def notify(self, objects):
+        """Notify the users on the receiving end of a share of the sentiments or profile views just inserted."""
+        notifications = []
+        for instance in objects:
+            if self.rng.random() >= self.notification_ratio:
+                continue
+            if isinstance(instance, Sentiment):
+                user_id, content = instance.sentiment_to_id, 'Someone reacted to your profile'
+            else:
+                user_id, content = instance.viewee_id, 'Someone viewed your profile'
+            notifications.append(Notification(
+                user_id=user_id, content=content, content_object=instance, created_at=instance.created_at
+            ))
+        self.notification_count += len(Notification.objects.bulk_create(notifications))
+
+    def generate_events(self, user_ids, count):
+        for __ in range(count):
+            city, state, country = self.rng.choice(PLACES)
+            start_date = self.random_date(365, 90)
+            yield Event(
+                title=f'{city} {self.rng.choice(EVENT_KINDS)}',
+                detail=f'<p>Join us in {city} for an evening of {self.rng.choice(INTERESTS)}.</p>',
+                start_date=start_date,
+                end_date=start_date + timedelta(hours=self.rng.randint(2, 48)),
+                address=f'{self.rng.randint(1, 999)} Main Street',
+                city=city,
+                state=state,
+                country=country,
+                is_active=self.rng.random() < 0.9,
+                created_by_id=self.rng.choice(user_ids),
+                created_at=start_date - timedelta(days=self.rng.randint(7, 60)),
+            )
+
+    def generate_user_events(self, user_ids, events, attendees_per_event):
+        statuses = UserEvent.InterestStatus.values
+        for event in events:
+            for user_id in self.rng.sample(user_ids, min(attendees_per_event, len(user_ids))):
+                yield UserEvent(
+                    event=event, user_id=user_id, interest_status=self.rng.choice(statuses),
+                    created_at=event.created_at + timedelta(days=self.rng.randint(0, 7)),
+                )
@@ -0,0 +1,215 @@
+import asyncio
+import logging
+import time
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.conf import settings
+
+from backend.db.routers import read_from_replica
+from services.metrics_service import MetricsService
+from services.query_stats_service import record_queries
+
+logger = logging.getLogger('backend.sql')
+
+REQUEST_DURATION_METRIC = MetricsService.histogram(
+    'http_request_duration_seconds', 'Time spent serving requests, by view and action.',
+)
+QUERY_COUNT_METRIC = MetricsService.histogram(
+    'http_request_db_queries', 'Database statements executed per request.',
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+QUERY_DURATION_METRIC = MetricsService.histogram(
+    'http_request_db_duration_seconds', 'Time spent in the database per request.',
+)
+
+
+def get_endpoint(request):
+    """
+    The view class and action that served ``request`` and the query budget it
+    declares in ``query_budgets``, e.g. ``('UserAPIViewSet.list', 4)``.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved', None
+
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is None:
+        return match.view_name or match._func_path, None
+
+    actions = getattr(match.func, 'actions', None)
+    action = actions.get(request.method.lower()) if actions else request.method.lower()
+    budget = getattr(view_class, 'query_budgets', {}).get(action)
+    return f'{view_class.__name__}.{action}', budget
+
+
+class HybridMiddleware:
+    """
+    Middleware running in the mode of the handler it wraps: under ASGI the
+    chain stays async and an ``AsyncAPIView`` waits without a thread, a sync
+    middleware would run the rest of the chain in one until it answers.
+    Subclasses implement ``__call__`` and its coroutine twin ``__acall__``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        raise NotImplementedError
+
+    async def __acall__(self, request):
+        raise NotImplementedError
+
+
+class QueryInstrumentationMiddleware(HybridMiddleware):
+    """
+    Counts and times the SQL issued while serving a request and groups it by
+    fingerprint to surface repeated queries.
+
+    The numbers go to the ``http_request_db_*`` metrics, to ``X-DB-*``
+    response headers when ``QUERY_STATS_HEADERS`` is set and to the
+    ``backend.sql`` logger when ``QUERY_STATS_LOG`` is set. A request going
+    over the query budget of its action is always logged as a warning.
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        with record_queries() as stats:
+            response = self.get_response(request)
+        return self.report(request, response, stats)
+
+    async def __acall__(self, request):
+        # the execute wrappers are per thread like the connections: they are added in the
+        # thread the ORM calls of the request share, thread sensitive ones, and removed there
+        recording = record_queries()
+        stats = await sync_to_async(recording.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(recording.__exit__)(None, None, None)
+        return self.report(request, response, stats)
+
+    @staticmethod
+    def report(request, response, stats):
+        endpoint, budget = get_endpoint(request)
+        response.query_stats = stats
+        response.query_endpoint = endpoint
+        response.query_budget = budget
+
+        QUERY_COUNT_METRIC.observe(stats.count, endpoint=endpoint)
+        QUERY_DURATION_METRIC.observe(stats.duration, endpoint=endpoint)
+
+        if settings.QUERY_STATS_HEADERS:
+            response['X-DB-Query-Count'] = stats.count
+            response['X-DB-Duration-Ms'] = f'{stats.duration * 1000:.1f}'
+            response['X-DB-Duplicate-Queries'] = sum(count - 1 for __, count in stats.duplicates)
+            if budget is not None:
+                response['X-DB-Query-Budget'] = budget
+
+        over_budget = budget is not None and stats.count > budget
+        if over_budget or settings.QUERY_STATS_LOG:
+            logger.log(
+                logging.WARNING if over_budget else logging.INFO,
+                'endpoint=%s status=%s queries=%d budget=%s duration_ms=%.1f duplicates=%d',
+                endpoint, response.status_code, stats.count, budget, stats.duration * 1000, len(stats.duplicates),
+                extra={
+                    'endpoint': endpoint,
+                    'status_code': response.status_code,
+                    'queries': stats.count,
+                    'query_budget': budget,
+                    'db_duration': stats.duration,
+                    'duplicate_queries': stats.duplicates[:5],
+                },
+            )
+        return response
+
+
+class RequestMetricsMiddleware(HybridMiddleware):
+    """
+    Records the latency of every request in ``http_request_duration_seconds``,
+    keyed by view class and action, method and status code.
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        started = time.perf_counter()
+        return self.observe(request, self.get_response(request), started)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        return self.observe(request, await self.get_response(request), started)
+
+    @staticmethod
+    def observe(request, response, started):
+        endpoint, __ = get_endpoint(request)
+        REQUEST_DURATION_METRIC.observe(
+            time.perf_counter() - started,
+            endpoint=endpoint, method=request.method, status=str(response.status_code),
+        )
+        return response
+
+
+class ReplicaReadMiddleware(HybridMiddleware):
+    """
+    Serve the reads of ``GET`` and ``HEAD`` requests from the read replicas,
+    with read-your-writes consistency for the client that wrote.
+
+    A request that writes sets the ``REPLICA_PIN_COOKIE`` cookie, and the
+    client's reads go to the primary until it expires ``REPLICA_STICKINESS``
+    seconds later, by which time the replicas have caught up. Within a
+    request, the reads following a write go to the primary as well.
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        if request.method not in ('GET', 'HEAD'):
+            return self.pin(self.get_response(request))
+
+        if self.is_pinned(request):
+            return self.get_response(request)
+
+        with read_from_replica() as replica_reads:
+            response = self.get_response(request)
+        if replica_reads.pinned:
+            self.pin(response)
+        return response
+
+    async def __acall__(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return self.pin(await self.get_response(request))
+
+        if self.is_pinned(request):
+            return await self.get_response(request)
+
+        # a context variable, sync_to_async copies it to the threads running the ORM
+        with read_from_replica() as replica_reads:
+            response = await self.get_response(request)
+        if replica_reads.pinned:
+            self.pin(response)
+        return response
+
+    @staticmethod
+    def is_pinned(request):
+        try:
+            return float(request.COOKIES.get(settings.REPLICA_PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    @staticmethod
+    def pin(response):
+        stickiness = settings.REPLICA_STICKINESS
+        response.set_cookie(
+            settings.REPLICA_PIN_COOKIE, str(time.time() + stickiness),
+            max_age=stickiness, httponly=True, samesite='Lax',
+        )
+        return response
@@ -0,0 +1,20 @@
+# Generated by Django 4.0.2 on 2026-10-19 05:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('notifications', '0002_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='content_type',
+            field=models.ForeignKey(limit_choices_to={'model__in': ('profileview', 'sentiment', 'match')}, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype'),
+        ),
+    ]
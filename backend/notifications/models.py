@@ -13,7 +13,7 @@ class Notification(models.Model):
         ContentType,
         on_delete=models.CASCADE,
         limit_choices_to={
-            "model__in": ('profileview', 'sentiment')
+            "model__in": ('profileview', 'sentiment', 'match')
         }
     )
     object_id = models.PositiveIntegerField()
@@ -24,6 +24,7 @@ class Notification(models.Model):
     class Meta:
         indexes = [
             models.Index(fields=["content_type", "object_id"]),
+            models.Index(fields=["user", "created_at", "id"], name="notifications_user_created_idx"),
         ]
 
     def __str__(self):
@@ -2,15 +2,16 @@ from generic_relations.relations import GenericRelatedField
 from rest_framework import serializers
 
 from backend.notifications.models import Notification
-from backend.users.models import ProfileView, Sentiment
-from backend.users.serializers import ProfileViewSerializer, SentimentSerializer
+from backend.users.models import ProfileView, Sentiment, Match
+from backend.users.serializers import ProfileViewSerializer, SentimentSerializer, MatchSerializer
 
 
 class NotificationSerializer(serializers.ModelSerializer):
     content_type = serializers.CharField(source='content_type.model')
     content_object = GenericRelatedField({
         ProfileView: ProfileViewSerializer(),
-        Sentiment: SentimentSerializer()
+        Sentiment: SentimentSerializer(),
+        Match: MatchSerializer(),
     })
 
     class Meta:
@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+from django.test import TestCase, AsyncRequestFactory, override_settings
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.notifications.models import Notification
+from backend.notifications.views import AsyncNotificationPollView
+from backend.users.models import User, ProfileView
+
+
+@override_settings(NOTIFICATION_POLL_TIMEOUT=0.2, NOTIFICATION_POLL_INTERVAL=0.05)
+class NotificationPollTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='viewee', email='viewee@example.com', password='secret')
+        self.other = User.objects.create_user(username='viewer', email='viewer@example.com', password='secret')
+        view = ProfileView.objects.create(viewer=self.other, viewee=self.user)
+        self.notifications = [
+            Notification.objects.create(user=self.user, content='viewed', content_object=view) for __ in range(2)
+        ]
+        Notification.objects.create(user=self.other, content='not theirs', content_object=view)
+        self.factory = AsyncRequestFactory()
+
+    async def poll(self, after):
+        request = self.factory.get(
+            '/', {'after': after}, authorization=f'Bearer {AccessToken.for_user(self.user)}'
+        )
+        response = await AsyncNotificationPollView.as_view()(request)
+        return response.status_code, json.loads(response.content)
+
+    async def test_notifications_after_the_id_are_returned(self):
+        status_code, data = await self.poll(self.notifications[0].pk)
+
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertEqual([notification['id'] for notification in data['results']], [self.notifications[1].pk])
+        self.assertEqual(data['results'][0]['content_type'], 'profileview')
+
+    async def test_poll_times_out_without_new_notifications(self):
+        status_code, data = await self.poll(self.notifications[1].pk)
+
+        self.assertEqual((status_code, data), (status.HTTP_200_OK, {'results': []}))
+
+    async def test_invalid_id_is_rejected(self):
+        status_code, data = await self.poll('latest')
+
+        self.assertEqual(status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('after', data)
+
+    def test_view_is_served_as_a_coroutine(self):
+        # the handlers await it, instead of running it in a thread
+        self.assertTrue(asyncio.iscoroutinefunction(AsyncNotificationPollView.as_view()))
@@ -1,6 +1,8 @@
+from django.conf import settings
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
-from backend.notifications.views import NotificationAPIViewSet
+from backend.notifications.views import NotificationAPIViewSet, AsyncNotificationPollView
 
 APP_BASE_URL = 'notifications'
 
@@ -8,3 +10,11 @@ router = DefaultRouter()
 router.register(APP_BASE_URL, NotificationAPIViewSet, basename='notifications')
 
 urlpatterns = router.urls
+
+if settings.ASYNC_VIEWS:
+    # before the router's detail route, which would take poll for a pk
+    urlpatterns.insert(0, path(
+        APP_BASE_URL + '/poll/',
+        AsyncNotificationPollView.as_view(),
+        name='notifications_poll',
+    ))
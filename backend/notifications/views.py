@@ -1,9 +1,17 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from rest_framework import exceptions
 from rest_framework.mixins import RetrieveModelMixin, ListModelMixin
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.settings import api_settings
 from rest_framework.viewsets import GenericViewSet
 
 from backend.notifications.models import Notification
 from backend.notifications.serializers import NotificationSerializer
+from backend.views import AsyncAPIView
 
 
 class NotificationAPIViewSet(
@@ -14,7 +22,43 @@ class NotificationAPIViewSet(
     permission_classes = (IsAuthenticated,)
     queryset = Notification.objects
     serializer_class = NotificationSerializer
+    # the notifications, then their sentiments, profile views and matches
+    query_budgets = {'list': 5, 'retrieve': 3}
 
     def get_queryset(self):
-        queryset = self.queryset.filter(user=self.request.user).select_related('content_type')
+        # one query per content type for the related sentiments, profile views and matches
+        queryset = self.queryset.filter(user=self.request.user).select_related('content_type').prefetch_related(
+            'content_object'
+        )
         return queryset.order_by('-created_at')
+
+
+class AsyncNotificationPollView(AsyncAPIView):
+    """
+    Long polling for the notifications created after the ``after`` id, oldest
+    first: answers as soon as there are some, or with none after
+    ``NOTIFICATION_POLL_TIMEOUT`` seconds, checking every
+    ``NOTIFICATION_POLL_INTERVAL`` seconds. Served under ASGI only, a waiting
+    client holds no thread there.
+    """
+
+    async def get(self, request):
+        try:
+            after = int(request.GET.get('after', 0))
+        except ValueError:
+            raise exceptions.ValidationError({'after': ['A valid integer is required.']})
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.NOTIFICATION_POLL_TIMEOUT
+        while True:
+            notifications = await sync_to_async(self.get_notifications)(request, after)
+            if notifications or loop.time() >= deadline:
+                return JsonResponse({'results': notifications})
+            await asyncio.sleep(settings.NOTIFICATION_POLL_INTERVAL)
+
+    @staticmethod
+    def get_notifications(request, after):
+        queryset = Notification.objects.filter(user=request.user, id__gt=after).select_related(
+            'content_type'
+        ).prefetch_related('content_object').order_by('id')[:api_settings.PAGE_SIZE]
+        return NotificationSerializer(queryset, many=True, context={'request': request}).data
@@ -0,0 +1,136 @@
+import json
+from base64 import b64decode, b64encode
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError, ImproperlyConfigured
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset ("seek") pagination over the ordering of the paginated queryset.
+
+    The primary key is appended to the ordering as a tie-breaker, so any sort
+    key works, annotations included, as long as it is never NULL. The cursor
+    holds the sort key values of the first or last row of the page. Every page
+    is a ``WHERE (keys) < (cursor) ORDER BY keys LIMIT n`` that an index on
+    the same columns can answer, and no ``COUNT(*)`` is ever issued.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [self.get_field(queryset, key) for key in self.ordering]
+        values, reverse = self.decode_cursor(request)
+
+        ordering = [self.invert(key) for key in self.ordering] if reverse else self.ordering
+        queryset = self.load_sort_keys(queryset).order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self.get_seek_filter(ordering, values))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+
+        self.has_next = has_more if not reverse else True
+        self.has_previous = values is not None if not reverse else has_more
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+        if any(not isinstance(key, str) for key in ordering):
+            raise ImproperlyConfigured('KeysetPagination only supports field name orderings.')
+
+        ordering = [key for key in ordering if key.lstrip('-') not in ('pk', queryset.model._meta.pk.attname)]
+        descending = ordering[0].startswith('-') if ordering else True
+        return ordering + ['-pk' if descending else 'pk']
+
+    def load_sort_keys(self, queryset):
+        """Make sure ``only()``/``defer()`` kept the sort keys, the cursor reads them from the rows."""
+        field_names, defer = queryset.query.deferred_loading
+        if not field_names:
+            return queryset
+
+        names = {key.lstrip('-') for key in self.ordering} - set(queryset.query.annotations) - {'pk'}
+        if defer:
+            return queryset.defer(None).defer(*(field_names - names))
+        return queryset.only(*(field_names | names))
+
+    @staticmethod
+    def get_field(queryset, key):
+        name = key.lstrip('-')
+        if name in queryset.query.annotations:
+            return queryset.query.annotations[name].output_field
+        if name == 'pk':
+            return queryset.model._meta.pk
+        return queryset.model._meta.get_field(name)
+
+    @staticmethod
+    def invert(key):
+        return key[1:] if key.startswith('-') else '-' + key
+
+    @staticmethod
+    def get_seek_filter(ordering, values):
+        """
+        ``(a, b) > (x, y)`` spelled as ``a >= x AND (a > x OR (a = x AND b > y))``,
+        the leading bound lets the planner range scan the index.
+        """
+        keys = [(key.lstrip('-'), 'lt' if key.startswith('-') else 'gt') for key in ordering]
+        conditions = []
+        for position, (name, lookup) in enumerate(keys):
+            equal = {keys[index][0]: values[index] for index in range(position)}
+            conditions.append(Q(**equal, **{f'{name}__{lookup}': values[position]}))
+
+        first_name, first_lookup = keys[0]
+        return Q(**{f'{first_name}__{first_lookup}e': values[0]}) & reduce(or_, conditions)
+
+    def get_position(self, instance):
+        return [getattr(instance, key.lstrip('-')) for key in self.ordering]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor((self.get_position(self.page[-1]), False))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor((self.get_position(self.page[0]), True))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            values, reverse = json.loads(b64decode(encoded.encode('ascii')).decode('utf-8'))
+            if len(values) != len(self.fields):
+                raise ValueError
+            values = [field.to_python(value) for field, value in zip(self.fields, values)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return values, bool(reverse)
+
+    @staticmethod
+    def encode_value(value):
+        # full precision, DjangoJSONEncoder truncates datetimes to milliseconds
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return str(value)
+
+    def encode_cursor(self, cursor):
+        encoded = b64encode(json.dumps(cursor, default=self.encode_value).encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class PaymentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'backend.payments'
+
+    def ready(self):
+        from backend.payments import signals  # noqa: F401
+        from backend.payments.stripe_client import configure_stripe
+
+        configure_stripe()
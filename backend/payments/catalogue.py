@@ -0,0 +1,76 @@
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max
+
+from backend.payments.models import PaymentPlan
+from backend.payments.serializers import PaymentPlanSerializer
+from services.response_cache_service import DataVersions
+
+
+class CatalogueEntry:
+    def __init__(self, plans, etag, last_modified, version, expires_at):
+        self.plans = plans
+        self.etag = etag
+        self.last_modified = last_modified
+        self.version = version
+        self.expires_at = expires_at
+
+
+class PaymentPlanCatalogue:
+    """
+    Process wide cache of the active payment plans.
+
+    The catalogue is built once from the database and kept in memory until a
+    ``PaymentPlan`` is saved or deleted (see ``backend.payments.signals``).
+    Other worker processes notice the write through the ``payment_plans`` data
+    version of the shared response cache; ``PAYMENT_PLAN_CATALOGUE_TTL`` bounds
+    staleness when that cache is local to each process.
+    """
+    _lock = threading.Lock()
+    _entry = None
+
+    @classmethod
+    def get(cls):
+        version, = DataVersions.get('payment_plans')
+        entry = cls._entry
+        if cls._is_fresh(entry, version):
+            return entry
+
+        with cls._lock:
+            entry = cls._entry
+            if not cls._is_fresh(entry, version):
+                entry = cls._entry = cls._build(version)
+        return entry
+
+    @staticmethod
+    def _is_fresh(entry, version):
+        return entry is not None and entry.version == version and entry.expires_at > time.monotonic()
+
+    @classmethod
+    def invalidate(cls):
+        cls._entry = None
+
+    @classmethod
+    def _build(cls, version):
+        queryset = PaymentPlan.objects.filter(is_active=True).order_by('amount', 'created_at')
+        plans = PaymentPlanSerializer(queryset, many=True).data
+        plans = [dict(plan) for plan in plans]
+
+        content = json.dumps(plans, cls=DjangoJSONEncoder, sort_keys=True).encode()
+        etag = '"%s"' % hashlib.sha1(content).hexdigest()
+
+        # inactive plans are included so deactivating a plan moves the date forward
+        last_modified = PaymentPlan.objects.aggregate(last_modified=Max('updated_at'))['last_modified']
+
+        return CatalogueEntry(
+            plans=plans,
+            etag=etag,
+            last_modified=last_modified,
+            version=version,
+            expires_at=time.monotonic() + settings.PAYMENT_PLAN_CATALOGUE_TTL,
+        )
@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from backend.payments.catalogue import PaymentPlanCatalogue
+from backend.payments.models import PaymentPlan
+from services.response_cache_service import DataVersions
+
+
+@receiver(post_save, sender=PaymentPlan)
+@receiver(post_delete, sender=PaymentPlan)
+def invalidate_payment_plan_catalogue(sender, **kwargs):
+    PaymentPlanCatalogue.invalidate()
+    # a concurrent request may rebuild from the pre-commit state, drop it again once committed
+    transaction.on_commit(PaymentPlanCatalogue.invalidate)
+    # other processes drop their catalogue when they see the new version
+    DataVersions.bump_on_commit('payment_plans')
@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import re
+import time
+import weakref
+from functools import lru_cache
+from urllib.parse import urlsplit, urlencode
+
+import httpx
+import requests
+import stripe
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from stripe.api_requestor import APIRequestor, _api_encode
+from stripe.http_client import HTTPClient, RequestsClient
+from stripe.util import convert_to_stripe_object
+
+from services.metrics_service import MetricsService
+
+STRIPE_REQUEST_METRIC = 'stripe_request_duration_seconds'
+STRIPE_OBJECT_ID = re.compile(r'/[a-z]{2,5}_[A-Za-z0-9]{14,}')
+
+MetricsService.histogram(STRIPE_REQUEST_METRIC, 'Latency of HTTP requests made to the Stripe API.')
+
+
+class PooledRequestsClient(RequestsClient):
+    """
+    Stripe HTTP client keeping a pooled keep-alive session per thread and
+    recording the latency of every request attempt, retries included.
+    """
+
+    def __init__(self, timeout, pool_size, **kwargs):
+        super(PooledRequestsClient, self).__init__(timeout=timeout, **kwargs)
+        self._pool_size = pool_size
+
+    def request(self, method, url, headers, post_data=None):
+        if getattr(self._thread_local, 'session', None) is None:
+            self._thread_local.session = self.create_session()
+
+        started = time.perf_counter()
+        status_code = 'error'
+        try:
+            content, status_code, response_headers = super(PooledRequestsClient, self).request(
+                method, url, headers, post_data
+            )
+            return content, status_code, response_headers
+        finally:
+            MetricsService.observe(
+                STRIPE_REQUEST_METRIC, time.perf_counter() - started,
+                method=method.upper(), path=STRIPE_OBJECT_ID.sub('/:id', urlsplit(url).path),
+                status=str(status_code)
+            )
+
+    def create_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_size)
+        session.mount('https://', adapter)
+        return session
+
+
+class AsyncStripeClient(HTTPClient):
+    """
+    Stripe HTTP client for the async views, over an httpx connection pool per
+    event loop. Requests are encoded, retried and their errors raised as the
+    stripe library does, and their latency recorded like
+    ``PooledRequestsClient`` records it.
+    """
+    name = 'httpx'
+
+    def __init__(self, timeout, pool_size, transport=None, **kwargs):
+        super(AsyncStripeClient, self).__init__(**kwargs)
+        connect_timeout, read_timeout = timeout
+        self._timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self._limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self._transport = transport
+        # the connections of a pool belong to the loop they were opened in
+        self._clients = weakref.WeakKeyDictionary()
+
+    def get_client(self):
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = httpx.AsyncClient(
+                timeout=self._timeout, limits=self._limits, transport=self._transport
+            )
+        return client
+
+    async def request_object(self, method, path, params=None, idempotency_key=None):
+        """
+        Call the API, ``request_object('post', '/v1/payment_intents', {...})``,
+        and return the Stripe object it answered with, or raise its error.
+        """
+        api_key = stripe.api_key
+        if api_key is None:
+            raise stripe.error.AuthenticationError('No API key provided.')
+
+        requestor = APIRequestor(key=api_key, client=self)
+        url = requestor.api_base + path
+        encoded_params = urlencode(list(_api_encode(params or {}))).replace('%5B', '[').replace('%5D', ']')
+        headers = requestor.request_headers(api_key, method)
+        if idempotency_key:
+            headers['Idempotency-Key'] = idempotency_key
+
+        if method == 'post':
+            post_data = encoded_params
+        else:
+            url = f'{url}?{encoded_params}' if encoded_params else url
+            post_data = None
+
+        content, status_code, response_headers = await self.request_with_retries_async(
+            method, url, headers, post_data
+        )
+        response = requestor.interpret_response(content, status_code, response_headers)
+        return convert_to_stripe_object(response, api_key, requestor.api_version)
+
+    async def request_with_retries_async(self, method, url, headers, post_data=None):
+        num_retries = 0
+        while True:
+            try:
+                response = await self.request_async(method, url, headers, post_data)
+                connection_error = None
+            except stripe.error.APIConnectionError as error:
+                response = None
+                connection_error = error
+
+            if self._should_retry(response, connection_error, num_retries):
+                num_retries += 1
+                await asyncio.sleep(self._sleep_time_seconds(num_retries, response))
+            elif response is not None:
+                return response
+            else:
+                raise connection_error
+
+    async def request_async(self, method, url, headers, post_data=None):
+        started = time.perf_counter()
+        status_code = 'error'
+        try:
+            response = await self.get_client().request(method, url, headers=headers, content=post_data)
+            status_code = response.status_code
+            return response.content, response.status_code, response.headers
+        except httpx.TransportError as error:
+            raise stripe.error.APIConnectionError(
+                f'Unexpected error communicating with Stripe: {error!r}',
+                should_retry=isinstance(error, (httpx.TimeoutException, httpx.ConnectError)),
+            )
+        finally:
+            MetricsService.observe(
+                STRIPE_REQUEST_METRIC, time.perf_counter() - started,
+                method=method.upper(), path=STRIPE_OBJECT_ID.sub('/:id', urlsplit(url).path),
+                status=str(status_code)
+            )
+
+
+def configure_stripe():
+    stripe.api_key = settings.STRIPE_SECRET_KEY
+    stripe.max_network_retries = settings.STRIPE_MAX_NETWORK_RETRIES
+    stripe.default_http_client = PooledRequestsClient(
+        timeout=(settings.STRIPE_CONNECT_TIMEOUT, settings.STRIPE_READ_TIMEOUT),
+        pool_size=settings.STRIPE_POOL_SIZE,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_async_stripe_client():
+    return AsyncStripeClient(
+        timeout=(settings.STRIPE_CONNECT_TIMEOUT, settings.STRIPE_READ_TIMEOUT),
+        pool_size=settings.STRIPE_POOL_SIZE,
+    )
+
+
+def payment_intent_idempotency_key(user, payment_plan):
+    """
+    Stable key for a user buying a plan, so retried or double submitted
+    requests resolve to the same PaymentIntent. The subscription date moves
+    on every successful purchase, which frees the key for the next one.
+    """
+    source = ':'.join(str(part) for part in (
+        user.pk, payment_plan.pk, payment_plan.amount, payment_plan.currency,
+        user.payment_plan_subscribed_at.timestamp(),
+    ))
+    return 'payment-intent-%s' % hashlib.sha256(source.encode()).hexdigest()
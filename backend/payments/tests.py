@@ -1,3 +1,179 @@
-from django.test import TestCase
+import json
+from unittest import mock
+from urllib.parse import parse_qs
 
-# Create your tests here.
+import httpx
+import stripe
+from django.test import TestCase, SimpleTestCase, AsyncRequestFactory
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.payments.catalogue import PaymentPlanCatalogue
+from backend.payments.models import PaymentPlan
+from backend.payments.stripe_client import (
+    PooledRequestsClient, AsyncStripeClient, payment_intent_idempotency_key, STRIPE_REQUEST_METRIC
+)
+from backend.payments.views import AsyncStripeCreatePaymentIntentView, AsyncStripeConfirmPaymentIntentView
+from backend.users.models import User
+from services.metrics_service import MetricsService
+
+
+class PaymentPlanCatalogueTestCase(TestCase):
+    def setUp(self):
+        PaymentPlanCatalogue.invalidate()
+        self.user = User.objects.create_user(username='buyer', email='buyer@example.com', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('payment_plan-list')
+        PaymentPlan.objects.create(title='Gold', amount=2000)
+        PaymentPlan.objects.create(title='Silver', amount=1000)
+        PaymentPlan.objects.create(title='Retired', amount=500, is_active=False)
+
+    def test_list_returns_active_plans_with_validators(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([plan['title'] for plan in response.data['results']], ['Silver', 'Gold'])
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+
+    def test_list_is_served_from_cache(self):
+        self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_conditional_get_returns_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @mock.patch.object(PageNumberPagination, 'page_size', 1)
+    def test_each_page_has_its_own_etag(self):
+        first = self.client.get(self.url)
+        second = self.client.get(self.url, {'page': 2})
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+        response = self.client.get(self.url, {'page': 2}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([plan['title'] for plan in response.data['results']], ['Gold'])
+
+        response = self.client.get(self.url, {'page': 2}, HTTP_IF_NONE_MATCH=second['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_saving_a_plan_invalidates_the_catalogue(self):
+        etag = self.client.get(self.url)['ETag']
+        PaymentPlan.objects.create(title='Platinum', amount=3000)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data['results']), 3)
+
+
+class PaymentIntentIdempotencyKeyTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='buyer', email='buyer@example.com', password='secret')
+        self.plan = PaymentPlan.objects.create(title='Gold', amount=2000)
+
+    def test_key_is_stable_for_the_same_purchase(self):
+        self.assertEqual(
+            payment_intent_idempotency_key(self.user, self.plan),
+            payment_intent_idempotency_key(self.user, self.plan),
+        )
+
+    def test_key_changes_after_a_successful_purchase(self):
+        key = payment_intent_idempotency_key(self.user, self.plan)
+        self.user.payment_plan_subscribed_at += timezone.timedelta(seconds=1)
+
+        self.assertNotEqual(key, payment_intent_idempotency_key(self.user, self.plan))
+
+
+class PooledRequestsClientTestCase(SimpleTestCase):
+    def test_request_latency_is_recorded(self):
+        histogram = MetricsService.histogram(STRIPE_REQUEST_METRIC)
+        histogram.clear()
+        client = PooledRequestsClient(timeout=(1, 1), pool_size=1)
+        session = mock.Mock()
+        session.request.return_value = mock.Mock(content=b'{}', status_code=200, headers={})
+
+        with mock.patch.object(client, 'create_session', return_value=session):
+            client.request('post', 'https://api.stripe.com/v1/payment_intents/pi_3LxRwfCe2X04fekw0abc/confirm', {})
+
+        [sample] = histogram.collect()
+        self.assertEqual(sample['count'], 1)
+        self.assertEqual(sample['labels'], {
+            'method': 'POST', 'path': '/v1/payment_intents/:id/confirm', 'status': '200'
+        })
+        self.assertEqual(session.request.call_args.kwargs['timeout'], (1, 1))
+
+
+@mock.patch.object(stripe, 'api_key', 'sk_test_async')
+class AsyncStripeViewsTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='buyer', email='buyer@example.com', password='secret')
+        self.plan = PaymentPlan.objects.create(title='Gold', amount=2000)
+        self.factory = AsyncRequestFactory()
+        self.stripe_requests = []
+
+    def stripe_client(self, status_code, body):
+        async def handler(request):
+            self.stripe_requests.append(request)
+            return httpx.Response(status_code, json=body)
+
+        client = AsyncStripeClient(timeout=(1, 1), pool_size=1, transport=httpx.MockTransport(handler))
+        return mock.patch('backend.payments.views.get_async_stripe_client', return_value=client)
+
+    async def post(self, view, data, authenticated=True):
+        # extra keyword arguments are headers for the async factory
+        headers = {'authorization': f'Bearer {AccessToken.for_user(self.user)}'} if authenticated else {}
+        request = self.factory.post('/', data, content_type='application/json', **headers)
+        response = await view.as_view()(request)
+        return response.status_code, json.loads(response.content)
+
+    async def test_payment_intent_is_created_with_the_idempotency_key(self):
+        payment_intent = {'id': 'pi_3LxRwfCe2X04fekw0abc', 'object': 'payment_intent', 'amount': 2000}
+        with self.stripe_client(200, payment_intent):
+            status_code, data = await self.post(AsyncStripeCreatePaymentIntentView, {'payment_plan': self.plan.pk})
+
+        self.assertEqual(status_code, status.HTTP_200_OK)
+        self.assertEqual(data['id'], 'pi_3LxRwfCe2X04fekw0abc')
+        self.assertIn('public_key', data)
+        [request] = self.stripe_requests
+        self.assertEqual(str(request.url), 'https://api.stripe.com/v1/payment_intents')
+        self.assertEqual(request.headers['Idempotency-Key'], payment_intent_idempotency_key(self.user, self.plan))
+        params = parse_qs(request.content.decode())
+        self.assertEqual(params['amount'], ['2000'])
+        self.assertEqual(params['metadata[user]'], [str(self.user.pk)])
+        self.assertEqual(params['automatic_payment_methods[enabled]'], ['True'])
+
+    async def test_stripe_errors_and_unknown_plans_are_reported(self):
+        with self.stripe_client(402, {'error': {'type': 'card_error', 'message': 'Your card was declined.'}}):
+            status_code, data = await self.post(AsyncStripeCreatePaymentIntentView, {'payment_plan': self.plan.pk})
+            self.assertEqual((status_code, data), (status.HTTP_403_FORBIDDEN, {'error': 'Your card was declined.'}))
+
+            status_code, data = await self.post(AsyncStripeCreatePaymentIntentView, {'payment_plan': 0})
+            self.assertEqual(status_code, status.HTTP_400_BAD_REQUEST)
+
+            status_code, data = await self.post(AsyncStripeConfirmPaymentIntentView, {'payment_intent_id': 'pi_1'})
+            self.assertEqual((status_code, data), (status.HTTP_400_BAD_REQUEST, {'error': 'Your card was declined.'}))
+
+        self.assertEqual(len(self.stripe_requests), 2)
+
+    async def test_requests_without_a_token_are_rejected(self):
+        with self.stripe_client(200, {}):
+            status_code, data = await self.post(
+                AsyncStripeCreatePaymentIntentView, {'payment_plan': self.plan.pk}, authenticated=False
+            )
+
+        self.assertEqual(status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.stripe_requests, [])
@@ -1,8 +1,10 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework.routers import DefaultRouter
 
 from backend.payments.views import StripeTestPaymentAPIView, PaymentPlanAPIViewSet, StripeCreatePaymentIntentAPIView, \
-    StripeConfirmPaymentIntentAPIView, StripePaymentEventCallbackAPIView
+    StripeConfirmPaymentIntentAPIView, StripePaymentEventCallbackAPIView, AsyncStripeCreatePaymentIntentView, \
+    AsyncStripeConfirmPaymentIntentView
 
 APP_BASE_URL = 'payments'
 
@@ -14,12 +16,12 @@ urlpatterns = [
     ),
     path(
         APP_BASE_URL + '/create-payment-intent/',
-        StripeCreatePaymentIntentAPIView.as_view(),
+        (AsyncStripeCreatePaymentIntentView if settings.ASYNC_VIEWS else StripeCreatePaymentIntentAPIView).as_view(),
         name='create_payment_intent',
     ),
     path(
         APP_BASE_URL + '/confirm-payment-intent/',
-        StripeConfirmPaymentIntentAPIView.as_view(),
+        (AsyncStripeConfirmPaymentIntentView if settings.ASYNC_VIEWS else StripeConfirmPaymentIntentAPIView).as_view(),
         name='confirm_payment_intent',
     ),
     path(
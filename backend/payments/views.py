@@ -1,34 +1,79 @@
+import hashlib
 from datetime import timedelta
+from urllib.parse import quote
 
 import stripe
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.http import JsonResponse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from drf_spectacular.utils import extend_schema, OpenApiResponse, inline_serializer
 from rest_framework import status, serializers
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
+from backend.payments.catalogue import PaymentPlanCatalogue
 from backend.payments.models import PaymentPlan, PaymentEvent
 from backend.payments.serializers import (
     PaymentPlanSerializer, CreatePaymentIntentRequestSerializer,
     CreatePaymentIntentResponseSerializer, PaymentIntentErrorResponseSerializer
 )
+from backend.payments.stripe_client import payment_intent_idempotency_key, get_async_stripe_client
+from backend.views import AsyncAPIView
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
 User = get_user_model()
 
 
 class PaymentPlanAPIViewSet(ModelViewSet):
     permission_classes = (IsAuthenticated,)
     serializer_class = PaymentPlanSerializer
+    # the catalogue is a handful of cached rows, counting them costs nothing
+    pagination_class = PageNumberPagination
+    # the catalogue is rebuilt with two queries when it changed
+    query_budgets = {'list': 3}
 
     def get_queryset(self):
         return PaymentPlan.objects.filter(is_active=True).order_by('amount', 'created_at')
 
+    def list(self, request, *args, **kwargs):
+        catalogue = PaymentPlanCatalogue.get()
+        last_modified = int(catalogue.last_modified.timestamp()) if catalogue.last_modified else None
+
+        etag = self.get_page_etag(request, catalogue)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        page = self.paginate_queryset(catalogue.plans)
+        if page is not None:
+            response = self.get_paginated_response(page)
+        else:
+            response = Response(catalogue.plans)
+
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def get_page_etag(self, request, catalogue):
+        """The catalogue ETag, made specific to the page asked for, each page is a different body."""
+        paginator = self.paginator
+        if paginator is None:
+            return catalogue.etag
+        page = [
+            request.query_params.get(param, '')
+            for param in (paginator.page_query_param, paginator.page_size_query_param) if param
+        ]
+        content = ':'.join([catalogue.etag, *page]).encode()
+        return '"%s"' % hashlib.sha1(content).hexdigest()
+
 
 class StripeTestPaymentAPIView(APIView):
     permission_classes = (IsAuthenticated,)
@@ -106,7 +151,8 @@ class StripeCreatePaymentIntentAPIView(APIView):
                 metadata={
                     'user': request.user.id,
                     'payment_plan': payment_plan.id
-                }
+                },
+                idempotency_key=payment_intent_idempotency_key(request.user, payment_plan)
             )
 
             status_code = status.HTTP_200_OK
@@ -126,6 +172,66 @@ class StripeCreatePaymentIntentAPIView(APIView):
         return Response(status=status_code, data=data)
 
 
+class AsyncStripeConfirmPaymentIntentView(AsyncAPIView):
+    """``StripeConfirmPaymentIntentAPIView`` waiting on Stripe without a thread."""
+
+    async def post(self, request):
+        data = self.get_data(request)
+        payment_intent_id = data['payment_intent_id']
+        try:
+            await get_async_stripe_client().request_object(
+                'post', f'/v1/payment_intents/{quote(payment_intent_id, safe="")}/confirm'
+            )
+            return JsonResponse({"message": "Success"}, status=status.HTTP_200_OK)
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncStripeCreatePaymentIntentView(AsyncAPIView):
+    """``StripeCreatePaymentIntentAPIView`` waiting on Stripe without a thread."""
+
+    async def post(self, request):
+        data = self.get_data(request)
+        try:
+            payment_plan, idempotency_key = await sync_to_async(self.get_payment_plan)(
+                request.user, data.get('payment_plan')
+            )
+
+            payment_intent = await get_async_stripe_client().request_object('post', '/v1/payment_intents', {
+                'amount': payment_plan.amount,
+                'currency': payment_plan.currency,
+                'automatic_payment_methods': {
+                    'enabled': True,
+                },
+                'metadata': {
+                    'user': request.user.id,
+                    'payment_plan': payment_plan.id
+                },
+            }, idempotency_key=idempotency_key)
+
+            status_code = status.HTTP_200_OK
+            data = {
+                **payment_intent,
+                'public_key': settings.STRIPE_PUBLIC_KEY
+            }
+
+        except PaymentPlan.DoesNotExist:
+            status_code = status.HTTP_400_BAD_REQUEST
+            data = {'error': 'payment plan is either inactive or does not exists'}
+
+        except Exception as e:
+            status_code = status.HTTP_403_FORBIDDEN
+            data = {'error': str(e)}
+
+        return JsonResponse(data, status=status_code)
+
+    @staticmethod
+    def get_payment_plan(user, payment_plan_id):
+        payment_plan = PaymentPlan.objects.get(is_active=True, id=payment_plan_id)
+        # reads the subscription date, not among the slim user fields
+        return payment_plan, payment_intent_idempotency_key(user, payment_plan)
+
+
 class StripePaymentEventCallbackAPIView(APIView):
     @transaction.atomic
     def post(self, request):
@@ -0,0 +1,60 @@
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetTestMixin:
+    """
+    Assertions on the SQL recorded by ``QueryInstrumentationMiddleware`` for
+    responses of the test client.
+    """
+
+    def assertWithinQueryBudget(self, response):
+        """Fail when the action declares no ``query_budgets`` entry or issued more statements than it allows."""
+        self.assertIsNotNone(response.query_budget, f'{response.query_endpoint} declares no query budget')
+        duplicates = '\n'.join(f'{count} x {sql}' for sql, count in response.query_stats.duplicates)
+        self.assertLessEqual(
+            response.query_stats.count, response.query_budget,
+            f'{response.query_endpoint} issued {response.query_stats.count} queries, '
+            f'its budget is {response.query_budget}. Repeated queries:\n{duplicates}'
+        )
+
+
+class IndexScanTestMixin:
+    """Assertions on the plans PostgreSQL picks for the statements of a block."""
+
+    INDEX_SCANS = ('Index Scan', 'Index Only Scan', 'Bitmap Heap Scan')
+
+    @staticmethod
+    def explain(sql, using='default'):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}')
+            [plan] = cursor.fetchone()[0]
+        return plan['Plan']
+
+    @classmethod
+    def plan_nodes(cls, plan):
+        yield plan
+        for child in plan.get('Plans', ()):
+            yield from cls.plan_nodes(child)
+
+    @contextmanager
+    def assertIndexScans(self, *tables, using='default'):
+        """
+        Fail when a statement of the block reads one of ``tables`` other than
+        through an index. Yields a set filled with the names of the indexes
+        read, once the block ends.
+        """
+        indexes = set()
+        with CaptureQueriesContext(connections[using]) as queries:
+            yield indexes
+
+        for query in queries.captured_queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            for node in self.plan_nodes(self.explain(query['sql'], using)):
+                if node.get('Relation Name') in tables:
+                    self.assertIn(node['Node Type'], self.INDEX_SCANS, f'{node["Node Type"]} on {query["sql"]}')
+                if 'Index Name' in node:
+                    indexes.add(node['Index Name'])
@@ -0,0 +1,276 @@
+import asyncio
+import json
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from io import StringIO
+from pathlib import Path
+
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.http import HttpResponse
+from django.test import (
+    TestCase, SimpleTestCase, TransactionTestCase, RequestFactory, AsyncRequestFactory, override_settings
+)
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from backend.db.routers import ReplicaRouter, read_from_replica
+from backend.events.models import Event, UserEvent
+from backend.middleware import REQUEST_DURATION_METRIC, QueryInstrumentationMiddleware, ReplicaReadMiddleware
+from backend.notifications.models import Notification
+from backend.users.models import User, Sentiment, ProfileView
+from services.metrics_service import Histogram, Counter, MetricsService
+
+
+class MetricsFormatTestCase(SimpleTestCase):
+    def test_histogram_text_format(self):
+        histogram = Histogram('job_duration_seconds', 'Job duration.', buckets=(0.1, 1))
+        histogram.observe(0.05, job='import')
+        histogram.observe(0.5, job='import')
+
+        self.assertEqual(histogram.render(), [
+            '# HELP job_duration_seconds Job duration.',
+            '# TYPE job_duration_seconds histogram',
+            'job_duration_seconds_bucket{job="import",le="0.1"} 1',
+            'job_duration_seconds_bucket{job="import",le="1"} 2',
+            'job_duration_seconds_bucket{job="import",le="+Inf"} 2',
+            'job_duration_seconds_sum{job="import"} 0.55',
+            'job_duration_seconds_count{job="import"} 2',
+        ])
+
+    def test_counter_label_values_are_escaped(self):
+        counter = Counter('jobs_total', 'Jobs.')
+        counter.increment(path='C:\\jobs "daily"')
+
+        self.assertEqual(counter.render()[-1], 'jobs_total{path="C:\\\\jobs \\"daily\\""} 1')
+
+
+class MetricsEndpointTestCase(TestCase):
+    def setUp(self):
+        REQUEST_DURATION_METRIC.clear()
+        self.user = User.objects.create_user(username='viewer', email='viewer@example.com', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @override_settings(METRICS_TOKEN='scrape')
+    def test_requests_are_timed_per_view_and_action(self):
+        self.client.get(reverse('user-list'))
+
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn(
+            'http_request_duration_seconds_count{endpoint="UserAPIViewSet.list",method="GET",status="200"} 1',
+            response.content.decode()
+        )
+
+    @override_settings(METRICS_TOKEN='scrape')
+    def test_token_is_required_when_configured(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_closed_without_a_token_unless_debugging(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_403_FORBIDDEN)
+
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, status.HTTP_200_OK)
+
+
+class MetricsServerTestCase(SimpleTestCase):
+    def setUp(self):
+        self.server = MetricsService.serve(0)
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        host, port = self.server.server_address
+        self.url = f'http://{host}:{port}/metrics'
+
+    def get(self, **headers):
+        try:
+            with urllib.request.urlopen(urllib.request.Request(self.url, headers=headers)) as response:
+                return response.status
+        except urllib.error.HTTPError as error:
+            return error.code
+
+    def test_listens_on_the_loopback_interface(self):
+        self.assertEqual(self.server.server_address[0], '127.0.0.1')
+
+    @override_settings(METRICS_TOKEN='scrape')
+    def test_token_is_required_when_configured(self):
+        self.assertEqual(self.get(), status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.get(Authorization='Bearer scrape'), status.HTTP_200_OK)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_closed_without_a_token_unless_debugging(self):
+        self.assertEqual(self.get(), status.HTTP_403_FORBIDDEN)
+
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.get(), status.HTTP_200_OK)
+
+
+class BenchmarkCommandsTestCase(TransactionTestCase):
+    def generate(self, **options):
+        call_command(
+            'generate_synthetic_data', users=20, sentiments_per_user=5, views_per_user=5, events=3,
+            attendees_per_event=4, batch_size=7, stdout=StringIO(), **options
+        )
+
+    def test_synthetic_data(self):
+        self.generate(seed=1)
+
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Sentiment.objects.count(), 100)
+        self.assertLessEqual(ProfileView.objects.count(), 100)
+        self.assertEqual(Event.objects.count(), 3)
+        self.assertEqual(UserEvent.objects.count(), 12)
+        self.assertTrue(Notification.objects.exists())
+        self.assertFalse(Sentiment.objects.filter(sentiment_from=F('sentiment_to')).exists())
+
+    def test_benchmark_reports_every_request_of_the_session(self):
+        self.generate()
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / 'results.json'
+            call_command(
+                'benchmark_api', sessions=3, warmup=0, concurrency=2, output=output, stdout=StringIO()
+            )
+            results = json.loads(output.read_text())
+
+        self.assertEqual(results['steps']['own profile']['requests'], 3)
+        self.assertEqual(results['steps']['like']['errors'], 0)
+        # the page, and the discovery exclusions of the user on the first request
+        self.assertEqual(results['steps']['discovery']['max_queries'], 2)
+
+
+class DatabaseWrapperTestCase(TransactionTestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(connection.settings_dict, {'CONN_MAX_AGE': None, 'CONN_HEALTH_CHECKS': True})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(connection.close)
+        connection.close()
+
+    def query(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+    def test_broken_connection_is_replaced_before_the_next_request(self):
+        self.query()
+        broken = connection.connection
+
+        connection.close_if_unusable_or_obsolete()
+        with mock.patch.object(connection, 'is_usable', return_value=False):
+            self.query()
+
+        self.assertIsNot(connection.connection, broken)
+
+    def test_connection_is_checked_once_per_request(self):
+        self.query()
+        reused = connection.connection
+
+        connection.close_if_unusable_or_obsolete()
+        with mock.patch.object(connection, 'is_usable', return_value=True) as is_usable:
+            self.query()
+            self.query()
+
+        self.assertIs(connection.connection, reused)
+        self.assertEqual(is_usable.call_count, 1)
+
+    def test_statement_timeout(self):
+        with mock.patch.dict(connection.settings_dict, {'STATEMENT_TIMEOUT': 1500}):
+            with connection.cursor() as cursor:
+                cursor.execute('SHOW statement_timeout')
+                self.assertEqual(cursor.fetchone()[0], '1500ms')
+
+
+@override_settings(REPLICA_DATABASES=['replica'])
+class ReplicaRouterTestCase(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_go_to_the_replica_inside_read_from_replica(self):
+        self.assertEqual(self.router.db_for_read(User), 'default')
+        with read_from_replica():
+            self.assertEqual(self.router.db_for_read(User), 'replica')
+        self.assertFalse(self.router.allow_migrate('replica', 'users'))
+
+    def test_reads_after_a_write_go_to_the_primary(self):
+        with read_from_replica() as replica_reads:
+            self.assertEqual(self.router.db_for_write(User), 'default')
+            self.assertEqual(self.router.db_for_read(User), 'default')
+
+        self.assertTrue(replica_reads.pinned)
+
+    def test_reads_inside_a_transaction_go_to_the_primary(self):
+        with read_from_replica(), mock.patch.object(connection, 'in_atomic_block', True):
+            self.assertEqual(self.router.db_for_read(User), 'default')
+
+
+@override_settings(REPLICA_DATABASES=['replica'], REPLICA_STICKINESS=5)
+class ReplicaReadMiddlewareTestCase(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        router = ReplicaRouter()
+        self.middleware = ReplicaReadMiddleware(lambda request: HttpResponse(router.db_for_read(User)))
+
+    def test_safe_requests_read_from_the_replica(self):
+        response = self.middleware(self.factory.get('/'))
+
+        self.assertEqual(response.content, b'replica')
+        self.assertNotIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_writes_pin_the_client_to_the_primary(self):
+        response = self.middleware(self.factory.post('/'))
+        cookie = response.cookies[settings.REPLICA_PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], 5)
+
+        self.factory.cookies[settings.REPLICA_PIN_COOKIE] = cookie.value
+        self.assertEqual(self.middleware(self.factory.get('/')).content, b'default')
+
+    def test_expired_pin_reads_from_the_replica_again(self):
+        self.factory.cookies[settings.REPLICA_PIN_COOKIE] = str(time.time() - 1)
+
+        self.assertEqual(self.middleware(self.factory.get('/')).content, b'replica')
+
+    async def test_async_requests_read_from_the_replica(self):
+        router = ReplicaRouter()
+
+        async def view(request):
+            # the ORM runs in a thread, which sees the context of the request
+            return HttpResponse(await sync_to_async(router.db_for_read)(User))
+
+        response = await ReplicaReadMiddleware(view)(AsyncRequestFactory().get('/'))
+
+        self.assertEqual(response.content, b'replica')
+
+
+class AsyncMiddlewareTestCase(TestCase):
+    @override_settings(DEBUG=True, MIDDLEWARE=[*settings.MIDDLEWARE, 'backend.middleware.ReplicaReadMiddleware'])
+    def test_async_chain_is_not_adapted(self):
+        # an adapted middleware runs the rest of the chain, the async view included, in a thread
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler().load_middleware(is_async=True)
+
+    async def test_queries_of_async_requests_are_recorded(self):
+        async def view(request):
+            await sync_to_async(User.objects.count)()
+            return HttpResponse()
+
+        middleware = QueryInstrumentationMiddleware(view)
+        response = await middleware(AsyncRequestFactory().get('/'))
+
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        self.assertEqual(response.query_stats.count, 1)
@@ -24,10 +24,12 @@ from backend.notifications.urls import urlpatterns as notifiction_urls
 from backend.payments.urls import urlpatterns as payment_urls
 from backend.swagger.urls import urlpatterns as swagger_urls
 from backend.users.urls import urlpatterns as user_urls
+from backend.views import metrics
 
 urlpatterns = static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 urlpatterns += [
     path('admin/', admin.site.urls),
+    path('metrics', metrics, name='metrics'),
     path('swagger/', include(swagger_urls)),
     path('api/', include(authentication_urls)),
     path('api/', include(user_urls)),
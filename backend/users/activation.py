@@ -0,0 +1,22 @@
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from backend.emails.models import OutboxEmail
+from backend.emails.rendering import EmailRenderer
+from backend.users.tokens import account_activation_token
+
+ACTIVATION_EMAIL_SUBJECT = 'Matrimony Account Activation Link.'
+
+
+def activation_email(user, domain):
+    """The unsaved outbox email with the account activation link of ``user`` on ``domain``."""
+    activation_path = reverse('activate', kwargs={
+        'uidb64': urlsafe_base64_encode(force_bytes(user.pk)),
+        'token': account_activation_token.make_token(user),
+    })
+    message, html_message = EmailRenderer.render('acc_active_email', {
+        'user': user,
+        'activation_url': f'http://{domain}{activation_path}',
+    })
+    return OutboxEmail(subject=ACTIVATION_EMAIL_SUBJECT, body=message, html_body=html_message, to=user.email)
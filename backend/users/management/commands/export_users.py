@@ -0,0 +1,49 @@
+import csv
+import json
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from backend.users.models import User
+from backend.users.serializers import UserImportSerializer
+from services.queryset_service import QuerysetService
+
+# what import_users reads, but the password
+EXPORT_FIELDS = [field for field in UserImportSerializer.Meta.fields if field != 'password']
+
+
+class Command(BaseCommand):
+    help = 'Export users to a JSONL or CSV file import_users can read, streaming them so memory stays flat.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="Output file, the standard output by default.")
+        parser.add_argument('--format', choices=('jsonl', 'csv'), help='Guessed from the file extension by default.')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows fetched from the database at a time.')
+        parser.add_argument('--active', action='store_true', help='Only export active users.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.endswith('.csv') else 'jsonl')
+
+        queryset = User.objects.all()
+        if options['active']:
+            queryset = queryset.filter(is_active=True)
+        rows = QuerysetService.stream(queryset.values(*EXPORT_FIELDS), options['chunk_size'])
+
+        count = 0
+        opened = nullcontext(self.stdout) if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        with opened as file:
+            if file_format == 'csv':
+                writer = csv.DictWriter(file, fieldnames=EXPORT_FIELDS, lineterminator='\n')
+                writer.writeheader()
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+            else:
+                for row in rows:
+                    file.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+                    count += 1
+
+        if path != '-':
+            self.stdout.write(f'{count} users exported to {path}')
@@ -0,0 +1,131 @@
+import csv
+import json
+import sys
+from contextlib import nullcontext
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction, IntegrityError
+from rest_framework.exceptions import ValidationError
+
+from backend.emails.models import OutboxEmail
+from backend.users.activation import activation_email
+from backend.users.models import User
+from backend.users.serializers import UserImportSerializer
+from services.password_hash_service import PasswordHashService
+
+
+def read_jsonl(file):
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError as error:
+            yield line_number, error
+
+
+def read_csv(file):
+    # the header is line 1, empty cells are missing values
+    for line_number, row in enumerate(csv.DictReader(file), start=2):
+        yield line_number, {name: value for name, value in row.items() if value not in ('', None)}
+
+
+class Command(BaseCommand):
+    help = (
+        'Import users from a JSONL or CSV file in chunks: each chunk is validated, its passwords hashed '
+        'in parallel, then inserted with bulk_create along with the activation emails in the outbox.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="JSONL or CSV file, '-' for the standard input.")
+        parser.add_argument('--format', choices=('jsonl', 'csv'), help='Guessed from the file extension by default.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--domain', help='Host of the activation links.')
+        parser.add_argument('--active', action='store_true', help='Import active users, without activation emails.')
+
+    def handle(self, *args, **options):
+        if not options['active'] and not options['domain']:
+            raise CommandError('--domain is needed for the activation links, unless the users are imported --active.')
+
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.endswith('.csv') else 'jsonl')
+        read = read_csv if file_format == 'csv' else read_jsonl
+
+        self.imported = self.rejected = 0
+        # validates every row, its fields are built once instead of once per row
+        self.serializer = UserImportSerializer()
+        opened = nullcontext(sys.stdin) if path == '-' else open(path, newline='', encoding='utf-8')
+        with opened as file:
+            rows = read(file)
+            while chunk := list(islice(rows, options['batch_size'])):
+                self.import_chunk(chunk, options)
+
+        self.stdout.write(f'{self.imported} users imported, {self.rejected} rows rejected')
+
+    def reject(self, line_number, errors):
+        self.rejected += 1
+        self.stderr.write(f'line {line_number}: {json.dumps(errors)}')
+
+    def import_chunk(self, chunk, options):
+        valid = []
+        for line_number, data in chunk:
+            if isinstance(data, Exception):
+                self.reject(line_number, {'non_field_errors': [str(data)]})
+                continue
+            try:
+                validated_data = self.serializer.run_validation(data)
+            except ValidationError as error:
+                self.reject(line_number, error.detail)
+                continue
+            validated_data['username'] = User.normalize_username(validated_data['username'])
+            validated_data['email'] = User.objects.normalize_email(validated_data['email'])
+            valid.append((line_number, validated_data))
+
+        valid = self.unique(valid)
+        if not valid:
+            return
+
+        passwords = [validated_data.pop('password', None) for __, validated_data in valid]
+        # no password makes an unusable one, set at activation
+        hashes = PasswordHashService.make_passwords(passwords)
+        users = [
+            User(password=password, is_active=options['active'], **validated_data)
+            for (__, validated_data), password in zip(valid, hashes)
+        ]
+
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                if not options['active']:
+                    OutboxEmail.objects.bulk_create([activation_email(user, options['domain']) for user in users])
+        except IntegrityError as error:
+            raise CommandError(
+                f'Lines {valid[0][0]} to {valid[-1][0]} were not imported, the previous ones were: {error}'
+            )
+        self.imported += len(users)
+
+    def unique(self, valid):
+        """Reject the rows whose username or email is taken, by a user or an earlier row of the chunk."""
+        taken = {
+            'username': set(User.objects.filter(
+                username__in=[validated_data['username'] for __, validated_data in valid]
+            ).values_list('username', flat=True)),
+            'email': set(User.objects.filter(
+                email__in=[validated_data['email'] for __, validated_data in valid]
+            ).values_list('email', flat=True)),
+        }
+
+        unique = []
+        for line_number, validated_data in valid:
+            errors = {
+                field: [f'A user with that {field} already exists.']
+                for field, values in taken.items() if validated_data[field] in values
+            }
+            if errors:
+                self.reject(line_number, errors)
+                continue
+            for field, values in taken.items():
+                values.add(validated_data[field])
+            unique.append((line_number, validated_data))
+        return unique
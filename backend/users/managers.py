@@ -1,8 +1,98 @@
-from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import UserManager
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections, models, transaction
+from django.db.models import Q, F, OuterRef, Subquery, Func, FloatField, IntegerField
+from django.db.models.functions import Cast
 
+from backend.db import lookups  # noqa: F401, registers not_in_array
+from backend.notifications.models import Notification
+from backend.users.discovery import DiscoveryExclusions, SearchExclusions
 
-class CustomUserManager(UserManager):
+# the text search configuration of the users_user_search_vector trigger
+SEARCH_CONFIG = 'english'
+
+
+class UserQuerySet(models.QuerySet):
+    def discoverable_by(self, user):
+        """The active users, less the ones kept out of ``user``'s discovery feed."""
+        return self.filter(is_active=True, id__not_in_array=DiscoveryExclusions.get(user.pk))
+
+    def searchable_by(self, user):
+        """The active users, less the ones kept out of ``user``'s search results."""
+        return self.filter(is_active=True, id__not_in_array=SearchExclusions.get(user.pk))
+
+    def search(self, text, max_ranked=None):
+        """
+        Users whose about_* texts match ``text``, in the web search syntax, with
+        their ``rank``: what they say of themselves first, then their lifestyle
+        and likes, their family and dislikes, and what they look for in a partner.
+
+        With ``max_ranked``, only the newest matches of this queryset are
+        ranked, the older ones are left out however well they match: ranking
+        reads the vector of every match, 1.5 s for the 200k profiles a common
+        word matches out of a million. Filter before, and tell the user when
+        ``has_unranked_matches()``.
+        """
+        query = self.get_search_query(text)
+        matches = self.filter(search_vector=query)
+        if max_ranked is not None:
+            newest = matches.order_by('-created_at').values('pk')[:max_ranked]
+            matches = self.model._default_manager.filter(pk__in=newest)
+        # double precision, a real rank wouldn't round trip through the pagination cursor
+        return matches.annotate(rank=Cast(SearchRank(F('search_vector'), query), FloatField()))
+
+    def has_unranked_matches(self, text, max_ranked):
+        """Whether ``search(text, max_ranked)`` leaves out matches of this queryset, reading at most ``max_ranked + 1``."""
+        return self.filter(search_vector=self.get_search_query(text))[max_ranked:].exists()
+
+    @staticmethod
+    def get_search_query(text):
+        return SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+
+    def reacted_to(self, user, sentiment=None):
+        """The users with a sentiment about ``user``, annotated with it."""
+        return self._with_sentiment('sentiments_from', 'sentiment_to', user, sentiment)
+
+    def reacted_by(self, user, sentiment=None):
+        """The users ``user`` has a sentiment about, annotated with it."""
+        return self._with_sentiment('sentiments_to', 'sentiment_from', user, sentiment)
+
+    def _with_sentiment(self, relation, user_field, user, sentiment):
+        from backend.users.models import Sentiment
+
+        # one filter() call and the annotation share a single join to the sentiment row,
+        # neutral sentiments are never listed
+        query = {
+            f'{relation}__{user_field}': user,
+            f'{relation}__sentiment__in': [
+                value for value in Sentiment.SentimentStatus.values if value != Sentiment.SentimentStatus.NEUTRAL
+            ],
+        }
+        if sentiment:
+            query[f'{relation}__sentiment'] = sentiment
+        return self.filter(**query).annotate(sentiment=F(f'{relation}__sentiment'))
+
+    def with_sentiment_counts(self):
+        """Annotate the like and dislike counts ``UserProfileSentimentSerializer`` would query per user."""
+        from backend.users.models import Sentiment
+
+        def count(sentiment):
+            # COUNT() as a plain function, not an aggregate: one row even without sentiments and no
+            # GROUP BY of its own, and a grouped outer query groups by the user id only, not by it
+            return Subquery(
+                Sentiment.objects.filter(sentiment_to=OuterRef('pk'), sentiment=sentiment).order_by().values(
+                    count=Func(F('pk'), function='COUNT')
+                ),
+                output_field=IntegerField(),
+            )
+
+        return self.annotate(
+            profile_likes=count(Sentiment.SentimentStatus.LIKE),
+            profile_dislikes=count(Sentiment.SentimentStatus.DISLIKE),
+        )
+
+
+class CustomUserManager(UserManager.from_queryset(UserQuerySet)):
     def _create_user(self, username, email, password, **extra_fields):
         """
         Create and save a user with the given username, email, and password.
@@ -16,6 +106,69 @@ class CustomUserManager(UserManager):
         email = self.normalize_email(email)
         username = self.model.normalize_username(username)
         user = self.model(username=username, email=email, **extra_fields)
-        user.password = make_password(password)
+        user.set_password(password)
         user.save(using=self._db)
         return user
+
+
+class MatchQuerySet(models.QuerySet):
+    def lock_pair(self, user_id, other_id):
+        """
+        Serialize the transactions changing the sentiments between two users,
+        so two likes sent at the same time see each other and match.
+        """
+        first, second = sorted((user_id, other_id))
+        with connections[self.db].cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s, %s)', [first % 2 ** 31, second % 2 ** 31])
+
+    def sync(self, sentiment):
+        """
+        Create the match of the two users of ``sentiment`` when they like each
+        other, notifying both, or remove it when they no longer do.
+        """
+        from backend.users.models import Sentiment
+
+        user_id, other_id = sentiment.sentiment_from_id, sentiment.sentiment_to_id
+        pair = self.filter(
+            Q(user_id=user_id, matched_user_id=other_id) | Q(user_id=other_id, matched_user_id=user_id)
+        )
+
+        with transaction.atomic(using=self.db):
+            self.lock_pair(user_id, other_id)
+            likes = Sentiment.objects.filter(
+                Q(sentiment_from_id=user_id, sentiment_to_id=other_id) |
+                Q(sentiment_from_id=other_id, sentiment_to_id=user_id),
+                sentiment=Sentiment.SentimentStatus.LIKE,
+            )
+            if likes.count() < 2:
+                pair.delete()
+                return
+            if pair.exists():
+                return
+
+            matches = self.bulk_create([
+                self.model(user_id=user_id, matched_user_id=other_id),
+                self.model(user_id=other_id, matched_user_id=user_id),
+            ])
+            Notification.objects.bulk_create([
+                Notification(user_id=match.user_id, content='You have a new match', content_object=match)
+                for match in matches
+            ])
+
+    def backfill(self):
+        """Create the missing matches of the users liking each other, without notifications."""
+        from backend.users.models import Sentiment
+
+        table = self.model._meta.db_table
+        sentiments = Sentiment._meta.db_table
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} (user_id, matched_user_id, created_at) '
+                f'SELECT given.sentiment_from_id, given.sentiment_to_id, GREATEST(given.updated_at, received.updated_at) '
+                f'FROM {sentiments} given JOIN {sentiments} received '
+                f'ON received.sentiment_from_id = given.sentiment_to_id AND received.sentiment_to_id = given.sentiment_from_id '
+                f'WHERE given.sentiment = %s AND received.sentiment = %s '
+                f'ON CONFLICT (user_id, matched_user_id) DO NOTHING',
+                [Sentiment.SentimentStatus.LIKE, Sentiment.SentimentStatus.LIKE],
+            )
+            return cursor.rowcount
@@ -0,0 +1,23 @@
+# Generated by Django 4.0.2 on 2026-10-19 05:12
+
+import backend.users.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='payment_plan_expires_at',
+            field=models.DateTimeField(default=backend.users.models.get_user_trial_period, verbose_name='payment plan expires at'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['created_at', 'id'], name='users_user_created_idx'),
+        ),
+    ]
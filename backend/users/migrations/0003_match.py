@@ -0,0 +1,47 @@
+# Generated by Django 4.0.2 on 2026-10-19 05:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Match',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='created at')),
+                ('matched_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matched_by', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'matches',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='users_match_user_created_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='match',
+            unique_together={('user', 'matched_user')},
+        ),
+        # the users already liking each other, as MatchQuerySet.backfill does
+        migrations.RunSQL(
+            sql=(
+                "INSERT INTO users_match (user_id, matched_user_id, created_at) "
+                "SELECT given.sentiment_from_id, given.sentiment_to_id, GREATEST(given.updated_at, received.updated_at) "
+                "FROM users_sentiment given JOIN users_sentiment received "
+                "ON received.sentiment_from_id = given.sentiment_to_id AND received.sentiment_to_id = given.sentiment_from_id "
+                "WHERE given.sentiment = 'L' AND received.sentiment = 'L'"
+            ),
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.0.2 on 2026-10-19 05:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_match'),
+    ]
+
+    # the new indexes first, the ones they replace last
+    operations = [
+        migrations.AddConstraint(
+            model_name='sentiment',
+            constraint=models.UniqueConstraint(fields=('sentiment_to', 'sentiment_from'), include=('sentiment',), name='users_sentiment_pair_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='profileview',
+            index=models.Index(fields=['viewee', 'viewer', 'created_at'], name='users_profileview_viewee_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profileview',
+            index=models.Index(fields=['viewer', 'viewee', 'created_at'], name='users_profileview_viewer_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sentiment',
+            index=models.Index(condition=models.Q(('sentiment', 'N'), _negated=True), fields=['sentiment_to', 'sentiment', 'sentiment_from'], name='users_sentiment_to_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sentiment',
+            index=models.Index(condition=models.Q(('sentiment', 'N'), _negated=True), fields=['sentiment_from', 'sentiment', 'sentiment_to'], name='users_sentiment_from_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='sentiment',
+            unique_together=set(),
+        ),
+        migrations.AlterField(
+            model_name='profileview',
+            name='viewee',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='viewee', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='profileview',
+            name='viewer',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='viewer', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='sentiment',
+            name='sentiment_to',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='sentiments_to', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.0.2 on 2026-10-19 06:10
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# what users say of themselves weighs most, what they look for in a partner least;
+# saves write every column, the vector is only built again when an about_* text changed
+SEARCH_VECTOR_FUNCTION = '''
+CREATE FUNCTION users_user_search_vector() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.search_vector IS NOT NULL
+        AND NEW.search_vector IS NOT DISTINCT FROM OLD.search_vector
+        AND (NEW.about_self, NEW.about_lifestyle, NEW.about_likes, NEW.about_dislikes, NEW.about_family, NEW.about_partner)
+        IS NOT DISTINCT FROM
+        (OLD.about_self, OLD.about_lifestyle, OLD.about_likes, OLD.about_dislikes, OLD.about_family, OLD.about_partner)
+    THEN
+        RETURN NEW;
+    END IF;
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.about_self, '')), 'A') ||
+        setweight(to_tsvector('english', concat_ws(' ', NEW.about_lifestyle, NEW.about_likes)), 'B') ||
+        setweight(to_tsvector('english', concat_ws(' ', NEW.about_family, NEW.about_dislikes)), 'C') ||
+        setweight(to_tsvector('english', coalesce(NEW.about_partner, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_covering_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='search vector'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='users_user_search_idx'),
+        ),
+        migrations.RunSQL(
+            sql=[
+                SEARCH_VECTOR_FUNCTION,
+                "CREATE TRIGGER users_user_search_vector BEFORE INSERT OR UPDATE OF about_self, about_family, "
+                "about_partner, about_likes, about_dislikes, about_lifestyle, search_vector ON users_user "
+                "FOR EACH ROW EXECUTE FUNCTION users_user_search_vector()",
+                "UPDATE users_user SET search_vector = NULL",
+            ],
+            reverse_sql=[
+                "DROP TRIGGER users_user_search_vector ON users_user",
+                "DROP FUNCTION users_user_search_vector()",
+            ],
+        ),
+    ]
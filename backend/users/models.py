@@ -4,6 +4,8 @@ from django.conf import settings
 from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.auth.models import PermissionsMixin
 from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.contrib.contenttypes.fields import GenericRelation
 from django.core.mail import send_mail
 from django.db import models
@@ -11,7 +13,8 @@ from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from backend.notifications.models import Notification
-from backend.users.managers import CustomUserManager
+from backend.users.managers import CustomUserManager, MatchQuerySet
+from services.password_hash_service import PasswordHashService
 
 
 def current_date():
@@ -30,6 +33,10 @@ class User(AbstractBaseUser, PermissionsMixin):
     class Meta:
         verbose_name = _('user')
         verbose_name_plural = _('users')
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='users_user_created_idx'),
+            GinIndex(fields=['search_vector'], name='users_user_search_idx'),
+        ]
 
     class Gender(models.TextChoices):
         MALE = 'M', _('Male')
@@ -268,6 +275,9 @@ class User(AbstractBaseUser, PermissionsMixin):
     about_likes = models.CharField(_('about likes'), max_length=1024, null=True, blank=True)
     about_dislikes = models.CharField(_('about dislikes'), max_length=1024, null=True, blank=True)
     about_lifestyle = models.CharField(_('about lifestyle'), max_length=1024, null=True, blank=True)
+    # the about_* fields, kept up to date by the users_user_search_vector trigger,
+    # see UserQuerySet.search
+    search_vector = SearchVectorField(_('search vector'), null=True, editable=False)
 
     payment_plan = models.ForeignKey(
         'payments.PaymentPlan',
@@ -281,6 +291,26 @@ class User(AbstractBaseUser, PermissionsMixin):
     created_at = models.DateTimeField(_('created at'), default=timezone.now)
     updated_at = models.DateTimeField(_('updated at'), auto_now=True)
 
+    def refresh_from_db(self, using=None, fields=None):
+        # slim instances from the JWT authentication load the rest of the row at once,
+        # but the search vector only the database reads
+        if fields is not None and self.__dict__.pop('load_deferred_together', False):
+            fields = list(set(fields) | (self.get_deferred_fields() - {'search_vector'}))
+        super().refresh_from_db(using=using, fields=fields)
+
+    def set_password(self, raw_password):
+        self.password = PasswordHashService.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        def setter(raw_password):
+            # hashed again with the current hasher and costs
+            self.set_password(raw_password)
+            self._password = None
+            self.save(update_fields=['password'])
+
+        return PasswordHashService.check_password(raw_password, self.password, setter)
+
     def clean(self):
         super().clean()
         self.email = self.__class__.objects.normalize_email(self.email)
@@ -311,14 +341,32 @@ class User(AbstractBaseUser, PermissionsMixin):
 
 class Sentiment(models.Model):
     class Meta:
-        unique_together = ['sentiment_to', 'sentiment_from']
+        constraints = [
+            # also the index of the per pair lookups, carrying the sentiment so they never read the table
+            models.UniqueConstraint(
+                fields=['sentiment_to', 'sentiment_from'], include=['sentiment'], name='users_sentiment_pair_uniq'
+            ),
+        ]
+        indexes = [
+            # who reacted to a user and who a user reacted to, and the like and dislike counts,
+            # neutral sentiments are never listed nor counted
+            models.Index(
+                fields=['sentiment_to', 'sentiment', 'sentiment_from'], name='users_sentiment_to_idx',
+                condition=~models.Q(sentiment='N'),
+            ),
+            models.Index(
+                fields=['sentiment_from', 'sentiment', 'sentiment_to'], name='users_sentiment_from_idx',
+                condition=~models.Q(sentiment='N'),
+            ),
+        ]
 
     class SentimentStatus(models.TextChoices):
         LIKE = 'L', _('LIKE')
         DISLIKE = 'D', _('DISLIKE')
         NEUTRAL = 'N', _('NEUTRAL')
 
-    sentiment_to = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sentiments_to')
+    # indexed as the first column of users_sentiment_pair_uniq
+    sentiment_to = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sentiments_to', db_index=False)
     sentiment_from = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sentiments_from')
     sentiment = models.CharField(
         _('sentiment'),
@@ -333,9 +381,41 @@ class Sentiment(models.Model):
     updated_at = models.DateTimeField(_('updated at'), auto_now=True)
 
 
+class Match(models.Model):
+    """
+    Two users liking each other, kept in sync with their sentiments by
+    ``MatchQuerySet.sync``. Each match is stored once per user, so the matches
+    of a user are one index range.
+    """
+
+    class Meta:
+        verbose_name_plural = _('matches')
+        unique_together = ['user', 'matched_user']
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id'], name='users_match_user_created_idx'),
+        ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='matches')
+    matched_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='matched_by')
+
+    notifications = GenericRelation(Notification, related_query_name='matches')
+
+    created_at = models.DateTimeField(_('created at'), default=timezone.now)
+
+    objects = MatchQuerySet.as_manager()
+
+
 class ProfileView(models.Model):
-    viewer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='viewer')
-    viewee = models.ForeignKey(User, on_delete=models.CASCADE, related_name='viewee')
+    class Meta:
+        # the visits of a user, per visitor, latest last: the profile view lists and their latest visit
+        # subqueries and the profile view counts read these alone, the foreign keys use their first column
+        indexes = [
+            models.Index(fields=['viewee', 'viewer', 'created_at'], name='users_profileview_viewee_idx'),
+            models.Index(fields=['viewer', 'viewee', 'created_at'], name='users_profileview_viewer_idx'),
+        ]
+
+    viewer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='viewer', db_index=False)
+    viewee = models.ForeignKey(User, on_delete=models.CASCADE, related_name='viewee', db_index=False)
 
     notifications = GenericRelation(Notification, related_query_name='profile_views')
 
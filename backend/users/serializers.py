@@ -1,13 +1,19 @@
 import face_recognition
 import numpy as np
 from PIL import Image
-from django.contrib.auth.hashers import make_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.db import transaction
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
-from backend.users.models import User, Sentiment, ProfileView
+from backend.users.models import User, Sentiment, ProfileView, Match
+from services.metrics_service import MetricsService
+from services.password_hash_service import PasswordHashService
+
+FACE_DETECTION_METRIC = 'face_detection_duration_seconds'
+
+MetricsService.histogram(FACE_DETECTION_METRIC, 'Time spent locating faces in uploaded avatars.')
 
 basic_user_fields = [
     'id', 'username', 'email', 'avatar',
@@ -32,10 +38,15 @@ class UserProfileSentimentSerializer(serializers.ModelSerializer):
 
     @extend_schema_field(OpenApiTypes.INT)
     def get_profile_likes(self, obj):
+        # annotated by UserQuerySet.with_sentiment_counts on the lists
+        if hasattr(obj, 'profile_likes'):
+            return obj.profile_likes
         return obj.sentiments_to.filter(sentiment=Sentiment.SentimentStatus.LIKE).count()
 
     @extend_schema_field(OpenApiTypes.INT)
     def get_profile_dislikes(self, obj):
+        if hasattr(obj, 'profile_dislikes'):
+            return obj.profile_dislikes
         return obj.sentiments_to.filter(sentiment=Sentiment.SentimentStatus.DISLIKE).count()
 
 
@@ -48,7 +59,8 @@ class UserBasicSerializer(serializers.ModelSerializer):
     def validate_avatar(self, value):
         image = Image.open(value.file)
         image = np.array(image.convert('RGB'))
-        face_locations = face_recognition.face_locations(image)
+        with MetricsService.timer(FACE_DETECTION_METRIC):
+            face_locations = face_recognition.face_locations(image)
 
         if len(face_locations) > 1:
             raise serializers.ValidationError('More than 1 face detected in the uploaded image')
@@ -63,15 +75,13 @@ class UserBasicSerializer(serializers.ModelSerializer):
     @transaction.atomic
     def create(self, validated_data):
         if 'password' in validated_data:
-            validated_data['password'] = make_password(
-                validated_data['password'])
+            validated_data['password'] = PasswordHashService.make_password(validated_data['password'])
         return super(UserBasicSerializer, self).create(validated_data)
 
     @transaction.atomic
     def update(self, instance, validated_data):
         if 'password' in validated_data:
-            validated_data['password'] = make_password(
-                validated_data['password'])
+            validated_data['password'] = PasswordHashService.make_password(validated_data['password'])
 
         if 'avatar' in validated_data and not validated_data['avatar']:
             del validated_data['avatar']
@@ -85,7 +95,7 @@ class UserDetailSerializer(UserProfileSentimentSerializer, UserBasicSerializer):
         exclude = [
             'user_permissions', 'groups',
             'created_at', 'updated_at', 'date_joined',
-            'is_staff', 'is_superuser', 'last_login',
+            'is_staff', 'is_superuser', 'last_login', 'search_vector',
         ]
         extra_kwargs = {
             'password': {'write_only': True, 'required': False},
@@ -140,6 +150,60 @@ class UserBasicProfileViewSerializer(UserProfileSentimentSerializer, UserBasicSe
         return getattr(obj, 'last_viewed', None)
 
 
+class UserBasicMatchSerializer(UserBasicSerializer):
+    class Meta:
+        model = User
+        fields = basic_user_fields + ['matched_at']
+        extra_kwargs = basic_user_extra_kwargs
+
+    matched_at = serializers.SerializerMethodField()
+
+    @extend_schema_field(OpenApiTypes.DATETIME)
+    def get_matched_at(self, obj):
+        return getattr(obj, 'matched_at', None)
+
+
+class UserSearchFilterSerializer(serializers.Serializer):
+    """The structured filters of the profile search, from the query string."""
+    q = serializers.CharField(help_text='Words to find in the about texts: "quoted phrases", or, -excluded words')
+    gender = serializers.ChoiceField(User.Gender.choices, required=False)
+    religion = serializers.ChoiceField(User.Religion.choices, required=False)
+    marital_status = serializers.ChoiceField(User.MaritalStatus.choices, required=False)
+    looking_for = serializers.ChoiceField(User.LookingForStatus.choices, required=False)
+    country = serializers.CharField(required=False)
+    city = serializers.CharField(required=False)
+    community = serializers.CharField(required=False)
+    mother_tongue = serializers.CharField(required=False)
+    min_age = serializers.IntegerField(min_value=0, max_value=150, required=False)
+    max_age = serializers.IntegerField(min_value=0, max_value=150, required=False)
+
+    def validate(self, attrs):
+        if attrs.get('min_age', 0) > attrs.get('max_age', 150):
+            raise serializers.ValidationError({'max_age': ['Must not be less than min_age.']})
+        return attrs
+
+
+class UserImportSerializer(serializers.ModelSerializer):
+    """A row of ``import_users``, which checks the uniqueness of a whole chunk of rows at once."""
+
+    class Meta:
+        model = User
+        fields = [
+            'username', 'email', 'password', 'first_name', 'last_name', 'contact_number',
+            'date_of_birth', 'time_of_birth', 'city_of_birth', 'country', 'city', 'zip_code', 'residency_status',
+            'highest_qualification', 'employer', 'designation', 'annual_income',
+            'religion', 'mother_tongue', 'community', 'sub_community',
+            'gender', 'marital_status', 'looking_for', 'blood_group', 'created_by', 'height', 'has_disability',
+            'is_father_alive', 'is_mother_alive', 'children_count', 'brothers_count', 'sisters_count',
+            'about_self', 'about_family', 'about_partner', 'about_likes', 'about_dislikes', 'about_lifestyle',
+        ]
+        extra_kwargs = {
+            'username': {'validators': [UnicodeUsernameValidator()]},
+            'email': {'validators': []},
+            'password': {'write_only': True, 'required': False},
+        }
+
+
 class SentimentSerializer(serializers.ModelSerializer):
     class Meta:
         validators = []
@@ -167,3 +231,9 @@ class ProfileViewSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             'created_at': {'read_only': True},
         }
+
+
+class MatchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Match
+        fields = '__all__'
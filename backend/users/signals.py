@@ -0,0 +1,58 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from backend.users.discovery import DiscoveryExclusions, SearchExclusions
+from backend.users.models import User, Sentiment, ProfileView, Match
+from services.response_cache_service import DataVersions
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_user_version(sender, instance, **kwargs):
+    DataVersions.bump_on_commit(f'user:{instance.pk}')
+
+
+@receiver(post_save, sender=Sentiment)
+@receiver(post_delete, sender=Sentiment)
+def bump_sentiment_to_version(sender, instance, **kwargs):
+    # the profile like and dislike counts of the user the sentiment is about
+    DataVersions.bump_on_commit(f'user:{instance.sentiment_to_id}')
+
+
+@receiver(post_save, sender=Sentiment)
+@receiver(post_delete, sender=Sentiment)
+def sync_match(sender, instance, **kwargs):
+    # in the transaction of the sentiment change, a match never outlives its likes
+    Match.objects.sync(instance)
+
+
+@receiver(post_save, sender=ProfileView)
+@receiver(post_delete, sender=ProfileView)
+def bump_viewee_version(sender, instance, **kwargs):
+    DataVersions.bump_on_commit(f'user:{instance.viewee_id}')
+
+
+@receiver(post_save, sender=Sentiment)
+def invalidate_sentiment_exclusions(sender, instance, created, **kwargs):
+    # a new like or neutral sentiment can't replace a dislike, the pair is unique
+    if instance.sentiment == Sentiment.SentimentStatus.DISLIKE or not created:
+        DiscoveryExclusions.invalidate(instance.sentiment_from_id)
+        SearchExclusions.invalidate(instance.sentiment_from_id)
+
+
+@receiver(post_delete, sender=Sentiment)
+def invalidate_deleted_sentiment_exclusions(sender, instance, **kwargs):
+    if instance.sentiment == Sentiment.SentimentStatus.DISLIKE:
+        DiscoveryExclusions.invalidate(instance.sentiment_from_id)
+        SearchExclusions.invalidate(instance.sentiment_from_id)
+
+
+@receiver(post_save, sender=ProfileView)
+def invalidate_profile_view_exclusions(sender, instance, created, **kwargs):
+    if created:
+        DiscoveryExclusions.invalidate(instance.viewer_id)
+
+
+@receiver(post_delete, sender=ProfileView)
+def invalidate_deleted_profile_view_exclusions(sender, instance, **kwargs):
+    DiscoveryExclusions.invalidate(instance.viewer_id)
@@ -0,0 +1,758 @@
+import json
+import tempfile
+from contextlib import contextmanager
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Model
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from backend.emails.models import OutboxEmail
+from backend.events.models import Event, UserEvent
+from backend.notifications.models import Notification
+from backend.payments.models import PaymentPlan
+from backend.testing import QueryBudgetTestMixin, IndexScanTestMixin
+from backend.users.discovery import DiscoveryExclusions
+from backend.users.managers import UserQuerySet
+from backend.users.models import User, Sentiment, ProfileView, Match
+from backend.users.serializers import UserBasicSerializer
+from backend.users.views.users import UserAPIViewSet
+from services.queryset_service import QuerysetService
+from services.response_cache_service import RESPONSE_CACHE_METRIC
+
+
+class UserListQueriesTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(
+                username=f'user{i}', email=f'user{i}@example.com', password='secret',
+                about_self='a' * 2048, about_family='f' * 2048
+            )
+            for i in range(4)
+        ]
+        cls.user = cls.users[0]
+        for other in cls.users[1:]:
+            Sentiment.objects.create(sentiment_from=cls.user, sentiment_to=other, sentiment=Sentiment.SentimentStatus.LIKE)
+            Sentiment.objects.create(sentiment_from=other, sentiment_to=cls.user, sentiment=Sentiment.SentimentStatus.LIKE)
+            ProfileView.objects.create(viewer=cls.user, viewee=other)
+            ProfileView.objects.create(viewer=other, viewee=cls.user)
+
+        now = timezone.now()
+        cls.event = Event.objects.create(
+            title='Meetup', start_date=now, end_date=now + timezone.timedelta(days=1),
+            address='1 Main St', city='Lahore', state='Punjab', country='PK', created_by=cls.user
+        )
+        for user in cls.users:
+            UserEvent.objects.create(event=cls.event, user=user, interest_status=UserEvent.InterestStatus.ATTEND)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @contextmanager
+    def assertNoDeferredLoads(self):
+        """Fail when a deferred column is fetched lazily, i.e. a queryset's ``only()`` missed a field."""
+        loads = []
+        refresh_from_db = Model.refresh_from_db
+
+        def recording_refresh_from_db(instance, using=None, fields=None):
+            if fields is not None:
+                loads.append((type(instance).__name__, list(fields)))
+            return refresh_from_db(instance, using=using, fields=fields)
+
+        Model.refresh_from_db = recording_refresh_from_db
+        try:
+            yield
+        finally:
+            Model.refresh_from_db = refresh_from_db
+        self.assertEqual(loads, [], 'deferred fields were loaded one query at a time')
+
+    def get(self, url_name, **kwargs):
+        with self.assertNoDeferredLoads():
+            response = self.client.get(reverse(url_name, kwargs=kwargs))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_user_list(self):
+        response = self.get('user-list')
+
+        # the owner viewed every other profile, they are all left out of their discovery
+        self.assertEqual(len(response.data['results']), 0)
+
+        self.client.force_authenticate(self.users[1])
+        response = self.get('user-list')
+
+        self.assertEqual([user['id'] for user in response.data['results']], [self.users[3].id, self.users[2].id])
+        self.assertNotIn('about_self', response.data['results'][0])
+
+    def test_user_sentiments(self):
+        self.assertEqual(len(self.get('user-get-user-sentiments-from', pk=self.user.id).data['results']), 3)
+        self.assertEqual(len(self.get('user-get-user-sentiments-to', pk=self.user.id).data['results']), 3)
+
+    def test_user_sentiments_leave_out_neutral_ones(self):
+        other = self.users[1]
+        Sentiment.objects.filter(sentiment_from=other, sentiment_to=self.user).update(
+            sentiment=Sentiment.SentimentStatus.NEUTRAL
+        )
+        Sentiment.objects.filter(sentiment_from=self.users[2], sentiment_to=self.user).update(
+            sentiment=Sentiment.SentimentStatus.DISLIKE
+        )
+
+        results = self.get('user-get-user-sentiments-from', pk=self.user.id).data['results']
+
+        self.assertEqual({user['id']: user['sentiment'] for user in results}, {
+            self.users[2].id: Sentiment.SentimentStatus.DISLIKE, self.users[3].id: Sentiment.SentimentStatus.LIKE,
+        })
+        # the owner likes both of them
+        self.assertEqual([user['profile_likes'] for user in results], [1, 1])
+
+    def test_user_sentiments_join_the_sentiment_once(self):
+        queryset = User.objects.reacted_by(self.user, Sentiment.SentimentStatus.LIKE).with_sentiment_counts()
+
+        self.assertEqual(str(queryset.query).count('JOIN'), 1)
+        self.assertEqual([user.sentiment for user in queryset], [Sentiment.SentimentStatus.LIKE] * 3)
+        self.assertEqual([user.profile_likes for user in queryset], [1] * 3)
+
+    def test_user_profile_views(self):
+        self.assertEqual(len(self.get('user-get-profile-visited-by', pk=self.user.id).data['results']), 3)
+        self.assertEqual(len(self.get('user-get-profile-visited-to', pk=self.user.id).data['results']), 3)
+
+    def test_event_users(self):
+        self.assertEqual(len(self.get('event-get-users', pk=self.event.id).data['results']), 4)
+
+    def test_user_list_does_not_select_about_columns(self):
+        queryset = QuerysetService.only_serializer_fields(User.objects.all(), UserBasicSerializer)
+
+        self.assertEqual(queryset.query.deferred_loading[1], False)
+        self.assertNotIn('about_self', queryset.query.deferred_loading[0])
+
+
+class KeysetPaginationTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        created_at = timezone.now()
+        cls.users = [
+            # pairs of users share a created_at so the primary key has to break ties
+            User.objects.create_user(
+                username=f'user{i}', email=f'user{i}@example.com', password='secret',
+                created_at=created_at - timezone.timedelta(minutes=i // 2)
+            )
+            for i in range(7)
+        ]
+        cls.user = cls.users[0]
+        for minutes, viewer in enumerate(cls.users[1:]):
+            ProfileView.objects.create(viewer=viewer, viewee=cls.user, created_at=created_at - timezone.timedelta(minutes=minutes))
+        # left out of their own discovery feed
+        cls.requester = User.objects.create_user(username='requester', email='requester@example.com', password='secret')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.requester)
+
+    def walk(self, url):
+        pages = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            # the per row counts of the serializers hit users_sentiment, a page count would hit users_user
+            self.assertFalse([
+                query for query in queries if 'COUNT(*)' in query['sql'] and 'FROM "users_user"' in query['sql']
+            ])
+            pages.append(response.data)
+            url = response.data['next']
+        return pages
+
+    def test_pages_follow_created_at_then_id(self):
+        pages = self.walk(reverse('user-list') + '?page_size=3')
+
+        ids = [user['id'] for page in pages for user in page['results']]
+        expected = sorted(self.users, key=lambda user: (user.created_at, user.id), reverse=True)
+        self.assertEqual(ids, [user.id for user in expected])
+        self.assertEqual([len(page['results']) for page in pages], [3, 3, 1])
+        self.assertIsNone(pages[0]['previous'])
+
+    def test_previous_link_returns_the_previous_page(self):
+        pages = self.walk(reverse('user-list') + '?page_size=3')
+
+        response = self.client.get(pages[2]['previous'])
+
+        self.assertEqual(response.data['results'], pages[1]['results'])
+
+    def test_annotated_sort_key(self):
+        url = reverse('user-get-profile-visited-by', kwargs={'pk': self.user.id}) + '?page_size=4'
+        pages = self.walk(url)
+
+        ids = [user['id'] for page in pages for user in page['results']]
+        self.assertEqual(ids, [user.id for user in self.users[1:]])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('user-list') + '?cursor=bm9wZQ==')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ResponseCacheTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='owner', email='owner@example.com', password='secret')
+        cls.other = User.objects.create_user(username='other', email='other@example.com', password='secret')
+        now = timezone.now()
+        cls.event = Event.objects.create(
+            title='Meetup', start_date=now, end_date=now + timezone.timedelta(days=1),
+            address='1 Main St', city='Lahore', state='Punjab', country='PK', created_by=cls.user
+        )
+
+    def setUp(self):
+        cache.clear()
+        RESPONSE_CACHE_METRIC.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_own_profile_is_served_from_cache(self):
+        url = reverse('user-detail', kwargs={'pk': self.user.pk})
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['username'], 'owner')
+        self.assertEqual(RESPONSE_CACHE_METRIC.value(endpoint='UserAPIViewSet.retrieve', result='hit'), 1)
+
+    def test_other_profiles_are_not_cached(self):
+        response = self.client.get(reverse('user-detail', kwargs={'pk': self.other.pk}))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('X-Cache', response)
+
+    def test_sentiment_invalidates_the_profile(self):
+        url = reverse('user-detail', kwargs={'pk': self.user.pk})
+        self.client.get(url)
+
+        Sentiment.objects.create(sentiment_from=self.other, sentiment_to=self.user, sentiment=Sentiment.SentimentStatus.LIKE)
+        response = self.client.get(url)
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['profile_likes'], 1)
+
+    def test_event_list_varies_per_user_and_follows_answers(self):
+        url = reverse('event-list')
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+        UserEvent.objects.create(event=self.event, user=self.user, interest_status=UserEvent.InterestStatus.ATTEND)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['interest_status'], UserEvent.InterestStatus.ATTEND)
+
+        self.client.force_authenticate(self.other)
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['interest_status'], UserEvent.InterestStatus.IGNORE)
+
+    def test_answers_keep_the_event_lists_of_other_users(self):
+        url = reverse('event-list')
+        self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            UserEvent.objects.create(event=self.event, user=self.other, interest_status=UserEvent.InterestStatus.ATTEND)
+
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+    def test_pending_events_are_cached_until_one_ends(self):
+        now = timezone.now()
+        Event.objects.create(
+            title='Ending', start_date=now - timezone.timedelta(hours=1), end_date=now + timezone.timedelta(seconds=30),
+            address='1 Main St', city='Lahore', state='Punjab', country='PK', created_by=self.user
+        )
+        url = reverse('event-list') + '?status=pending'
+        self.client.get(url)
+
+        with mock.patch('django.core.cache.backends.locmem.time') as clock:
+            clock.time.return_value = now.timestamp() + 20
+            self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+            clock.time.return_value = now.timestamp() + 40
+            self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+
+
+class MatchTestCase(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.first, cls.second = [
+            User.objects.create_user(username=name, email=f'{name}@example.com', password='secret')
+            for name in ('owner', 'first', 'second')
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def like(self, sentiment_from, sentiment_to, sentiment=Sentiment.SentimentStatus.LIKE):
+        return self.client.post(reverse('user_sentiment-list'), {
+            'sentiment_from': sentiment_from.pk, 'sentiment_to': sentiment_to.pk, 'sentiment': sentiment,
+        })
+
+    def test_mutual_like_creates_a_match_for_both_users(self):
+        self.like(self.user, self.first)
+        self.assertFalse(Match.objects.exists())
+
+        self.like(self.first, self.user)
+
+        self.assertCountEqual(
+            Match.objects.values_list('user', 'matched_user'),
+            [(self.user.pk, self.first.pk), (self.first.pk, self.user.pk)],
+        )
+        self.assertCountEqual(Notification.objects.filter(matches__isnull=False).values_list('user', flat=True), [
+            self.user.pk, self.first.pk,
+        ])
+
+    def test_liking_again_does_not_notify_again(self):
+        self.like(self.user, self.first)
+        self.like(self.first, self.user)
+        self.like(self.first, self.user)
+
+        self.assertEqual(Match.objects.count(), 2)
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_breaking_the_mutual_like_removes_the_match(self):
+        self.like(self.user, self.first)
+        self.like(self.first, self.user)
+
+        self.like(self.first, self.user, Sentiment.SentimentStatus.DISLIKE)
+
+        self.assertFalse(Match.objects.exists())
+        self.assertFalse(Notification.objects.exists())
+
+    def test_deleting_a_like_removes_the_match(self):
+        self.like(self.user, self.first)
+        self.like(self.first, self.user)
+
+        Sentiment.objects.get(sentiment_from=self.first).delete()
+
+        self.assertFalse(Match.objects.exists())
+
+    def test_matches_endpoint_lists_the_latest_matches_first(self):
+        for other in (self.first, self.second):
+            self.like(self.user, other)
+            self.like(other, self.user)
+
+        response = self.client.get(reverse('user-get-matches', kwargs={'pk': self.user.pk}))
+
+        self.assertEqual([user['id'] for user in response.data['results']], [self.second.pk, self.first.pk])
+        self.assertIsNotNone(response.data['results'][0]['matched_at'])
+        self.assertWithinQueryBudget(response)
+
+    def test_backfill(self):
+        Sentiment.objects.bulk_create([
+            Sentiment(sentiment_from=sentiment_from, sentiment_to=sentiment_to, sentiment=Sentiment.SentimentStatus.LIKE)
+            for sentiment_from, sentiment_to in ((self.user, self.first), (self.first, self.user), (self.user, self.second))
+        ])
+
+        self.assertEqual(Match.objects.backfill(), 2)
+        self.assertEqual(Match.objects.backfill(), 0)
+        self.assertFalse(Notification.objects.exists())
+
+
+class DiscoveryTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.first, cls.second, cls.inactive = [
+            User.objects.create_user(username=name, email=f'{name}@example.com', password='secret')
+            for name in ('owner', 'first', 'second', 'inactive')
+        ]
+        User.objects.filter(pk=cls.inactive.pk).update(is_active=False)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def discover(self):
+        response = self.client.get(reverse('user-list'))
+        return [user['id'] for user in response.data['results']]
+
+    def react(self, other, sentiment):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('user_sentiment-list'), {
+                'sentiment_from': self.user.pk, 'sentiment_to': other.pk, 'sentiment': sentiment,
+            })
+
+    def test_leaves_out_the_user_and_inactive_users(self):
+        self.assertEqual(self.discover(), [self.second.pk, self.first.pk])
+
+    def test_leaves_out_disliked_users_until_the_dislike_is_withdrawn(self):
+        self.discover()
+
+        self.react(self.first, Sentiment.SentimentStatus.DISLIKE)
+        self.assertEqual(self.discover(), [self.second.pk])
+
+        self.react(self.first, Sentiment.SentimentStatus.LIKE)
+        self.assertEqual(self.discover(), [self.second.pk, self.first.pk])
+
+    def test_viewed_profiles_are_left_out(self):
+        self.discover()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProfileView.objects.create(viewer=self.user, viewee=self.second)
+
+        self.assertEqual(self.discover(), [self.first.pk])
+        with self.assertNumQueries(1):
+            self.assertEqual(self.discover(), [self.first.pk])
+
+    def test_exclusions_built_while_a_dislike_commits_are_not_kept(self):
+        build = DiscoveryExclusions.build
+
+        def build_during_dislike(user_id):
+            ids = build(user_id)
+            with self.captureOnCommitCallbacks(execute=True):
+                Sentiment.objects.create(
+                    sentiment_from=self.user, sentiment_to=self.first, sentiment=Sentiment.SentimentStatus.DISLIKE
+                )
+            return ids
+
+        with mock.patch.object(DiscoveryExclusions, 'build', side_effect=build_during_dislike):
+            self.discover()
+
+        self.assertEqual(self.discover(), [self.second.pk])
+
+
+class ProfileSearchTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        def user(name, **fields):
+            return User.objects.create_user(username=name, email=f'{name}@example.com', password='secret', **fields)
+
+        cls.user = user('owner', about_self='A vegetarian doctor.')
+        cls.in_self = user('self', about_self='I am a vegetarian doctor in Lahore.', city='Lahore', gender='F')
+        cls.in_likes = user('likes', about_self='A doctor.', about_likes='Vegetarian cooking', city='Karachi')
+        cls.in_partner = user(
+            'partner', about_partner='Looking for a vegetarian doctor', city='lahore', gender='F',
+            date_of_birth=timezone.localdate() - timezone.timedelta(days=365 * 40),
+        )
+        cls.inactive = user('inactive', about_self='vegetarian doctor', is_active=False)
+        cls.unrelated = user('unrelated', about_self='An engineer who loves cricket.')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('user-search')
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [user['id'] for user in response.data['results']]
+
+    def test_what_users_say_of_themselves_ranks_first(self):
+        self.assertEqual(
+            self.search(q='vegetarian doctor'), [self.in_self.pk, self.in_likes.pk, self.in_partner.pk],
+        )
+
+    def test_search_combines_with_the_structured_filters(self):
+        self.assertEqual(self.search(q='vegetarian doctor', city='LAHORE'), [self.in_self.pk, self.in_partner.pk])
+        self.assertEqual(self.search(q='vegetarian doctor', gender='F', min_age=30), [self.in_partner.pk])
+        self.assertEqual(self.search(q='vegetarian doctor', gender='F', max_age=30), [self.in_self.pk])
+
+    def test_leaves_out_disliked_users_but_not_viewed_ones(self):
+        Sentiment.objects.create(
+            sentiment_from=self.user, sentiment_to=self.in_self, sentiment=Sentiment.SentimentStatus.DISLIKE
+        )
+        ProfileView.objects.create(viewer=self.user, viewee=self.in_likes)
+
+        self.assertEqual(self.search(q='vegetarian doctor'), [self.in_likes.pk, self.in_partner.pk])
+
+    def test_dislikes_leave_out_profiles_from_the_next_search(self):
+        self.search(q='vegetarian doctor')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Sentiment.objects.create(
+                sentiment_from=self.user, sentiment_to=self.in_self, sentiment=Sentiment.SentimentStatus.DISLIKE
+            )
+            ProfileView.objects.create(viewer=self.user, viewee=self.in_likes)
+
+        self.assertEqual(self.search(q='vegetarian doctor'), [self.in_likes.pk, self.in_partner.pk])
+        # the truncation check and the page read the cached exclusions, profile views don't change them
+        with self.captureOnCommitCallbacks(execute=True):
+            ProfileView.objects.create(viewer=self.user, viewee=self.in_partner)
+        with self.assertNumQueries(2):
+            self.assertEqual(self.search(q='vegetarian doctor'), [self.in_likes.pk, self.in_partner.pk])
+
+    def test_vector_follows_updates(self):
+        self.unrelated.about_likes = 'Doctor Who and vegetarian food'
+        self.unrelated.save()
+        User.objects.filter(pk=self.in_likes.pk).update(about_likes=None)
+
+        self.assertEqual(self.search(q='vegetarian doctor'), [self.in_self.pk, self.unrelated.pk, self.in_partner.pk])
+        self.assertEqual(self.search(q='cricket'), [self.unrelated.pk])
+
+    def test_saving_other_fields_keeps_the_vector(self):
+        vector = User.objects.values_list('search_vector', flat=True).get(pk=self.in_self.pk)
+        user = User.objects.get(pk=self.in_self.pk)
+        user.city = 'Karachi'
+        user.save()
+
+        self.assertEqual(User.objects.values_list('search_vector', flat=True).get(pk=self.in_self.pk), vector)
+
+    def test_ranked_pages_have_no_gaps_or_duplicates(self):
+        ids = []
+        response = self.client.get(self.url, {'q': 'vegetarian', 'page_size': 1})
+        while True:
+            ids += [user['id'] for user in response.data['results']]
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+
+        self.assertEqual(ids, self.search(q='vegetarian'))
+
+    @override_settings(USER_SEARCH_MAX_RANKED=3)
+    def test_older_better_matches_are_ranked_when_every_match_is(self):
+        response = self.client.get(self.url, {'q': 'vegetarian doctor'})
+
+        # the oldest profile says it of themselves
+        self.assertEqual(
+            [user['id'] for user in response.data['results']], [self.in_self.pk, self.in_likes.pk, self.in_partner.pk]
+        )
+        self.assertFalse(response.data['truncated'])
+
+    @override_settings(USER_SEARCH_MAX_RANKED=2)
+    def test_only_the_newest_matches_are_ranked_and_the_response_says_so(self):
+        response = self.client.get(self.url, {'q': 'vegetarian doctor'})
+        self.assertEqual([user['id'] for user in response.data['results']], [self.in_likes.pk, self.in_partner.pk])
+        self.assertTrue(response.data['truncated'])
+
+        response = self.client.get(self.url, {'q': 'vegetarian doctor', 'city': 'Lahore'})
+        self.assertEqual([user['id'] for user in response.data['results']], [self.in_self.pk, self.in_partner.pk])
+        self.assertFalse(response.data['truncated'])
+
+    def test_invalid_parameters(self):
+        for params in ({}, {'q': ' '}, {'q': 'doctor', 'gender': 'X'}, {'q': 'doctor', 'min_age': 40, 'max_age': 30}):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class QueryBudgetTestCase(QueryBudgetTestMixin, TestCase):
+    """Every list and detail action stays within its query budget with a full page of rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [
+            User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='secret')
+            for i in range(12)
+        ]
+        cls.user = cls.users[0]
+        now = timezone.now()
+        for i, other in enumerate(cls.users[1:]):
+            Sentiment.objects.create(sentiment_from=cls.user, sentiment_to=other, sentiment=Sentiment.SentimentStatus.LIKE)
+            sentiment = Sentiment.objects.create(
+                sentiment_from=other, sentiment_to=cls.user, sentiment=Sentiment.SentimentStatus.LIKE
+            )
+            ProfileView.objects.create(viewer=cls.user, viewee=other)
+            profile_view = ProfileView.objects.create(viewer=other, viewee=cls.user)
+            Notification.objects.create(user=cls.user, content='liked', content_object=sentiment)
+            Notification.objects.create(user=cls.user, content='viewed', content_object=profile_view)
+            event = Event.objects.create(
+                title=f'Meetup {i}', start_date=now, end_date=now + timezone.timedelta(days=1),
+                address='1 Main St', city='Lahore', state='Punjab', country='PK', created_by=cls.user
+            )
+            UserEvent.objects.create(event=event, user=cls.user, interest_status=UserEvent.InterestStatus.ATTEND)
+        cls.event = Event.objects.first()
+        for other in cls.users[1:]:
+            UserEvent.objects.create(event=cls.event, user=other)
+        PaymentPlan.objects.create(title='Gold', amount=2000)
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_read_actions_stay_within_their_budget(self):
+        sentiment = Sentiment.objects.first()
+        profile_view = ProfileView.objects.first()
+        user_event = UserEvent.objects.first()
+        notification = Notification.objects.filter(user=self.user).first()
+        urls = [
+            reverse('user-list'),
+            reverse('user-detail', kwargs={'pk': self.user.pk}),
+            reverse('user-detail', kwargs={'pk': self.users[1].pk}),
+            reverse('user-get-events', kwargs={'pk': self.user.pk}),
+            reverse('user-get-user-sentiments-from', kwargs={'pk': self.user.pk}),
+            reverse('user-get-user-sentiments-to', kwargs={'pk': self.user.pk}),
+            reverse('user-get-profile-visited-by', kwargs={'pk': self.user.pk}),
+            reverse('user-get-profile-visited-to', kwargs={'pk': self.user.pk}),
+            reverse('user-get-matches', kwargs={'pk': self.user.pk}),
+            reverse('user-search') + '?q=doctor',
+            reverse('event-list'),
+            reverse('event-list') + '?status=pending',
+            reverse('event-detail', kwargs={'pk': self.event.pk}),
+            reverse('event-get-users', kwargs={'pk': self.event.pk}),
+            reverse('user_event-list'),
+            reverse('user_event-detail', kwargs={'pk': user_event.pk}),
+            reverse('user_sentiment-list'),
+            reverse('user_sentiment-detail', kwargs={'pk': sentiment.pk}),
+            reverse('profile_views-list'),
+            reverse('profile_views-detail', kwargs={'pk': profile_view.pk}),
+            reverse('notifications-list'),
+            reverse('notifications-detail', kwargs={'pk': notification.pk}),
+            reverse('payment_plan-list'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertWithinQueryBudget(response)
+
+    def test_query_stats_headers(self):
+        url = reverse('user-get-profile-visited-by', kwargs={'pk': self.user.pk})
+        response = self.client.get(url)
+
+        self.assertEqual(response['X-DB-Query-Count'], str(response.query_stats.count))
+        self.assertEqual(response['X-DB-Query-Budget'], '3')
+        self.assertEqual(response['X-DB-Duplicate-Queries'], '0')
+
+        # without the annotated counts the serializer queries them per listed user
+        with mock.patch.object(UserQuerySet, 'with_sentiment_counts', lambda queryset: queryset), \
+                self.assertLogs('backend.sql', 'WARNING'):
+            response = self.client.get(url)
+
+        # the per row like and dislike counts of the 10 listed users share one fingerprint
+        [(sql, count)] = response.query_stats.duplicates
+        self.assertIn('FROM "users_sentiment"', sql)
+        self.assertEqual(count, 20)
+        self.assertEqual(response['X-DB-Duplicate-Queries'], '19')
+
+    def test_going_over_budget_is_logged(self):
+        with mock.patch.dict(UserAPIViewSet.query_budgets, {'list': 0}), self.assertLogs('backend.sql', 'WARNING') as logs:
+            self.client.get(reverse('user-list'))
+
+        self.assertIn('endpoint=UserAPIViewSet.list', logs.output[0])
+        self.assertIn('budget=0', logs.output[0])
+
+
+class IndexScanTestCase(IndexScanTestMixin, TestCase):
+    """The sentiment and profile view lists read their tables through indexes at a realistic size."""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            'generate_synthetic_data', users=1000, sentiments_per_user=20, views_per_user=20, events=0,
+            notification_ratio=0, batch_size=5000, stdout=StringIO(),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE users_user, users_sentiment, users_profileview')
+        cls.user = User.objects.get(username='synthetic100')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, name, query=''):
+        response = self.client.get(reverse(name, kwargs={'pk': self.user.pk}) + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_sentiment_lists(self):
+        with self.assertIndexScans('users_sentiment') as indexes:
+            self.get('user-get-user-sentiments-from')
+            self.get('user-get-user-sentiments-from', '?sentiment=L')
+            self.get('user-get-user-sentiments-to', '?sentiment=D')
+
+        self.assertIn('users_sentiment_to_idx', indexes)
+        # the sentiment is read from the joined row, not looked up again per user
+        self.assertNotIn('users_sentiment_pair_uniq', indexes)
+
+    def test_profile_view_lists(self):
+        with self.assertIndexScans('users_profileview') as indexes:
+            self.get('user-get-profile-visited-by')
+            self.get('user-get-profile-visited-to')
+
+        self.assertEqual(indexes & {'users_profileview_viewee_idx', 'users_profileview_viewer_idx'}, {
+            'users_profileview_viewee_idx', 'users_profileview_viewer_idx',
+        })
+
+    def test_profile_counts(self):
+        with self.assertIndexScans('users_sentiment', 'users_profileview') as indexes:
+            self.get('user-detail')
+
+        self.assertIn('users_sentiment_to_idx', indexes)
+        self.assertIn('users_profileview_viewee_idx', indexes)
+
+
+class UserImportExportTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.existing = User.objects.create_user(
+            username='existing', email='existing@example.com', password='secret', date_of_birth='1990-05-04',
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+    def import_users(self, lines, *args, name='users.jsonl'):
+        path = self.directory / name
+        path.write_text('\n'.join(lines) + '\n')
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_users', str(path), *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue().splitlines()
+
+    def test_import_rejects_invalid_and_duplicate_rows(self):
+        stdout, errors = self.import_users([
+            json.dumps({'username': 'first', 'email': 'first@example.com', 'password': 'secret', 'gender': 'F'}),
+            json.dumps({'username': 'second', 'email': 'second@example.com', 'gender': 'X'}),
+            json.dumps({'username': 'third', 'email': 'existing@example.com'}),
+            json.dumps({'username': 'fourth', 'email': 'first@example.com'}),
+            '{"username": ',
+        ], '--domain=example.com', '--batch-size=3')
+
+        self.assertEqual(stdout, '1 users imported, 4 rows rejected\n')
+        self.assertCountEqual([error.split(':')[0] for error in errors], ['line 2', 'line 3', 'line 4', 'line 5'])
+        user = User.objects.get(username='first')
+        self.assertFalse(user.is_active)
+        self.assertTrue(user.check_password('secret'))
+        self.assertEqual(user.gender, User.Gender.FEMALE)
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.to, 'first@example.com')
+        self.assertIn('http://example.com/', email.body)
+
+    def test_import_needs_a_domain_for_the_activation_emails(self):
+        with self.assertRaisesMessage(Exception, '--domain'):
+            self.import_users([json.dumps({'username': 'first', 'email': 'first@example.com'})])
+
+    def test_csv_export_imports_back(self):
+        output = self.directory / 'users.csv'
+        call_command('export_users', str(output), '--chunk-size=1', stdout=StringIO())
+        User.objects.all().delete()
+
+        stdout, errors = self.import_users(output.read_text().splitlines(), '--active', name='users.csv')
+
+        self.assertEqual(errors, [])
+        user = User.objects.get()
+        self.assertEqual((user.username, user.email, str(user.date_of_birth)), (
+            'existing', 'existing@example.com', '1990-05-04',
+        ))
+        self.assertTrue(user.is_active)
+        self.assertFalse(user.has_usable_password())
+        self.assertFalse(OutboxEmail.objects.exists())
+
+    def test_jsonl_export_without_server_side_cursors(self):
+        User.objects.create_user(username='other', email='other@example.com', password='secret', is_active=False)
+        stdout = StringIO()
+
+        with mock.patch.dict(connection.settings_dict, {'DISABLE_SERVER_SIDE_CURSORS': True}):
+            call_command('export_users', '--chunk-size=1', stdout=stdout)
+
+        rows = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([row['username'] for row in rows], ['existing', 'other'])
+        self.assertNotIn('password', rows[0])
@@ -11,6 +11,7 @@ class ProfileViewAPIViewSet(ModelViewSet):
     permission_classes = (IsAuthenticated,)
     queryset = ProfileView.objects
     serializer_class = ProfileViewSerializer
+    query_budgets = {'list': 2, 'retrieve': 2}
 
     def get_queryset(self):
         queryset = self.queryset
@@ -10,6 +10,7 @@ class SentimentAPIViewSet(ModelViewSet):
     permission_classes = (IsAuthenticated,)
     queryset = Sentiment.objects
     serializer_class = SentimentSerializer
+    query_budgets = {'list': 2, 'retrieve': 2}
 
     def get_queryset(self):
         sentiment = self.request.query_params.get('sentiment')
@@ -1,15 +1,13 @@
+from django.conf import settings
 from django.contrib.sites.shortcuts import get_current_site
-from django.core.mail import EmailMessage
-from django.db.models import Subquery, OuterRef, Count, Q
+from django.db import transaction
+from django.db.models import Subquery, OuterRef, Count, Q, F
 from django.http import QueryDict
-from django.template.loader import render_to_string
-from django.utils.encoding import force_bytes
-from django.utils.http import urlsafe_base64_encode
+from django.utils import timezone
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework import status, filters
 from rest_framework.decorators import action
 from rest_framework.generics import get_object_or_404
-from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import IsAuthenticated, AllowAny, BasePermission
 from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
@@ -17,12 +15,15 @@ from rest_framework.viewsets import ModelViewSet
 from backend.events.enum import EventStatus
 from backend.events.models import Event, UserEvent
 from backend.events.serializers import EventDetailSerializer
+from backend.users.activation import activation_email
 from backend.users.models import Sentiment, User, ProfileView
 from backend.users.serializers import (
-    UserDetailSerializer, UserBasicSerializer, UserBasicSentimentSerializer, UserBasicProfileViewSerializer
+    UserDetailSerializer, UserBasicSerializer, UserBasicSentimentSerializer, UserBasicProfileViewSerializer,
+    UserBasicMatchSerializer, UserSearchFilterSerializer
 )
-from backend.users.tokens import account_activation_token
 from services.date_service import DateService
+from services.queryset_service import QuerysetService
+from services.response_cache_service import cache_response
 
 
 class IsOwner(BasePermission):
@@ -81,6 +82,20 @@ extend_profile_views_schema = extend_schema(
 )
 
 GET_USER_EVENTS_ACTION = 'get_events'
+SEARCH_ACTION = 'search'
+
+# default sort keys of the paginated actions, the primary key is added as a tie-breaker
+ACTION_ORDERINGS = {
+    GET_USER_EVENTS_ACTION: '-end_date',
+    'get_profile_visited_by': '-last_viewed',
+    'get_profile_visited_to': '-last_viewed',
+    'get_matches': '-matched_at',
+    SEARCH_ACTION: ('-rank', '-created_at'),
+}
+
+
+def is_own_profile(view, request):
+    return view.kwargs.get('pk') == str(request.user.pk)
 
 
 class UserAPIViewSet(ModelViewSet):
@@ -88,21 +103,24 @@ class UserAPIViewSet(ModelViewSet):
     serializer_class = UserDetailSerializer
     filter_backends = (filters.OrderingFilter,)
     ordering_fields = ('created_at',)
-    ordering = '-created_at'
+    # statements per request for a default page, one of them for the JWT user lookup,
+    # see backend.middleware.QueryInstrumentationMiddleware
+    query_budgets = {
+        # the discovery or search exclusions of the user are built once, on a cache miss
+        'list': 3,
+        'retrieve': 7,
+        GET_USER_EVENTS_ACTION: 3,
+        'get_user_sentiments_from': 3,
+        'get_user_sentiments_to': 3,
+        'get_profile_visited_by': 3,
+        'get_profile_visited_to': 3,
+        'get_matches': 3,
+        SEARCH_ACTION: 4,
+    }
 
     @property
-    def paginator(self):
-        """
-        The paginator instance associated with the view, or `None`.
-        """
-        if not hasattr(self, '_paginator'):
-            if self.pagination_class is None:
-                self._paginator = None
-            elif self.action != GET_USER_EVENTS_ACTION:
-                self._paginator = CursorPagination()
-            else:
-                self._paginator = self.pagination_class()
-        return self._paginator
+    def ordering(self):
+        return ACTION_ORDERINGS.get(self.action, '-created_at')
 
     def get_object(self):
         """
@@ -112,7 +130,8 @@ class UserAPIViewSet(ModelViewSet):
         queryset lookups.  Eg if objects are referenced using multiple
         keyword arguments in the url conf.
         """
-        queryset = self.filter_queryset(self.get_users_queryset())
+        # the only filter backend is the ordering, which a single lookup doesn't need
+        queryset = self.get_users_queryset()
 
         # Perform the lookup filtering.
         lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
@@ -135,12 +154,14 @@ class UserAPIViewSet(ModelViewSet):
     def get_serializer_class(self):
         if self.action == GET_USER_EVENTS_ACTION:
             return EventDetailSerializer
-        elif self.action == 'list':
+        elif self.action in ['list', SEARCH_ACTION]:
             return UserBasicSerializer
         elif self.action in ['get_user_sentiments_from', 'get_user_sentiments_to']:
             return UserBasicSentimentSerializer
         elif self.action in ['get_profile_visited_by', 'get_profile_visited_to']:
             return UserBasicProfileViewSerializer
+        elif self.action == 'get_matches':
+            return UserBasicMatchSerializer
 
         return super(UserAPIViewSet, self).get_serializer_class()
 
@@ -155,61 +176,61 @@ class UserAPIViewSet(ModelViewSet):
             return self.get_profile_visited_by_queryset()
         elif self.action == 'get_profile_visited_to':
             return self.get_profile_visited_to_queryset()
+        elif self.action == 'get_matches':
+            return self.get_matches_queryset()
+        elif self.action == 'list':
+            return self.get_discovery_queryset()
+        elif self.action == SEARCH_ACTION:
+            return self.get_search_queryset()
 
         return self.get_users_queryset()
 
     def get_users_queryset(self):
-        return User.objects.all()
-
-    def get_user_sentiments_from_queryset(self):
-        sentiment = self.request.query_params.get('sentiment')
-        user = self.get_object()
-
-        query = {
-            'sentiments_from__sentiment_to': user
-        }
-        if sentiment:
-            query['sentiments_from__sentiment'] = sentiment
+        return QuerysetService.only_serializer_fields(User.objects.all(), self.get_serializer_class())
 
-        queryset = User.objects.filter(
-            **query
-        ).annotate(
-            sentiment=Subquery(
-                Sentiment.objects.filter(
-                    sentiment_from=OuterRef('id'),
-                    sentiment_to=user
-                ).values('sentiment')[:1]
-            )
+    def get_discovery_queryset(self):
+        return QuerysetService.only_serializer_fields(
+            User.objects.discoverable_by(self.request.user), self.get_serializer_class()
         )
-        return queryset.exclude(sentiment=Sentiment.SentimentStatus.NEUTRAL)
 
-    def get_user_sentiments_to_queryset(self):
-        sentiment = self.request.query_params.get('sentiment')
-        user = self.get_object()
+    def get_search_queryset(self):
+        serializer = UserSearchFilterSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = dict(serializer.validated_data)
+
+        text = params.pop('q')
+        queryset = User.objects.searchable_by(self.request.user)
+        today = timezone.localdate()
+        if 'min_age' in params:
+            queryset = queryset.filter(date_of_birth__lte=DateService.years_before(today, params.pop('min_age')))
+        if 'max_age' in params:
+            queryset = queryset.filter(date_of_birth__gt=DateService.years_before(today, params.pop('max_age') + 1))
+        queryset = queryset.filter(**{
+            f'{field}__iexact' if field in ('country', 'city', 'community', 'mother_tongue') else field: value
+            for field, value in params.items()
+        })
+        # the GIN index finds the matching profiles, the filters check them before they are ranked
+        self.search_truncated = queryset.has_unranked_matches(text, settings.USER_SEARCH_MAX_RANKED)
+        queryset = queryset.search(text, max_ranked=settings.USER_SEARCH_MAX_RANKED)
+        return QuerysetService.only_serializer_fields(queryset, self.get_serializer_class())
 
-        query = {
-            'sentiments_to__sentiment_from': user
-        }
-        if sentiment:
-            query['sentiments_to__sentiment'] = sentiment
+    def get_user_sentiments_from_queryset(self):
+        queryset = User.objects.reacted_to(
+            self.get_object(), self.request.query_params.get('sentiment')
+        ).with_sentiment_counts()
+        return QuerysetService.only_serializer_fields(queryset, self.get_serializer_class())
 
-        queryset = User.objects.filter(
-            **query
-        ).annotate(
-            sentiment=Subquery(
-                Sentiment.objects.filter(
-                    sentiment_to=OuterRef('id'),
-                    sentiment_from=user
-                ).values('sentiment')[:1]
-            )
-        )
-        return queryset.exclude(sentiment=Sentiment.SentimentStatus.NEUTRAL)
+    def get_user_sentiments_to_queryset(self):
+        queryset = User.objects.reacted_by(
+            self.get_object(), self.request.query_params.get('sentiment')
+        ).with_sentiment_counts()
+        return QuerysetService.only_serializer_fields(queryset, self.get_serializer_class())
 
     def get_user_events_queryset(self):
         status = self.request.query_params.get('status')
         interest = self.request.query_params.get('interest')
 
-        queryset = Event.objects
+        queryset = Event.objects.active()
         if status and status.lower() == EventStatus.PAST.value:
             queryset = queryset.filter_past_events()
         elif status and status.lower() == EventStatus.PENDING.value:
@@ -221,19 +242,8 @@ class UserAPIViewSet(ModelViewSet):
         else:
             query = query & ~Q(user_events__interest_status=UserEvent.InterestStatus.IGNORE)
 
-        queryset = queryset.filter(query).annotate(
-            attend_count=Count(
-                'user_events',
-                filter=Q(user_events__interest_status=UserEvent.InterestStatus.ATTEND)
-            ),
-            not_attend_count=Count(
-                'user_events',
-                filter=Q(user_events__interest_status=UserEvent.InterestStatus.NOT_ATTEND)
-            ),
-            ignore_count=Count(
-                'user_events',
-                filter=Q(user_events__interest_status=UserEvent.InterestStatus.IGNORE)
-            ),
+        # counted over every answer to the event, not only the joined one of the user
+        queryset = queryset.filter(query).with_interest_counts().annotate(
             interest_status=Subquery(
                 UserEvent.objects.filter(
                     event=OuterRef('id'),
@@ -284,8 +294,9 @@ class UserAPIViewSet(ModelViewSet):
             )
         ).filter(
             view_count__gt=0
-        ).distinct()
+        ).with_sentiment_counts()
 
+        queryset = QuerysetService.only_serializer_fields(queryset, self.get_serializer_class())
         return queryset.order_by('-last_viewed')
 
     def get_profile_visited_to_queryset(self):
@@ -322,10 +333,24 @@ class UserAPIViewSet(ModelViewSet):
             )
         ).filter(
             view_count__gt=0
-        ).distinct()
+        ).with_sentiment_counts()
 
+        queryset = QuerysetService.only_serializer_fields(queryset, self.get_serializer_class())
         return queryset.order_by('-last_viewed')
 
+    def get_matches_queryset(self):
+        # one range of the users_match_user_created_idx index, joined to the matched users
+        queryset = User.objects.filter(
+            matched_by__user=self.get_object()
+        ).annotate(
+            matched_at=F('matched_by__created_at')
+        )
+        return QuerysetService.only_serializer_fields(queryset, self.get_serializer_class())
+
+    @cache_response('user:{pk}', 'payment_plans', condition=is_own_profile)
+    def retrieve(self, request, *args, **kwargs):
+        return super(UserAPIViewSet, self).retrieve(request, *args, **kwargs)
+
     def is_create_api(self):
         return self.action == 'create'
 
@@ -344,25 +369,14 @@ class UserAPIViewSet(ModelViewSet):
         request.data.update({'is_active': False})
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = self.perform_create(serializer)
-        self.send_activation_email(request, user)
+        with transaction.atomic():
+            user = self.perform_create(serializer)
+            self.send_activation_email(request, user)
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
     def send_activation_email(self, request, user):
-        current_site = get_current_site(request)
-        mail_subject = 'Matrimony Account Activation Link.'
-        message = render_to_string('acc_active_email.html', {
-            'user': user,
-            'domain': current_site.domain,
-            'uid': urlsafe_base64_encode(force_bytes(user.pk)),
-            'token': account_activation_token.make_token(user),
-        })
-        to_email = user.email
-        email = EmailMessage(
-            mail_subject, message, to=[to_email]
-        )
-        email.send()
+        activation_email(user, get_current_site(request).domain).save()
 
     @extend_schema(
         responses=EventDetailSerializer(many=True),
@@ -399,3 +413,31 @@ class UserAPIViewSet(ModelViewSet):
     @action(detail=True, methods=['get'], url_path='profile-visited-to')
     def get_profile_visited_to(self, request, *args, **kwargs):
         return super(UserAPIViewSet, self).list(request, *args, **kwargs)
+
+    @extend_schema(
+        responses=UserBasicMatchSerializer(many=True),
+        parameters=[
+            OpenApiParameter(
+                name='id', location=OpenApiParameter.PATH,
+                description='A unique integer value identifying this user.',
+                required=True, type=int
+            ),
+        ],
+    )
+    @action(detail=True, methods=['get'], url_path='matches')
+    def get_matches(self, request, *args, **kwargs):
+        return super(UserAPIViewSet, self).list(request, *args, **kwargs)
+
+    @extend_schema(parameters=[UserSearchFilterSerializer])
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request, *args, **kwargs):
+        """
+        The active profiles whose about texts match the ``q`` words, the best
+        matches first, narrowed by the structured filters. Profiles the user
+        disliked are left out, viewed ones are not, unlike the discovery list.
+        Only the newest matches are ranked, ``truncated`` is true when older
+        ones were left out: more words or filters find them.
+        """
+        response = super(UserAPIViewSet, self).list(request, *args, **kwargs)
+        response.data['truncated'] = self.search_truncated
+        return response
@@ -0,0 +1,69 @@
+import json
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.views import View
+from rest_framework import exceptions
+
+from backend.authentication.authentication import CachedJWTAuthentication
+from services.metrics_service import MetricsService, TEXT_CONTENT_TYPE
+
+
+def metrics(request):
+    """The metrics of the serving process, for Prometheus to scrape."""
+    if not MetricsService.is_authorized(request.headers.get('Authorization')):
+        return HttpResponseForbidden()
+    return HttpResponse(MetricsService.render(), content_type=TEXT_CONTENT_TYPE)
+
+
+class AsyncAPIView(View):
+    """
+    View whose handlers are coroutines, for the endpoints mostly waiting on
+    the network: under ASGI they wait on the event loop, with no thread blocked
+    on them, as long as every middleware is async capable. DRF views are
+    sync only, so this authenticates the JWT and answers its errors as they
+    do. The ORM is sync only before Django 4.1, call it through
+    ``sync_to_async``, and read ``request.user`` fields outside the slim ones
+    there too, they are loaded on first access.
+    """
+    authentication_class = CachedJWTAuthentication
+    # View.options is sync
+    http_method_names = ['get', 'post', 'put', 'patch', 'delete', 'head']
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # class based views are sync only before Django 4.1, which marks them the same way
+        markcoroutinefunction(view)
+        # authenticated by a header, like the DRF views
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        handler = getattr(self, request.method.lower(), None)
+        if request.method.lower() not in self.http_method_names or handler is None:
+            return self.http_method_not_allowed(request, *args, **kwargs)
+
+        authentication = self.authentication_class()
+        try:
+            authenticated = await sync_to_async(authentication.authenticate)(request)
+            if authenticated is None:
+                raise exceptions.NotAuthenticated()
+            request.user = authenticated[0]
+            return await handler(request, *args, **kwargs)
+        except exceptions.APIException as error:
+            detail = error.detail if isinstance(error.detail, (dict, list)) else {'detail': error.detail}
+            response = JsonResponse(detail, status=error.status_code, safe=False)
+            if isinstance(error, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                response['WWW-Authenticate'] = authentication.authenticate_header(request)
+            return response
+
+    @staticmethod
+    def get_data(request):
+        """The JSON or form body, as DRF's ``request.data``."""
+        if request.content_type != 'application/json':
+            return request.POST
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError as error:
+            raise exceptions.ParseError(f'JSON parse error - {error}')
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'configurations.development')
+# serve the async views, see backend.views.AsyncAPIView
+os.environ.setdefault('ASYNC_VIEWS', 'true')
 
 application = get_asgi_application()
@@ -56,11 +56,14 @@ LOCAL_APPS = [
     'backend.swagger',
     'backend.payments',
     'backend.notifications',
+    'backend.emails',
 ]
 
 INSTALLED_APPS = DJANGO_DEFAULT_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'backend.middleware.RequestMetricsMiddleware',
+    'backend.middleware.QueryInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -94,7 +97,8 @@ AUTH_USER_MODEL = 'users.User'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
+        # postgresql with CONN_HEALTH_CHECKS and STATEMENT_TIMEOUT, see backend.db.postgresql
+        'ENGINE': 'backend.db.postgresql',
         'NAME': env('DB_NAME'),
         'USER': env('DB_USER_NAME'),
         'PASSWORD': env('DB_PASSWORD'),
@@ -102,6 +106,89 @@ DATABASES = {
         'PORT': env('DB_PORT'),
     }
 }
+# aliases of read only copies of the default database, see backend.db.routers
+REPLICA_DATABASES = []
+# seconds a client reads from the primary after writing, longer than the replication lag
+REPLICA_STICKINESS = 5
+REPLICA_PIN_COOKIE = 'primary_until'
+
+if env('DB_REPLICA_HOST', default='') or env('DB_REPLICA_NAME', default=''):
+    # a streaming replica, or locally a second database restored from the first
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': env('DB_REPLICA_NAME', default=DATABASES['default']['NAME']),
+        'HOST': env('DB_REPLICA_HOST', default=DATABASES['default']['HOST']),
+        'PORT': env('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES = ['replica']
+    DATABASE_ROUTERS = ['backend.db.routers.ReplicaRouter']
+    MIDDLEWARE.append('backend.middleware.ReplicaReadMiddleware')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+RESPONSE_CACHE = 'default'
+RESPONSE_CACHE_TIMEOUT = 300
+# see backend.users.discovery.DiscoveryExclusions
+DISCOVERY_EXCLUSIONS_CACHE = 'default'
+DISCOVERY_EXCLUSIONS_TIMEOUT = 86400
+
+# async views for the endpoints waiting on Stripe and the notification long polling,
+# on by default under configurations.asgi, see backend.views.AsyncAPIView
+ASYNC_VIEWS = env.bool('ASYNC_VIEWS', default=False)
+NOTIFICATION_POLL_TIMEOUT = 25
+NOTIFICATION_POLL_INTERVAL = 1
+
+# the newest profiles matching a search that are ranked, older matches are left out and the
+# response says it is truncated, see UserQuerySet.search
+USER_SEARCH_MAX_RANKED = env.int('USER_SEARCH_MAX_RANKED', default=1000)
+
+# see backend.middleware.QueryInstrumentationMiddleware
+QUERY_STATS_HEADERS = False
+QUERY_STATS_LOG = False
+# bearer token required to read /metrics and the worker metrics (send_queued_emails --metrics-port),
+# without one they are open with DEBUG only
+METRICS_TOKEN = env('METRICS_TOKEN', default='')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'default': {
+            'format': '%(asctime)s %(levelname)s %(name)s %(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'default',
+        },
+    },
+    'loggers': {
+        'backend': {
+            'handlers': ['console'],
+            'level': env('LOG_LEVEL', default='INFO'),
+        },
+    },
+}
+
+# Argon2id first, the older hashes are hashed again with it at login
+PASSWORD_HASHERS = [
+    'backend.authentication.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+# about 40 ms a hash on one core, memory in KiB
+PASSWORD_ARGON2_TIME_COST = env.int('PASSWORD_ARGON2_TIME_COST', default=2)
+PASSWORD_ARGON2_MEMORY_COST = env.int('PASSWORD_ARGON2_MEMORY_COST', default=19456)
+PASSWORD_ARGON2_PARALLELISM = env.int('PASSWORD_ARGON2_PARALLELISM', default=1)
+# threads hashing passwords, see services.password_hash_service
+PASSWORD_HASH_WORKERS = env.int('PASSWORD_HASH_WORKERS', default=os.cpu_count())
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -123,13 +210,16 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'backend.authentication.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.BasicAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'backend.pagination.KeysetPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # the reverse proxies in front of the app, the throttles read the client address they add to
+    # X-Forwarded-For; 0 uses REMOTE_ADDR, a client can write any X-Forwarded-For it likes
+    'NUM_PROXIES': env.int('NUM_PROXIES', default=0),
 }
 
 # Internationalization
@@ -161,13 +251,27 @@ EMAIL_HOST = env('EMAIL_HOST')
 EMAIL_HOST_USER = env('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD')
 EMAIL_PORT = env('EMAIL_PORT')
+EMAIL_TIMEOUT = 10
+EMAIL_OUTBOX_BATCH_SIZE = 50
+EMAIL_OUTBOX_POLL_INTERVAL = 1
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 30
+EMAIL_OUTBOX_MAX_RETRY_DELAY = 3600
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=2),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
 }
+JWT_USER_CACHE_TTL = 60
+JWT_USER_CACHE_SIZE = 10000
 OTP_EXPIRES_AFTER = 300
 OTP_LENGTH = 6
+# (requests, window in seconds)
+OTP_USERNAME_RATE_LIMIT = (5, 15 * 60)
+OTP_IP_RATE_LIMIT = (30, 15 * 60)
+
+RATE_LIMIT_BACKEND = 'services.rate_limit_service.LocalCounterBackend'
+RATE_LIMIT_CACHE = 'default'
 
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Matrimony API',
@@ -243,5 +347,10 @@ CKEDITOR_CONFIGS = {
 
 STRIPE_SECRET_KEY = env('STRIPE_SECRET_KEY')
 STRIPE_PUBLIC_KEY = env('STRIPE_PUBLIC_KEY')
+STRIPE_CONNECT_TIMEOUT = 3
+STRIPE_READ_TIMEOUT = 20
+STRIPE_MAX_NETWORK_RETRIES = 2
+STRIPE_POOL_SIZE = 4
 
 USER_TRIAL_PERIOD = env('USER_TRIAL_PERIOD', int)
+PAYMENT_PLAN_CATALOGUE_TTL = 3600
@@ -4,3 +4,5 @@ except ModuleNotFoundError:
     raise Exception('No common.py file found')
 
 DEBUG = True
+
+QUERY_STATS_HEADERS = True
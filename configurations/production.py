@@ -5,3 +5,32 @@ except ModuleNotFoundError:
 
 DEBUG = False
 # ALLOWED_HOSTS = ['localhost', '127.0.0.1', '0.0.0.0']
+
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+# shared by every worker, e.g. CACHE_URL=pylibmc://127.0.0.1:11211
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+QUERY_STATS_LOG = True
+
+RATE_LIMIT_BACKEND = 'services.rate_limit_service.CacheCounterBackend'
+
+# keep connections open across requests, checking them before reuse. A
+# pooler such as PgBouncer in transaction mode can sit in front of the
+# database, server side cursors don't survive it.
+for database in DATABASES.values():
+    database.update({
+        'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', default=60),
+        'CONN_HEALTH_CHECKS': True,
+        'DISABLE_SERVER_SIDE_CURSORS': env.bool('DB_POOLER', default=False),
+        # milliseconds, run migrations with DB_STATEMENT_TIMEOUT=0
+        'STATEMENT_TIMEOUT': env.int('DB_STATEMENT_TIMEOUT', default=5000),
+    })
@@ -1,7 +1,15 @@
-from datetime import datetime
+from datetime import date, datetime
 
 
 class DateService:
     @staticmethod
     def from_timestamp(timestamp):
         return datetime.fromtimestamp(timestamp)
+
+    @staticmethod
+    def years_before(day, years):
+        """The same day ``years`` earlier, February 29 becomes February 28 out of leap years."""
+        try:
+            return day.replace(year=day.year - years)
+        except ValueError:
+            return date(day.year - years, 2, 28)
@@ -0,0 +1,217 @@
+import bisect
+import http.server
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TEXT_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def format_labels(labels, **extra):
+    labels = {**labels, **extra}
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels.items()
+    )
+    return '{%s}' % ','.join(f'{name}="{value}"' for name, value in escaped)
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """
+    Cumulative latency histogram, one series per distinct label set.
+    """
+
+    def __init__(self, name, documentation='', buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # one slot per bucket plus the +Inf overflow, then sum and count
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def collect(self):
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+
+        samples = []
+        for key, series in snapshot.items():
+            cumulative = 0
+            bucket_counts = []
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                bucket_counts.append((bound, cumulative))
+            samples.append({
+                'labels': dict(key),
+                'buckets': bucket_counts,
+                'sum': series[-2],
+                'count': series[-1],
+            })
+        return samples
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        for sample in self.collect():
+            for bound, count in sample['buckets']:
+                lines.append(f'{self.name}_bucket{format_labels(sample["labels"], le=format_value(bound))} {count}')
+            lines.append(f'{self.name}_sum{format_labels(sample["labels"])} {format_value(sample["sum"])}')
+            lines.append(f'{self.name}_count{format_labels(sample["labels"])} {sample["count"]}')
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    """
+    Monotonic counter, one series per distinct label set.
+    """
+
+    def __init__(self, name, documentation=''):
+        self.name = name
+        self.documentation = documentation
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def increment(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._series.get(tuple(sorted(labels.items())), 0)
+
+    def collect(self):
+        with self._lock:
+            snapshot = dict(self._series)
+        return [{'labels': dict(key), 'value': value} for key, value in snapshot.items()]
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        for sample in self.collect():
+            lines.append(f'{self.name}{format_labels(sample["labels"])} {format_value(sample["value"])}')
+        return lines
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class MetricsService:
+    """
+    In-process registry of counters and histograms, shared by all the threads
+    of the process. Each worker process keeps and exposes its own series.
+    """
+    _histograms = {}
+    _counters = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def histogram(cls, name, documentation='', buckets=DEFAULT_BUCKETS):
+        histogram = cls._histograms.get(name)
+        if histogram is None:
+            with cls._lock:
+                histogram = cls._histograms.setdefault(name, Histogram(name, documentation, buckets))
+        return histogram
+
+    @classmethod
+    def counter(cls, name, documentation=''):
+        counter = cls._counters.get(name)
+        if counter is None:
+            with cls._lock:
+                counter = cls._counters.setdefault(name, Counter(name, documentation))
+        return counter
+
+    @classmethod
+    def increment(cls, name, amount=1, **labels):
+        cls.counter(name).increment(amount, **labels)
+
+    @classmethod
+    def observe(cls, name, value, **labels):
+        cls.histogram(name).observe(value, **labels)
+
+    @staticmethod
+    @contextmanager
+    def timer(name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            MetricsService.observe(name, time.perf_counter() - started, **labels)
+
+    @classmethod
+    def collect(cls):
+        metrics = {name: counter.collect() for name, counter in list(cls._counters.items())}
+        metrics.update({name: histogram.collect() for name, histogram in list(cls._histograms.items())})
+        return metrics
+
+    @classmethod
+    def render(cls):
+        """All the metrics in the Prometheus text exposition format."""
+        metrics = {**cls._counters, **cls._histograms}
+        lines = []
+        for name in sorted(metrics):
+            lines.extend(metrics[name].render())
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def is_authorized(authorization):
+        """
+        Whether an ``Authorization`` header may read the metrics: the
+        ``METRICS_TOKEN`` bearer token, or anything in development when no
+        token is configured. They show the traffic and the SQL of every endpoint.
+        """
+        token = settings.METRICS_TOKEN
+        if not token:
+            return settings.DEBUG
+        return constant_time_compare(authorization or '', f'Bearer {token}')
+
+    @classmethod
+    def serve(cls, port, address='127.0.0.1'):
+        """
+        Expose the metrics over HTTP from a daemon thread, for processes that
+        don't serve the API, behind the ``/metrics`` token check.
+        """
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if not cls.is_authorized(self.headers.get('Authorization')):
+                    self.send_error(403)
+                    return
+                content = cls.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', TEXT_CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer((address, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
@@ -0,0 +1,67 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from services.metrics_service import MetricsService
+
+PASSWORD_HASH_METRIC = 'password_hash_duration_seconds'
+
+MetricsService.histogram(PASSWORD_HASH_METRIC, 'Time taken to hash or check a password, queueing for the pool included.')
+
+
+class PasswordHashService:
+    """
+    Hash and check passwords in a pool of ``PASSWORD_HASH_WORKERS`` threads.
+
+    Argon2 and PBKDF2 release the GIL while they hash, so the threads use
+    every core, and the pool bounds how many hashes run at once however many
+    requests need one: the others wait for a thread instead of slowing every
+    hash down and multiplying the memory Argon2 takes.
+    """
+    _executor = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_executor(cls):
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(
+                        max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix='password-hash'
+                    )
+        return cls._executor
+
+    @classmethod
+    def make_password(cls, password):
+        """``make_password`` in the pool, ``None`` makes an unusable password."""
+        with MetricsService.timer(PASSWORD_HASH_METRIC, operation='make'):
+            return cls.get_executor().submit(hashers.make_password, password).result()
+
+    @classmethod
+    def make_passwords(cls, passwords):
+        """Hash ``passwords`` in parallel, returning the hashes in the same order."""
+        return list(cls.get_executor().map(hashers.make_password, passwords))
+
+    @classmethod
+    def check_password(cls, password, encoded, setter=None):
+        """
+        ``check_password`` in the pool. ``setter`` runs in the calling thread,
+        on the connection of its transaction, when the password is correct
+        but hashed with an older hasher or other costs.
+        """
+        with MetricsService.timer(PASSWORD_HASH_METRIC, operation='check'):
+            is_correct = cls.get_executor().submit(hashers.check_password, password, encoded).result()
+        if is_correct and setter and cls.must_update(encoded):
+            setter(password)
+        return is_correct
+
+    @staticmethod
+    def must_update(encoded):
+        try:
+            hasher = hashers.identify_hasher(encoded)
+        except ValueError:
+            return False
+        preferred = hashers.get_hasher('default')
+        return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
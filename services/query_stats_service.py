@@ -0,0 +1,54 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager, ExitStack
+
+from django.db import connections
+
+IN_LIST_PATTERN = re.compile(r'IN \((?:%s, )*%s\)')
+NUMBER_PATTERN = re.compile(r'\b\d+\b')
+STRING_PATTERN = re.compile(r"'(?:[^']|'')*'")
+
+
+def fingerprint(sql):
+    """
+    The shape of a statement: parameters are already placeholders, inlined
+    literals and ``IN`` lists of any length are collapsed so the same query
+    issued for different rows has the same fingerprint.
+    """
+    sql = STRING_PATTERN.sub('?', sql)
+    sql = NUMBER_PATTERN.sub('?', sql)
+    return IN_LIST_PATTERN.sub('IN (...)', sql)
+
+
+class QueryStats:
+    """Database execute wrapper counting and timing the statements it sees."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    @property
+    def duplicates(self):
+        """Fingerprints executed more than once, most repeated first, usually an N+1."""
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count > 1]
+
+
+@contextmanager
+def record_queries():
+    """Record the statements executed on every database connection of the current thread."""
+    stats = QueryStats()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(stats))
+        yield stats
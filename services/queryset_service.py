@@ -0,0 +1,67 @@
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from rest_framework import serializers
+
+
+class QuerysetService:
+    @staticmethod
+    def only_serializer_fields(queryset, serializer_class):
+        """
+        Restrict the selected columns to the ones ``serializer_class`` reads.
+        The queryset is returned unchanged when a field's source can't be
+        mapped to a model column (properties, ``source='*'``...).
+        """
+        if getattr(getattr(serializer_class, 'Meta', None), 'model', None) is not queryset.model:
+            return queryset
+
+        fields = QuerysetService.get_serializer_model_fields(serializer_class, queryset.model)
+        if fields is None:
+            return queryset
+        return queryset.only(*fields)
+
+    @staticmethod
+    def stream(queryset, chunk_size=2000):
+        """
+        Iterate ``queryset`` in primary key order fetching ``chunk_size`` rows
+        at a time, through a server side cursor, or keyset pages when they are
+        disabled for a transaction pooler.
+        """
+        queryset = queryset.order_by('pk')
+        if not connections[queryset.db].settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+            yield from queryset.iterator(chunk_size=chunk_size)
+            return
+
+        pks = queryset.values_list('pk', flat=True)
+        last_pk = None
+        while True:
+            chunk = list((pks if last_pk is None else pks.filter(pk__gt=last_pk))[:chunk_size])
+            if not chunk:
+                return
+            yield from queryset.filter(pk__gte=chunk[0], pk__lte=chunk[-1])
+            last_pk = chunk[-1]
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_serializer_model_fields(serializer_class, model):
+        opts = model._meta
+        fields = {opts.pk.name}
+
+        for field in serializer_class().fields.values():
+            if field.write_only or isinstance(field, serializers.SerializerMethodField):
+                continue
+
+            if field.source == '*':
+                return None
+
+            name = field.source.split('.')[0]
+            try:
+                model_field = opts.get_field(name)
+            except FieldDoesNotExist:
+                return None
+
+            if model_field.concrete and not model_field.many_to_many:
+                fields.add(model_field.name)
+
+        return tuple(sorted(fields))
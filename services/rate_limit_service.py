@@ -0,0 +1,105 @@
+import hashlib
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+
+class LocalCounterBackend:
+    """
+    Counters kept in the memory of the current process. Suitable for tests and
+    single process deployments only.
+    """
+
+    def __init__(self):
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._next_sweep = 0
+
+    def incr(self, key, timeout):
+        now = time.monotonic()
+        with self._lock:
+            value, expires_at = self._counters.get(key, (0, 0))
+            if expires_at <= now:
+                value, expires_at = 0, now + timeout
+            value += 1
+            self._counters[key] = (value, expires_at)
+
+            if now >= self._next_sweep:
+                self._counters = {k: v for k, v in self._counters.items() if v[1] > now}
+                self._next_sweep = now + 60
+        return value
+
+    def get(self, key):
+        value, expires_at = self._counters.get(key, (0, 0))
+        return value if expires_at > time.monotonic() else 0
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+
+
+class CacheCounterBackend:
+    """
+    Counters stored in the ``RATE_LIMIT_CACHE`` cache, shared by every process
+    using the same cache server. ``incr`` is atomic on memcached and redis.
+    """
+
+    def __init__(self):
+        self.cache = caches[settings.RATE_LIMIT_CACHE]
+
+    def incr(self, key, timeout):
+        self.cache.add(key, 0, timeout)
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # the key expired between add and incr
+            self.cache.add(key, 1, timeout)
+            return 1
+
+    def get(self, key):
+        return self.cache.get(key, 0)
+
+    def clear(self):
+        self.cache.clear()
+
+
+@lru_cache(maxsize=None)
+def get_counter_backend():
+    return import_string(settings.RATE_LIMIT_BACKEND)()
+
+
+class SlidingWindowRateLimiter:
+    """
+    Approximate sliding window: the count of the previous fixed window is
+    weighted by how much of it still overlaps the sliding window. Costs one
+    read and one increment per hit whatever the request rate.
+    """
+
+    def __init__(self, scope, limit, window, backend=None):
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+        self.backend = backend or get_counter_backend()
+
+    def hit(self, identifier):
+        """Record a hit and return the number of seconds to wait, or 0 when allowed."""
+        now = time.time()
+        current_window, elapsed = divmod(now, self.window)
+        # identifiers come from the client, hashed they make valid memcached keys whatever they hold
+        key = f'rate-limit:{self.scope}:{hashlib.sha256(str(identifier).encode()).hexdigest()}:'
+
+        previous = self.backend.get(key + str(int(current_window) - 1))
+        current = self.backend.incr(key + str(int(current_window)), timeout=self.window * 2)
+        weight = 1 - elapsed / self.window
+
+        if previous * weight + current <= self.limit:
+            return 0
+
+        if current > self.limit:
+            return self.window - elapsed
+        # wait until enough of the previous window has slid out
+        return max(self.window * (1 - (self.limit - current) / previous) - elapsed, 1)
@@ -0,0 +1,112 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from services.metrics_service import MetricsService
+
+RESPONSE_CACHE_METRIC = MetricsService.counter(
+    'response_cache_requests_total', 'Cacheable API responses by endpoint and cache result.'
+)
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE]
+
+
+class DataVersions:
+    """
+    Version numbers of the data scopes cached responses, and the discovery
+    exclusions, are built from.
+
+    A scope is a free form name such as ``events`` or ``user:42``. Bumping a
+    scope changes the key of every response built from it, so stale entries
+    are never read again and simply expire. A version missing from the cache
+    (never set or evicted) starts again from the current time instead of 0,
+    so it can't come back to a number an old entry was stored under.
+    """
+    KEY_PREFIX = 'response-cache:version:'
+
+    @classmethod
+    def get(cls, *scopes):
+        cache = get_cache()
+        keys = [cls.KEY_PREFIX + scope for scope in scopes]
+        versions = cache.get_many(keys)
+
+        for key in keys:
+            if key not in versions:
+                cache.add(key, time.time_ns())
+                versions[key] = cache.get(key)
+        return tuple(versions[key] for key in keys)
+
+    @classmethod
+    def bump(cls, *scopes):
+        cache = get_cache()
+        for scope in scopes:
+            key = cls.KEY_PREFIX + scope
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.add(key, time.time_ns())
+
+    @classmethod
+    def bump_on_commit(cls, *scopes):
+        cls.bump(*scopes)
+        # a concurrent request may cache the pre-commit state under the new version, bump again once committed
+        transaction.on_commit(lambda: cls.bump(*scopes))
+
+
+def cache_response(*scopes, per_user=True, condition=None, timeout=None):
+    """
+    Cache the data of successful responses of a view method.
+
+    Entries are keyed on the view and action, the requesting user when
+    ``per_user``, the query string and the current versions of ``scopes``.
+    Scopes are formatted with the URL kwargs and ``user`` (the requesting
+    user id), e.g. ``'user:{pk}'``. ``condition(view, request)`` can restrict
+    caching to some requests. ``timeout`` is a number of seconds or, for data
+    that changes with time rather than with a write, a
+    ``timeout(view, request)`` callable run before the response is built;
+    None stands for ``RESPONSE_CACHE_TIMEOUT``.
+    """
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            if condition is not None and not condition(view, request):
+                return method(view, request, *args, **kwargs)
+
+            endpoint = f'{view.__class__.__name__}.{view.action or method.__name__}'
+            versions = DataVersions.get(*[scope.format(**kwargs, user=request.user.pk) for scope in scopes])
+            key = 'response-cache:' + hashlib.sha1(repr((
+                endpoint,
+                request.user.pk if per_user else None,
+                sorted(request.query_params.lists()),
+                sorted(kwargs.items()),
+                versions,
+            )).encode()).hexdigest()
+
+            cache = get_cache()
+            data = cache.get(key)
+            if data is not None:
+                RESPONSE_CACHE_METRIC.increment(endpoint=endpoint, result='hit')
+                response = Response(data)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            RESPONSE_CACHE_METRIC.increment(endpoint=endpoint, result='miss')
+            seconds = timeout(view, request) if callable(timeout) else timeout
+            response = method(view, request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT if seconds is None else seconds)
+                response['X-Cache'] = 'MISS'
+            return response
+
+        return wrapper
+
+    return decorator